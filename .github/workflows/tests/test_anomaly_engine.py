@@ -0,0 +1,58 @@
+import numpy as np
+from data_manager import DataManager, INDICATOR_BOUNDS
+from anomaly_engine import detect_anomalies
+
+def _row(df, country, year):
+    return int(np.flatnonzero((df["Country"] == country).to_numpy() & (df["Year"] == year).to_numpy())[0])
+
+def test_injected_anomalies_are_flagged():
+    dm = DataManager("happiness.csv")
+    assert not dm.df.empty, "CSV not loaded (DataFrame is empty)"
+    df = dm.df.reset_index(drop=True).copy()
+    baseline = detect_anomalies(df, INDICATOR_BOUNDS)
+
+    # Out-of-range value with a sudden jump from the previous year
+    gdp = _row(df, "France", "2019")
+    df.loc[gdp, "Economy (GDP per Capita)"] = 5.0
+    # Region mislabelled for a single year
+    region = _row(df, "Finland", "2020")
+    df.loc[region, "Region"] = "Sub-Saharan Africa"
+    # Freedom and Trust swapped
+    swap = _row(df, "Denmark", "2018")
+    freedom, trust = df.loc[swap, "Freedom"], df.loc[swap, "Trust (Government Corruption)"]
+    df.loc[swap, ["Freedom", "Trust (Government Corruption)"]] = [trust, freedom]
+
+    report = detect_anomalies(df, INDICATOR_BOUNDS)
+    assert report.flags.loc[gdp, "bounds"] and report.flags.loc[gdp, "jump"] and report.flags.loc[gdp, "year_z"]
+    assert report.flags.loc[region, "region"]
+    assert not baseline.flags["region"].any()
+    assert "hors bornes (Economy (GDP per Capita))" in report.reasons()[gdp]
+    assert report.flags.loc[swap, "swap"] and not baseline.flags.loc[swap, "swap"]
+
+    details = report.details[report.details["row"] == gdp]
+    assert set(details["Country"]) == {"France"} and set(details["Year"]) == {"2019"}
+
+def test_anomalies_are_cached_and_aligned():
+    dm = DataManager("happiness.csv")
+    report = dm.get_anomalies()
+    assert dm.get_anomalies() is report
+    assert len(report.flagged) == len(dm.df)
+    assert report.count() == report.flags.any(axis=1).sum()
+
+def test_flag_rate_is_calibrated_on_real_data():
+    dm = DataManager("happiness.csv")
+    report = dm.get_anomalies()
+    year = dm.df["Year"].to_numpy()
+
+    # Checks are combined, not ORed: a handful of rows per edition, not a third of them
+    assert report.count() / len(dm.df) < 0.08
+    statistical = report.flags[["year_z", "region_z", "jump"]].any(axis=1).to_numpy()
+    assert statistical.mean() < 0.04
+    for y in set(year):
+        assert report.flagged[year == y].mean() < 0.2
+
+    # Flagged rows are reported by decreasing score
+    ranked = report.ranked()
+    assert set(ranked) == set(np.flatnonzero(report.flagged))
+    assert (np.diff(report.scores[ranked]) <= 0).all() and (report.scores[ranked] >= 1).all()
+    assert report.details["row"].iloc[0] == ranked[0]
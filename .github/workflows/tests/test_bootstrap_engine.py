@@ -0,0 +1,39 @@
+import numpy as np
+import bootstrap_engine
+from bootstrap_engine import compute_bootstrap_ci, ALL_REGIONS
+from data_manager import DataManager
+
+def test_bootstrap_is_reproducible_and_brackets_the_mean(monkeypatch):
+    dm = DataManager("happiness.csv")
+    assert not dm.df.empty, "CSV not loaded (DataFrame is empty)"
+    df = dm.df[dm.df["Year"].isin(["2018", "2019"])]
+    columns = ["Happiness Score", "Freedom"]
+
+    single = compute_bootstrap_ci(df, columns, n_resamples=200, seed=7, max_workers=1)
+    again = compute_bootstrap_ci(df, columns, n_resamples=200, seed=7, max_workers=1)
+    assert single.equals(again)
+
+    # Same result through the process pool: one seeded stream per cell
+    monkeypatch.setattr(bootstrap_engine, "PARALLEL_MIN_WORK", 0)
+    pooled = compute_bootstrap_ci(df, columns, n_resamples=200, seed=7, max_workers=2)
+    assert single.equals(pooled)
+
+    row = single[(single["Region"] == ALL_REGIONS) & (single["Year"] == "2019")
+                 & (single["Indicator"] == "Happiness Score")].iloc[0]
+    scores = df.loc[df["Year"] == "2019", "Happiness Score"].dropna()
+    assert row["n"] == len(scores)
+    assert np.isclose(row["mean"], scores.mean())
+    assert row["low"] < row["mean"] < row["high"]
+
+def test_band_for_uses_cached_cells_or_subset():
+    dm = DataManager("happiness.csv")
+    intervals = dm.get_bootstrap_intervals()
+    assert dm.get_bootstrap_intervals() is intervals
+
+    full = intervals.band_for(dm.df)
+    assert full.equals(intervals.band())
+
+    subset = dm.df[dm.df["Happiness Score"] > 5]
+    band = intervals.band_for(subset)
+    assert (band["n"].to_numpy() == subset["Year"].value_counts().sort_index().to_numpy()).all()
+    assert intervals.band_for(subset) is band
@@ -0,0 +1,30 @@
+import numpy as np
+import cluster_engine
+from cluster_engine import CountryClusters, kmeans
+from data_manager import DataManager, INDICATOR_BOUNDS
+
+def test_kmeans_separates_blobs_and_orders_groups():
+    rng = np.random.default_rng(0)
+    centers = np.array([[5.0, 0.0], [0.0, 5.0], [-5.0, -5.0]])
+    points = np.concatenate([c + rng.normal(scale=0.3, size=(40, 2)) for c in centers])
+    labels, found, _ = kmeans(points, 3, seed=1)
+    # Groupes numérotés par centre décroissant sur le premier indicateur
+    assert (labels[:40] == 0).all() and (labels[40:80] == 1).all() and (labels[80:] == 2).all()
+    np.testing.assert_allclose(found, centers, atol=0.2)
+
+def test_clusters_cached_per_year_and_batch_matches_pool(monkeypatch):
+    dm = DataManager("happiness.csv")
+    assert not dm.df.empty, "CSV not loaded (DataFrame is empty)"
+    clusters = dm.get_country_clusters()
+    first = clusters.year_labels("2019", 4)
+    assert clusters.year_labels("2019", 4) is first
+    assert len(first) == (dm.df["Year"] == "2019").sum() and set(first) == {0, 1, 2, 3}
+
+    rows = np.flatnonzero((dm.df["Region"] == "Western Europe").to_numpy())
+    labels = dm.cluster_labels(rows, 3)
+    assert len(labels) == len(rows) and labels.min() >= 0 and labels.max() < 3
+
+    monkeypatch.setattr(cluster_engine, "PARALLEL_MIN_WORK", 0)
+    pooled = CountryClusters(dm.df, list(INDICATOR_BOUNDS))
+    pooled.run_batch(3, max_workers=2)
+    np.testing.assert_array_equal(pooled.labels_for_rows(rows, 3), labels)
@@ -0,0 +1,24 @@
+import numpy as np
+from data_manager import DataManager
+
+def _is_memory_mapped(values):
+    while values is not None:
+        if isinstance(values, np.memmap):
+            return True
+        values = values.base
+    return False
+
+def test_column_store_roundtrip_is_memory_mapped(tmp_path):
+    dm = DataManager("happiness.csv")
+    assert not dm.df.empty, "CSV not loaded (DataFrame is empty)"
+
+    dm.save_column_store(str(tmp_path))
+    shared = DataManager(str(tmp_path))
+
+    assert list(shared.df.columns) == list(dm.df.columns)
+    assert len(shared.df) == len(dm.df)
+    assert shared.get_all_years() == dm.get_all_years()
+    assert shared.get_all_countries() == dm.get_all_countries()
+    assert _is_memory_mapped(shared.df["Happiness Score"].to_numpy())
+    assert _is_memory_mapped(shared.df["Country"].array.codes)
+    np.testing.assert_allclose(shared.df["Generosity"], dm.df["Generosity"])
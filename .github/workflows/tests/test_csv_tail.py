@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+from data_manager import DataManager, build_selection_slots
+
+def test_appended_rows_match_full_load(tmp_path):
+    full = DataManager("happiness.csv")
+    assert not full.df.empty, "CSV not loaded (DataFrame is empty)"
+
+    lines = open(full.file_path, encoding="utf-8").read().splitlines(keepends=True)
+    head = [lines[0]] + [l for l in lines[1:] if not l.startswith("2019;")]
+    tail = [l for l in lines[1:] if l.startswith("2019;")]
+    path = tmp_path / "happiness.csv"
+    path.write_text("".join(head), encoding="utf-8")
+
+    dm = DataManager(str(path))
+    slots = build_selection_slots("Toutes", "Western Europe", "Toutes", {"Freedom": (0.2, 0.6)})
+    cache = dm.create_mask_cache()
+    cache.rows(slots)
+    dm.get_range_index("Freedom")
+    histogram = dm.get_score_histogram()
+    assert len(dm.ingest_appended_rows()) == 0
+
+    # Second half written without its final line break: it is read on the next pass only
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("".join(tail[:50]) + tail[50].rstrip("\n"))
+    appended = dm.ingest_appended_rows()
+    assert len(appended) == 50 and appended.years == ["2019"]
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("\n" + "".join(tail[51:]))
+    assert len(dm.ingest_appended_rows()) == len(tail) - 50
+
+    expected = full.df[full.df["Year"] != "2019"].index.append(full.df[full.df["Year"] == "2019"].index)
+    reordered = full.df.loc[expected].reset_index(drop=True)
+    pd.testing.assert_frame_equal(dm.df.reset_index(drop=True), reordered)
+
+    # Incrementally extended caches equal caches built from scratch on the same rows
+    rebuilt = DataManager(str(path))
+    np.testing.assert_array_equal(cache.rows(slots), rebuilt.create_mask_cache().rows(slots))
+    np.testing.assert_array_equal(dm.get_range_index("Freedom").order, rebuilt.get_range_index("Freedom").order)
+    assert np.array_equal(histogram.group_counts("2019", "Toutes"), rebuilt.get_score_histogram().group_counts("2019"))
+    assert dm.get_all_years() == full.get_all_years()
+
+    path.write_text(lines[0], encoding="utf-8")
+    assert dm.ingest_appended_rows() is None
@@ -0,0 +1,20 @@
+import os
+import numpy as np
+import pandas as pd
+from data_manager import DataManager
+
+def test_chunked_csv_export_and_cancel(tmp_path):
+    dm = DataManager("happiness.csv")
+    assert not dm.df.empty, "CSV not loaded (DataFrame is empty)"
+    rows = np.flatnonzero((dm.df["Year"] == "2019").to_numpy())
+
+    path = str(tmp_path / "export.csv")
+    progress = []
+    assert dm.export_rows(rows, path, chunk_size=40, progress=lambda done, total: progress.append(done))
+    exported = pd.read_csv(path, sep=";")
+    assert len(exported) == len(rows)
+    assert progress[-1] == len(rows) and len(progress) == -(-len(rows) // 40)
+
+    cancelled = str(tmp_path / "cancelled.csv")
+    assert not dm.export_rows(rows, cancelled, chunk_size=40, is_cancelled=lambda: True)
+    assert not os.path.exists(cancelled) and not os.path.exists(cancelled + ".part")
@@ -0,0 +1,19 @@
+import pandas as pd
+from data_manager import DataManager, INDICATOR_BOUNDS
+from data_validation import validate_dataset
+
+def test_validation_runs_on_load_and_flags_bad_rows():
+    dm = DataManager("happiness.csv")
+    assert not dm.df.empty, "CSV not loaded (DataFrame is empty)"
+    assert dm.validation_report is not None
+    assert not dm.validation_report.has_errors, dm.validation_report.to_frame().to_string()
+
+    df = dm.df.head(50).copy()
+    df = pd.concat([df, df.iloc[[0]]], ignore_index=True)   # doublon (Country, Year)
+    df.loc[1, "Freedom"] = 3.0                             # hors des bornes
+    df = df.drop(columns=["Generosity"])                   # colonne manquante
+
+    checks = {issue.check: issue for issue in validate_dataset(df, INDICATOR_BOUNDS).issues}
+    assert checks["doublons"].count == 2
+    assert checks["bornes"].rows == [1]
+    assert checks["schéma"].severity == "erreur"
@@ -0,0 +1,30 @@
+import numpy as np
+from data_manager import DataManager
+from decomposition_engine import COMPONENTS, RESIDUAL
+
+def test_decomposition_matches_per_country_difference():
+    dm = DataManager("happiness.csv")
+    assert not dm.df.empty, "CSV not loaded (DataFrame is empty)"
+
+    result = dm.decompose_score_change("2018", "2023")
+    assert len(result) > 100
+
+    df = dm.df.set_index(["Country", "Year"])
+    for country in ["France", "Finland", result.index[-1]]:
+        start, end = df.loc[(country, "2018")], df.loc[(country, "2023")]
+        row = result.loc[country]
+        assert np.isclose(row["Δ Score"], end["Happiness Score"] - start["Happiness Score"])
+        for column in COMPONENTS:
+            assert np.isclose(row[column], end[column] - start[column], equal_nan=True)
+
+    # The available contributions plus the residual add up to the score change, missing indicators included
+    total = result[COMPONENTS].sum(axis=1) + result[RESIDUAL]
+    assert np.allclose(total, result["Δ Score"])
+
+    # Same for the all-countries mean drawn by the waterfall (missing contributions count as 0)
+    wide = dm.decompose_score_change("2015", "2024")
+    assert wide[COMPONENTS].isna().any().any()
+    mean = wide.fillna(0.0).mean()
+    assert np.isclose(mean["Score départ"] + mean[COMPONENTS].sum() + mean[RESIDUAL], mean["Score arrivée"])
+
+    assert dm.decompose_score_change("2018", "1990").empty
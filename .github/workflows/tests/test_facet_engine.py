@@ -0,0 +1,35 @@
+import numpy as np
+from data_manager import DataManager
+from facet_engine import grid_shape, facet_codes, grouped_mean, grouped_counts, split_groups
+from histogram_engine import SCORE_BIN_EDGES, score_bin_codes
+
+def test_grouped_pass_matches_groupby():
+    dm = DataManager("happiness.csv")
+    df = dm.df
+    assert not df.empty, "CSV not loaded (DataFrame is empty)"
+    regions, region_labels = facet_codes(df, "Region")
+    years, year_labels = facet_codes(df, "Year")
+    scores = df["Happiness Score"].to_numpy(dtype=float)
+
+    means = grouped_mean(regions, len(region_labels), years, len(year_labels), scores)
+    expected = df.assign(Year=df["Year"].astype(str), Region=df["Region"].astype(str)) \
+        .groupby(["Region", "Year"])["Happiness Score"].mean().unstack()
+    assert np.allclose(means, expected.reindex(index=region_labels, columns=year_labels).to_numpy(), equal_nan=True)
+
+    bins = score_bin_codes(scores)
+    counts = grouped_counts(years, len(year_labels), bins, len(SCORE_BIN_EDGES) - 1)
+    assert counts.sum() == (bins >= 0).sum()
+    first_year = np.flatnonzero(years == 0)
+    assert np.array_equal(counts[0], np.bincount(bins[first_year], minlength=len(SCORE_BIN_EDGES) - 1))
+
+    groups = split_groups(regions, len(region_labels))
+    assert [len(g) for g in groups] == list(np.bincount(regions))
+    assert all((regions[g] == i).all() and (np.diff(g) > 0).all() for i, g in enumerate(groups))
+
+def test_grid_shape():
+    assert grid_shape(0) == (0, 0)
+    assert grid_shape(1) == (1, 1)
+    assert grid_shape(10) == (3, 4)
+    for n in range(1, 30):
+        rows, cols = grid_shape(n)
+        assert rows * cols >= n and (rows - 1) * cols < n
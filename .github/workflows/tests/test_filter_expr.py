@@ -0,0 +1,54 @@
+import numpy as np
+from data_manager import DataManager, INDICATOR_BOUNDS
+from filter_expr import And, Or, Not, Range, IsIn, IsNull, Derived
+
+def test_selection_filter_matches_pandas_masks():
+    dm = DataManager("happiness.csv")
+    assert not dm.df.empty, "CSV not loaded (DataFrame is empty)"
+    df = dm.df
+
+    bounds = dict(INDICATOR_BOUNDS)
+    bounds["Freedom"] = (0.3, 0.6)
+    args = [v for pair in bounds.values() for v in pair]
+    result = dm.filter_data_advanced("2019", "Toutes", "Toutes", *args)
+
+    expected = df["Year"] == "2019"
+    for col, (low, high) in bounds.items():
+        expected &= (df[col] >= low) & (df[col] <= high)
+    assert list(result.index) == list(df.index[expected])
+
+def test_or_null_and_derived_predicates():
+    dm = DataManager("happiness.csv")
+    df = dm.df
+
+    expr = And(Or(Range("Trust (Government Corruption)", low=0.4), IsNull("Trust (Government Corruption)")),
+               Not(IsIn("Region", ["Western Europe"])),
+               Range(Derived("Family + Freedom"), high=2.0))
+    trust = df["Trust (Government Corruption)"]
+    expected = ((trust >= 0.4) | trust.isna()) & (df["Region"] != "Western Europe") & (df["Family"] + df["Freedom"] <= 2.0)
+
+    assert np.array_equal(dm.filter_rows(expr), np.flatnonzero(expected.to_numpy()))
+    assert dm.filter(IsIn("Country", [])).empty
+
+def test_indexed_ranges_match_full_scan():
+    dm = DataManager("happiness.csv")
+    df = dm.df
+    rng = np.random.default_rng(0)
+
+    for _ in range(50):
+        predicates, expected = [], np.ones(len(df), dtype=bool)
+        for col, (low, high) in INDICATOR_BOUNDS.items():
+            if rng.random() < 0.5:
+                low, high = sorted(rng.uniform(low, high, size=2))
+            keep_null = bool(rng.random() < 0.2)
+            values = df[col].to_numpy(dtype=float, na_value=np.nan)
+            with np.errstate(invalid="ignore"):
+                hit = (values >= low) & (values <= high)
+            expected &= hit | (keep_null & np.isnan(values))
+            predicates.append(Range(col, low, high, keep_null))
+
+        assert np.array_equal(dm.filter_rows(And(*predicates)), np.flatnonzero(expected))
+
+    index = dm.get_range_index("Generosity")
+    assert index.count() == df["Generosity"].notna().sum()
+    assert dm.get_range_index("Country") is None
@@ -0,0 +1,26 @@
+import numpy as np
+from data_manager import DataManager, build_selection_slots
+from filter_state import FilterState
+
+def test_shared_selection_is_broadcast_once_per_change():
+    dm = DataManager("happiness.csv")
+    assert not dm.df.empty, "CSV not loaded (DataFrame is empty)"
+    state = FilterState(dm)
+    received = []
+    state.changed.connect(lambda source, filters: received.append((source, filters)))
+
+    filters = {"year": "2019", "region": "Western Europe", "country": "Toutes",
+               "bounds": {"Happiness Score": (6.0, 10.0)}}
+    rows = state.rows_for("country", filters)
+    expected = dm.create_mask_cache().rows(build_selection_slots(**filters))
+    assert len(rows) > 0
+    np.testing.assert_array_equal(rows, expected)
+    assert received == [("country", filters)]
+
+    # Même filtre demandé par un autre onglet : résultat commun, pas de nouvelle diffusion
+    np.testing.assert_array_equal(state.rows_for("map", dict(filters)), rows)
+    assert len(received) == 1
+
+    filters = dict(filters, year="Toutes")
+    state.rows_for("map", filters)
+    assert received[-1] == ("map", filters)
@@ -0,0 +1,15 @@
+import numpy as np
+from data_manager import DataManager
+from histogram_engine import SCORE_BIN_EDGES
+
+def test_cached_counts_match_direct_histogram():
+    dm = DataManager("happiness.csv")
+    assert not dm.df.empty, "CSV not loaded (DataFrame is empty)"
+
+    hist = dm.get_score_histogram()
+    subset = dm.df[(dm.df["Year"] == "2019") & (dm.df["Region"] == "Western Europe")]
+    expected, _ = np.histogram(subset["Happiness Score"], bins=SCORE_BIN_EDGES)
+
+    assert (hist.group_counts("2019", "Western Europe") == expected).all()
+    assert (hist.counts_for(subset.head(5), "2019", "Western Europe").sum() == 5)
+    assert hist.group_counts().sum() == len(dm.df)
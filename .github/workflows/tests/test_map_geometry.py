@@ -0,0 +1,50 @@
+import json
+import numpy as np
+from map_geometry import load_country_shapes, GridIndex
+
+def square(x, y, size, steps=1):
+    # Contour fermé d'un carré, avec des sommets alignés en plus sur chaque côté (simplifiables)
+    t = np.linspace(0, size, steps + 1)[:-1]
+    ring = [(x + d, y) for d in t] + [(x + size, y + d) for d in t] + \
+           [(x + size - d, y + size) for d in t] + [(x, y + size - d) for d in t]
+    return [list(p) for p in ring] + [[x, y]]
+
+def test_shapes_are_cached_and_hover_lookup_finds_enclaves(tmp_path):
+    features = [
+        {"properties": {"ISO_A3": "ZAF"}, "geometry": {"type": "Polygon", "coordinates": [square(16, -35, 16, 40)]}},
+        {"properties": {"ISO_A3": "LSO"}, "geometry": {"type": "Polygon", "coordinates": [square(27, -30, 2)]}},
+        # ISO_A3 = -99 (Natural Earth) : code lu dans ADM0_A3 ; les deux îles forment un seul pays
+        {"properties": {"ISO_A3": "-99", "ADM0_A3": "NOR"},
+         "geometry": {"type": "MultiPolygon", "coordinates": [[square(5, 58, 10)], [square(10, 76, 5)]]}},
+    ]
+    path = tmp_path / "countries.geojson"
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}))
+
+    shapes = load_country_shapes(str(path), cache_dir=str(tmp_path))
+    assert list(shapes.iso3) == ["ZAF", "LSO", "NOR"]
+    # Sommets alignés retirés : 4 coins + fermeture
+    assert np.diff(shapes.starts)[0] == 5
+    np.testing.assert_array_equal(shapes.positions(["NOR", "FRA"]), [2, -1])
+
+    cached = load_country_shapes(str(path), cache_dir=str(tmp_path))
+    np.testing.assert_array_equal(cached.vertices, shapes.vertices)
+    np.testing.assert_array_equal(cached.codes, shapes.codes)
+
+    index = GridIndex(cached)
+    assert cached.iso3[index.lookup(28, -29)] == "LSO"
+    assert cached.iso3[index.lookup(20, -30)] == "ZAF"
+    assert cached.iso3[index.lookup(12, 78)] == "NOR"
+    assert index.lookup(0, 0) == -1
+
+def test_bundled_geometries_cover_the_dataset(tmp_path):
+    from country_iso_map import COUNTRY_TO_ISO3
+    from data_manager import DataManager
+    shapes = load_country_shapes(cache_dir=str(tmp_path))
+    assert shapes is not None, "geodata/countries_110m.geojson is missing"
+    codes = {COUNTRY_TO_ISO3.get(c) for c in DataManager("happiness.csv").get_all_countries()} - {None}
+    covered = sum(shapes.position(code) is not None for code in codes)
+    # Seuls quelques micro-États (Bahreïn, Singapour, Malte...) sont trop petits pour l'échelle 1:110m
+    assert covered >= 0.95 * len(codes)
+    index = GridIndex(shapes)
+    assert shapes.iso3[index.lookup(2.3, 48.8)] == "FRA"
+    assert shapes.iso3[index.lookup(28.2, -29.5)] == "LSO"
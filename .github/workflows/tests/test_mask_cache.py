@@ -0,0 +1,32 @@
+import numpy as np
+from data_manager import DataManager, INDICATOR_BOUNDS, build_selection_slots, build_selection_filter
+
+def test_incremental_masks_match_full_evaluation():
+    dm = DataManager("happiness.csv")
+    assert not dm.df.empty, "CSV not loaded (DataFrame is empty)"
+    cache = dm.create_mask_cache()
+    rng = np.random.default_rng(1)
+
+    state = {"year": "Toutes", "region": "Toutes", "country": "Toutes", "bounds": dict(INDICATOR_BOUNDS)}
+    years, regions = dm.get_all_years(), dm.get_all_regions()
+    for _ in range(200):
+        # Un seul widget change à chaque étape, comme dans l'interface
+        choice = rng.integers(0, 3)
+        if choice == 0:
+            state["year"] = str(rng.choice(["Toutes"] + years))
+        elif choice == 1:
+            state["region"] = str(rng.choice(["Toutes"] + regions))
+        else:
+            col = str(rng.choice(list(INDICATOR_BOUNDS)))
+            low, high = state["bounds"][col]
+            full_low, full_high = INDICATOR_BOUNDS[col]
+            step = rng.uniform(0, 0.1 * (full_high - full_low))
+            if rng.random() < 0.5:
+                low = min(high, low + step) if rng.random() < 0.7 else max(full_low, low - step)
+            else:
+                high = max(low, high - step) if rng.random() < 0.7 else min(full_high, high + step)
+            state["bounds"][col] = (low, high)
+
+        args = (state["year"], state["region"], state["country"], state["bounds"])
+        expected = dm.filter_rows(build_selection_filter(*args))
+        assert np.array_equal(cache.rows(build_selection_slots(*args)), expected)
@@ -0,0 +1,21 @@
+import numpy as np
+from data_manager import DataManager
+from memory_report import object_size, track_allocations
+
+def test_shared_buffers_are_counted_once():
+    values = np.zeros(100_000)
+    assert object_size({"a": values, "b": values[10:], "c": [values]}) < values.nbytes + 2000
+
+    dm = DataManager("happiness.csv")
+    assert not dm.df.empty, "CSV not loaded (DataFrame is empty)"
+    dm.get_filter_context().numeric("Freedom")  # view of the DataFrame column, no copy
+    report = dm.memory_report().to_frame()
+    assert set(report["Composant"]) == {"Jeu de données", "Caches du DataManager"}
+    context = report.loc[report["Élément"] == "filter_context", "Octets"].iloc[0]
+    assert context < dm.df["Freedom"].nbytes
+
+def test_track_allocations_reports_retained_memory():
+    kept = []
+    allocations, peak = track_allocations(lambda: kept.append(np.ones(500_000)))
+    assert allocations["Octets alloués"].iloc[0] >= 4_000_000
+    assert peak >= 4_000_000
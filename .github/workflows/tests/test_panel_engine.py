@@ -0,0 +1,68 @@
+import numpy as np
+from data_manager import DataManager
+from panel_engine import CountryYearPanel
+
+def test_panel_flags_and_fills_missing_years():
+    dm = DataManager("happiness.csv")
+    assert not dm.df.empty, "CSV not loaded (DataFrame is empty)"
+    panel = dm.get_country_year_panel()
+    assert panel.present.sum() == dm.df[["Country", "Year"]].drop_duplicates().shape[0]
+    assert not (panel.missing & panel.present).any()
+
+    # A country with a hole between two observed years
+    c = int(np.flatnonzero(panel.missing.any(axis=1))[0])
+    y = int(np.flatnonzero(panel.missing[c])[0])
+    scores = panel.column_values("Happiness Score")[c]
+    assert np.isnan(scores[y])
+
+    linear = panel.filled("linear")[c, :, 0]
+    prev = y - 1 - int(np.argmax(~np.isnan(scores[:y][::-1])))
+    nxt = y + 1 + int(np.argmax(~np.isnan(scores[y + 1:])))
+    years = panel.year_numbers
+    expected = scores[prev] + (scores[nxt] - scores[prev]) * (years[y] - years[prev]) / (years[nxt] - years[prev])
+    assert np.isclose(linear[y], expected)
+    assert panel.filled("ffill")[c, y, 0] == scores[prev]
+    # No extrapolation before the first / after the last observed year
+    assert np.array_equal(np.isnan(panel.filled("linear")[:, :, 0]) & ~panel.present,
+                          ~panel.present & ~panel.missing)
+
+def test_view_keeps_gaps_and_marks_estimates():
+    dm = DataManager("happiness.csv")
+    panel = dm.get_country_year_panel()
+    c = int(np.flatnonzero(panel.missing.any(axis=1))[0])
+    rows = panel.row_of[c][panel.present[c]]
+
+    gaps = dm.time_series(rows, "Happiness Score")
+    assert list(gaps.countries) == [panel.countries[c]]
+    assert np.array_equal(np.isnan(gaps.values[0]), ~panel.present[c]) and not gaps.imputed.any()
+
+    filled = dm.time_series(rows, "Happiness Score", "linear")
+    assert np.array_equal(filled.imputed[0], panel.missing[c])
+    assert not np.isnan(filled.values[0][panel.missing[c]]).any()
+
+    # A row excluded by a filter is left empty, not estimated
+    partial = dm.time_series(rows[1:], "Happiness Score", "linear")
+    assert np.isnan(partial.values[0][panel.row_year[rows[0]]])
+
+def test_panel_matches_decomposition_cube():
+    dm = DataManager("happiness.csv")
+    standalone = CountryYearPanel(dm.df, ["Happiness Score"])
+    cube = dm.get_score_decomposition().cube
+    assert np.array_equal(cube[:, :, 0], standalone.values[:, :, 0], equal_nan=True)
+
+def test_change_between_two_years_is_aligned():
+    dm = DataManager("happiness.csv")
+    panel = dm.get_country_year_panel()
+    years = dm.get_all_years()
+    start, end, delta = panel.change("Freedom", years[0], years[-1])
+    assert len(delta) == len(panel.countries)
+
+    df = dm.df
+    first = df[df["Year"] == years[0]].set_index("Country")["Freedom"]
+    last = df[df["Year"] == years[-1]].set_index("Country")["Freedom"]
+    expected = (last - first).reindex(panel.countries).to_numpy(dtype=float)
+    assert np.allclose(delta, expected, equal_nan=True)
+    assert np.isnan(delta[~(panel.present[:, 0] & panel.present[:, -1])]).all()
+
+    unknown = panel.change("Freedom", "1900", years[-1])[2]
+    assert np.isnan(unknown).all()
@@ -0,0 +1,22 @@
+import numpy as np
+from data_manager import DataManager
+
+def test_top_k_matches_full_sort_with_dense_ranks():
+    dm = DataManager("happiness.csv")
+    assert not dm.df.empty, "CSV not loaded (DataFrame is empty)"
+    df = dm.df
+    col = "Freedom"
+
+    one_year = np.flatnonzero((df["Year"] == "2019").to_numpy())          # cached per-year order
+    many_years = np.flatnonzero((df["Region"] == "Western Europe").to_numpy())  # partial selection
+    for rows in (one_year, many_years):
+        subset = df.iloc[rows]
+        dense = subset[col].rank(method="dense", ascending=False)
+        for largest in (True, False):
+            ranking = dm.top_k(rows, col, k=12, largest=largest)
+            expected = subset[col].dropna().sort_values(ascending=not largest).head(12)
+            assert len(ranking) == 12
+            np.testing.assert_allclose(ranking[col].to_numpy(), expected.to_numpy())
+            assert (ranking["Rank"].to_numpy() == dense.loc[ranking.index].to_numpy()).all()
+
+    assert len(dm.top_k(one_year[:3], col, k=15)) == 3
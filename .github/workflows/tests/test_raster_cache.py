@@ -0,0 +1,23 @@
+import numpy as np
+from raster_cache import RasterCache, data_signature
+
+def test_lru_eviction_by_size():
+    cache = RasterCache(max_bytes=100)
+    cache.put("a", "A", 40)
+    cache.put("b", "B", 40)
+    assert cache.get("a") == "A"          # "a" becomes the most recently used
+    cache.put("c", "C", 40)               # evicts "b"
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert cache.total_bytes == 80
+
+    cache.put("huge", "H", 500)           # larger than the whole cache: not stored
+    assert "huge" not in cache
+    assert cache.get("missing") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_data_signature():
+    rows = np.array([1, 5, 9])
+    assert data_signature(rows, "pie") == data_signature(rows.copy(), "pie")
+    assert data_signature(rows, "pie") != data_signature(rows, "hist")
+    assert data_signature(rows, "pie") != data_signature(rows[:2], "pie")
+    assert data_signature(rows.astype(np.int32)) != data_signature(rows.astype(np.int64))
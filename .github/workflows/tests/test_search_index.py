@@ -0,0 +1,26 @@
+from search_index import CountrySearchIndex, normalize
+from data_manager import DataManager
+
+def test_search_is_accent_and_case_insensitive():
+    index = CountrySearchIndex(["Côte d'Ivoire", "Costa Rica", "France", "Ivory Coast", "São Tomé"])
+    names = lambda q: [index.names[i] for i in index.search(q)]
+
+    assert normalize("São Tomé") == "sao tome"
+    assert names("cote") == ["Côte d'Ivoire"]
+    assert names("CO") == ["Côte d'Ivoire", "Costa Rica", "Ivory Coast"]
+    assert names("tome") == ["São Tomé"]
+    assert names("oast") == ["Ivory Coast"]
+    assert names("xyz") == []
+    assert len(names("")) == 5
+
+def test_search_matches_linear_scan():
+    dm = DataManager("happiness.csv")
+    index = dm.get_country_search_index()
+    assert dm.get_country_search_index() is index
+
+    for query in ["an", "ia", "ong", "united", "rep"]:
+        expected = [i for i, name in enumerate(index.names) if query in name.lower()]
+        if len(query) < 3:
+            expected = [i for i, name in enumerate(index.names)
+                        if any(w.startswith(query) for w in normalize(name).replace("(", " ").split())]
+        assert index.search(query).tolist() == expected
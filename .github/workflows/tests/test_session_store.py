@@ -0,0 +1,70 @@
+import json
+import os
+import pickle
+from data_manager import DataManager
+from session_store import caches_path, load_session, save_session
+
+
+class Payload:
+    def __reduce__(self):
+        return (os.system, ("echo pwned",))
+
+
+def test_session_round_trip_and_restricted_caches(tmp_path):
+    dm = DataManager("happiness.csv")
+    assert not dm.df.empty, "CSV not loaded (DataFrame is empty)"
+    dm.get_score_histogram()
+    dm.get_anomalies()
+    fingerprint = dm.fingerprint()
+    path = str(tmp_path / "session.json")
+
+    save_session({"fingerprint": fingerprint, "caches": dm.export_caches(), "current_tab": 2,
+                  "tabs": {"country": {"state": {"bounds": {"Freedom": (0.1, 0.9)}}, "image": b"\x89PNG"}}}, path)
+    # Tab state and images are plain JSON, engine caches are pickled in a separate file
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["current_tab"] == 2
+
+    session = load_session(fingerprint, path)
+    assert session["tabs"]["country"]["image"] == b"\x89PNG"
+    assert session["tabs"]["country"]["state"]["bounds"]["Freedom"] == [0.1, 0.9]
+    restored = DataManager("happiness.csv")
+    restored.import_caches(session["caches"])
+    assert restored.get_anomalies().count() == dm.get_anomalies().count()
+    assert load_session(("other",), path) is None
+
+    # A tampered cache file cannot run code: it is refused and the caches are recomputed
+    with open(caches_path(path), "wb") as f:
+        pickle.dump({"anomalies": Payload()}, f)
+    session = load_session(fingerprint, path)
+    assert session is not None and session["caches"] == {}
+
+
+def test_session_fingerprint_matches_loaded_rows(tmp_path):
+    lines = open(DataManager("happiness.csv").file_path, encoding="utf-8").read().splitlines(keepends=True)
+    path = tmp_path / "happiness.csv"
+    path.write_text("".join(lines[:-2]), encoding="utf-8")
+    dm = DataManager(str(path))
+    dm.get_range_index("Freedom")
+    dm.get_anomalies()
+    loaded = dm.fingerprint()
+
+    # Rows appended while the file is not watched: the saved fingerprint is the one of the loaded rows
+    with open(path, "a", encoding="utf-8") as f:
+        f.writelines(lines[-2:])
+    assert dm.fingerprint() == loaded
+    caches = dm.export_caches()
+    fresh = DataManager(str(path))
+    assert fresh.fingerprint() != loaded
+
+    # Caches built on another number of rows are never restored
+    fresh.import_caches(caches)
+    assert not fresh._range_indexes and fresh._anomalies is None
+
+    # Once the appended rows are ingested, the fingerprint follows the file again
+    assert len(dm.ingest_appended_rows()) == 2
+    assert dm.fingerprint() == fresh.fingerprint()
+
+    # A rewritten file cannot be ingested: its caches are not saved anymore
+    path.write_text("".join(lines[:-1]), encoding="utf-8")
+    assert dm.ingest_appended_rows() is None
+    assert dm.export_caches() == {}
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+from data_manager import DataManager
+from similarity_index import SimilarityIndex, SIMILARITY_FEATURES
+import similarity_index
+
+def test_knn_matches_brute_force():
+    dm = DataManager("happiness.csv")
+    assert not dm.df.empty, "CSV not loaded (DataFrame is empty)"
+
+    index = dm.get_similarity_index("2019")
+    assert dm.get_similarity_index("2019") is index
+    # One standardized column per similarity feature
+    assert index.features == SIMILARITY_FEATURES
+    assert index.points.shape == (len(index.countries), len(SIMILARITY_FEATURES))
+    np.testing.assert_allclose(index.points.mean(axis=0), 0, atol=1e-9)
+
+    # Brute force on the standardized points
+    d = np.sqrt(((index.points[:, None, :] - index.points[None, :, :]) ** 2).sum(axis=2))
+    i = int(np.flatnonzero(index.countries == "France")[0])
+    d[i, i] = np.inf
+    expected = index.countries[np.argsort(d[i], kind="stable")[:5]]
+
+    result = dm.similar_countries("France", "2019", k=5)
+    assert list(result["Country"]) == list(expected)
+    assert "France" not in set(result["Country"])
+
+    batch = dm.similar_countries_all("2019", k=3)
+    assert len(batch) == 3 * len(index.countries)
+    assert (batch["Country"] != batch["Neighbor"]).all()
+    france = batch[batch["Country"] == "France"]
+    assert list(france["Neighbor"]) == list(expected[:3])
+
+def test_fallback_without_scipy(monkeypatch):
+    dm = DataManager("happiness.csv")
+    df_year = dm.df[dm.df["Year"] == "2019"]
+    with_tree = SimilarityIndex(df_year).query_all(4)
+
+    monkeypatch.setattr(similarity_index, "cKDTree", None)
+    brute = SimilarityIndex(df_year)
+    assert brute.tree is None
+    pd.testing.assert_frame_equal(brute.query_all(4), with_tree)
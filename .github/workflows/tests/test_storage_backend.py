@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+from data_manager import DataManager, build_selection_filter, build_selection_slots
+from filter_expr import And, Or, Not, Range, IsIn, IsNull, Derived
+
+def test_sqlite_backend_matches_pandas(tmp_path):
+    dm = DataManager("happiness.csv")
+    assert not dm.df.empty, "CSV not loaded (DataFrame is empty)"
+
+    path = str(tmp_path / "happiness.sqlite")
+    dm.save_sqlite(path)
+    db = DataManager(path)
+
+    assert len(db.df) == len(dm.df)
+    assert db.get_all_years() == dm.get_all_years()
+    assert db.get_all_regions() == dm.get_all_regions()
+    assert db.get_all_countries() == dm.get_all_countries()
+
+    exprs = [
+        build_selection_filter("2019", "Toutes", "Toutes", {"Freedom": (0.3, 0.5)}),
+        Not(Range("Trust (Government Corruption)", 0.1)),
+        Or(IsNull("Trust (Government Corruption)"), IsIn("Region", ["Western Europe", None], negate=True)),
+        Range(Derived("`Economy (GDP per Capita)` + Family"), high=1.5, keep_null=True),
+    ]
+    for expr in exprs:
+        np.testing.assert_array_equal(db.filter_rows(expr), dm.filter_rows(expr))
+
+    # Sélection des onglets (cache de masques) : chaque prédicat est une requête SQL
+    db_cache, dm_cache = db.create_mask_cache(), dm.create_mask_cache()
+    for bounds in ({"Freedom": (0.2, 0.6)}, {"Freedom": (0.3, 0.5)}, {"Freedom": (0.3, 0.5), "Family": (0.5, 2)}):
+        slots = build_selection_slots("Toutes", "Western Europe", "Toutes", bounds)
+        np.testing.assert_array_equal(db_cache.rows(slots), dm_cache.rows(slots))
+    # Aucun tableau de colonne n'a été extrait du DataFrame pour filtrer
+    assert not db.get_filter_context()._numeric and not db.get_filter_context()._codes
+
+    args = [0, 10, 0, 2, 0, 2, 0, 1, 0, 1, 0, 1, 0, 1]
+    pd.testing.assert_frame_equal(db.filter_data_advanced("2018", "Western Europe", "Toutes", *args),
+                                  dm.filter_data_advanced("2018", "Western Europe", "Toutes", *args),
+                                  check_dtype=False)
+
+    expected = dm.aggregate(And(), ["Region", "Year"], "Happiness Score")
+    result = db.aggregate(And(), ["Region", "Year"], "Happiness Score")
+    assert result[["Region", "Year", "n"]].equals(expected[["Region", "Year", "n"]])
+    np.testing.assert_allclose(result["Happiness Score"], expected["Happiness Score"])
@@ -0,0 +1,216 @@
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+# Détection vectorisée des valeurs suspectes d'une édition du jeu de données :
+# - score z robuste (médiane / MAD) de chaque indicateur dans son année, et dans sa région pour l'année,
+# - sauts d'une année sur l'autre pour un même pays (écart comparé aux écarts des autres pays),
+#   ces trois contrôles statistiques ne signalent une valeur que s'ils sont au moins deux à la trouver
+#   atypique, au seuil corrigé pour le nombre d'indicateurs testés (sinon ~30 % des lignes sont signalées),
+# - valeurs hors bornes et colonnes probablement inversées,
+# - région différente de celle des années précédente et suivante (logique de test_country_region_mapping).
+# Aucune boucle sur les lignes : chaque contrôle traite toutes les lignes et tous les indicateurs à la fois.
+
+INDICATORS = [
+    "Happiness Score", "Economy (GDP per Capita)", "Family", "Health (Life Expectancy)",
+    "Freedom", "Trust (Government Corruption)", "Generosity",
+]
+
+# Seuil classique d'Iglewicz et Hoaglin pour le score z modifié (un seul test)
+Z_THRESHOLD = 3.5
+# Nombre de contrôles statistiques (année, région, saut) qui doivent dépasser le seuil pour un même indicateur
+MIN_AGREEMENT = 2
+# Un groupe plus petit ne donne pas de médiane fiable : pas de score z régional
+MIN_GROUP_SIZE = 8
+
+CHECK_LABELS = {
+    "year_z": "atypique dans l'année",
+    "region_z": "atypique dans sa région",
+    "jump": "saut depuis l'année précédente",
+    "bounds": "hors bornes",
+    "swap": "colonnes inversées ?",
+    "region": "région différente des années voisines",
+}
+
+
+def robust_z(values, groups):
+    """
+    Score z modifié 0.6745 × (x − médiane) / MAD de chaque colonne, calculé dans chaque groupe.
+    Si la MAD est nulle, on utilise l'écart absolu moyen (× 1.2533) ; si lui aussi est nul, z = 0.
+
+    :param values: DataFrame des indicateurs
+    :param groups: Clés de groupe (Series ou liste de Series alignées sur values)
+    """
+    grouped = values.groupby(groups, observed=True, sort=False)
+    median = grouped.transform("median")
+    deviation = (values - median).abs()
+    dev_grouped = deviation.groupby(groups, observed=True, sort=False)
+    mad = dev_grouped.transform("median")
+    mean_ad = dev_grouped.transform("mean")
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.where(mad > 0, 0.6745 * (values - median) / mad,
+                     np.where(mean_ad > 0, (values - median) / (1.2533 * mean_ad), 0.0))
+    return pd.DataFrame(z, index=values.index, columns=values.columns)
+
+
+def adjusted_threshold(threshold, n_tests):
+    """
+    Seuil du score z corrigé (Bonferroni) pour n_tests scores examinés ensemble : la probabilité
+    qu'au moins un dépasse le seuil est celle d'un seul score au seuil threshold (loi normale).
+    """
+    normal = NormalDist()
+    tail = 2 * (1 - normal.cdf(threshold))
+    return normal.inv_cdf(1 - tail / (2 * max(n_tests, 1)))
+
+
+class AnomalyReport:
+    """
+    Résultat de la détection, aligné sur les lignes du DataFrame (positions) :
+    - flags : DataFrame booléen (une colonne par contrôle),
+    - details : une ligne par anomalie (position, pays, année, contrôle, colonne, valeur, score),
+      les lignes les plus suspectes d'abord,
+    - scores : force de l'anomalie de chaque ligne, en multiples du seuil (≥ 1 pour une ligne signalée),
+    - flagged : masque des lignes avec au moins une anomalie.
+    """
+    def __init__(self, flags, details, scores=None):
+        self.flags = flags
+        self.details = details
+        self.flagged = flags.any(axis=1).to_numpy()
+        self.scores = self.flagged.astype(float) if scores is None else scores
+        self._reasons = None
+
+    def count(self):
+        return int(self.flagged.sum())
+
+    def ranked(self, rows=None):
+        """Positions des lignes signalées (parmi rows si indiqué), de la plus suspecte à la moins suspecte."""
+        rows = np.arange(len(self.flagged)) if rows is None else np.asarray(rows, dtype=np.intp)
+        rows = rows[self.flagged[rows]]
+        return rows[np.argsort(-self.scores[rows], kind='stable')]
+
+    def reasons(self):
+        """Texte lisible des anomalies de chaque ligne signalée : {position: texte}"""
+        if self._reasons is None:
+            lines = {}
+            for row, check, column in zip(self.details['row'], self.details['check'], self.details['column']):
+                text = CHECK_LABELS[check] + (f" ({column})" if column else "")
+                lines.setdefault(int(row), []).append(text)
+            self._reasons = {row: f"Score {self.scores[row]:.1f}\n" + "\n".join(texts) for row, texts in lines.items()}
+        return self._reasons
+
+
+def detect_anomalies(df, bounds=None, threshold=Z_THRESHOLD):
+    """
+    Lance tous les contrôles sur le DataFrame et renvoie un AnomalyReport.
+
+    :param bounds: Dictionnaire {colonne: (min, max)} (bornes des filtres)
+    :param threshold: Seuil du score z robuste pour un seul test (corrigé ensuite pour le nombre d'indicateurs)
+    """
+    df = df.reset_index(drop=True)
+    flags = pd.DataFrame(False, index=df.index, columns=list(CHECK_LABELS))
+    if not {'Country', 'Year', 'Region'} <= set(df.columns):
+        return AnomalyReport(flags, pd.DataFrame(columns=['row', 'Country', 'Year', 'check', 'column', 'value', 'score']))
+
+    columns = [c for c in INDICATORS if c in df.columns]
+    threshold = adjusted_threshold(threshold, len(columns))
+    values = df[columns].astype(float)
+    year = df['Year'].astype(str)
+    region = df['Region'].astype(str)
+    records = []
+
+    def add(check, mask, column="", value=None, score=None):
+        positions = np.flatnonzero(mask)
+        if len(positions):
+            records.append(pd.DataFrame({
+                'row': positions, 'check': check, 'column': column,
+                'value': np.nan if value is None else np.asarray(value, dtype=float)[positions],
+                'score': np.nan if score is None else np.asarray(score, dtype=float)[positions],
+            }))
+
+    # --- 1. Score z robuste dans l'année, puis dans la région de l'année ---
+    z_year = robust_z(values, year)
+    z_region = robust_z(values, [region, year])
+    small = values.groupby([region, year], observed=True)[columns[0]].transform("size").to_numpy() < MIN_GROUP_SIZE
+    z_region[small] = 0.0
+
+    # --- 2. Sauts d'une année sur l'autre (par pays), comparés aux sauts des autres pays la même année ---
+    order = np.lexsort((year.to_numpy(), df['Country'].astype(str).to_numpy()))
+    ordered = values.iloc[order]
+    same_country = df['Country'].astype(str).to_numpy()[order]
+    previous_same = np.r_[False, same_country[1:] == same_country[:-1]]
+    # Écart avec l'année disponible précédente du même pays (NaN pour la première année du pays)
+    diffs = pd.DataFrame(np.where(previous_same[:, None], ordered.diff().to_numpy(), np.nan), columns=columns)
+    z_jump = robust_z(diffs, year.iloc[order].to_numpy())
+    jump_scores = np.empty(values.shape)
+    jump_scores[order] = z_jump.to_numpy()
+
+    # Une valeur n'est atypique que si MIN_AGREEMENT contrôles au moins la trouvent atypique (même indicateur)
+    z_checks = {"year_z": z_year.to_numpy(), "region_z": z_region.to_numpy(), "jump": jump_scores}
+    strength = np.sort(np.nan_to_num(np.abs(np.stack(list(z_checks.values())))), axis=0)[-MIN_AGREEMENT]
+    agreed = strength > threshold
+    for check, z in z_checks.items():
+        with np.errstate(invalid="ignore"):
+            outliers = agreed & (np.abs(z) > threshold)
+        flags[check] = outliers.any(axis=1)
+        for j, column in enumerate(columns):
+            add(check, outliers[:, j], column, values[column], z[:, j])
+    # Force de l'anomalie : score z sur lequel les contrôles s'accordent, en multiples du seuil
+    scores = strength.max(axis=1, initial=0.0) / threshold
+
+    # --- 3. Valeurs hors bornes ---
+    for column, (low, high) in (bounds or {}).items():
+        if column in values:
+            with np.errstate(invalid="ignore"):
+                outside = ((values[column] < low) | (values[column] > high)).to_numpy()
+            flags["bounds"] |= outside
+            add("bounds", outside, column, values[column])
+
+    # --- 4. Colonnes inversées : deux indicateurs sautent la même année, et les échanger annule les deux sauts ---
+    # (on compare aux valeurs du pays l'année précédente : un indicateur élevé mais stable n'est pas suspect)
+    components = [c for c in columns if c != "Happiness Score"]
+    year_ordered = year.iloc[order].to_numpy()
+    previous = np.where(previous_same[:, None], ordered.shift().to_numpy(), np.nan)
+    current = ordered.to_numpy()
+    jump_med = diffs.groupby(year_ordered).transform("median")
+    jump_mad = (diffs - jump_med).abs().groupby(year_ordered).transform("median").replace(0, np.nan)
+    jump_z_ordered = z_jump.to_numpy()
+    for a_pos, a in enumerate(components):
+        i = columns.index(a)
+        for b in components[a_pos + 1:]:
+            j = columns.index(b)
+            with np.errstate(invalid="ignore"):
+                before = (np.abs(jump_z_ordered[:, i]) > threshold) & (np.abs(jump_z_ordered[:, j]) > threshold)
+                z_a_swapped = 0.6745 * (current[:, j] - previous[:, i] - jump_med[a].to_numpy()) / jump_mad[a].to_numpy()
+                z_b_swapped = 0.6745 * (current[:, i] - previous[:, j] - jump_med[b].to_numpy()) / jump_mad[b].to_numpy()
+                swapped_ordered = before & (np.abs(z_a_swapped) <= threshold) & (np.abs(z_b_swapped) <= threshold)
+            swapped = np.zeros(len(df), dtype=bool)
+            swapped[order] = swapped_ordered
+            flags["swap"] |= swapped
+            add("swap", swapped, f"{a} / {b}")
+
+    # --- 5. Région différente de celle de l'année précédente ET de l'année suivante ---
+    regions_ordered = region.to_numpy()[order]
+    next_same = np.r_[same_country[1:] == same_country[:-1], False]
+    prev_region = np.r_[[""], regions_ordered[:-1]]
+    next_region = np.r_[regions_ordered[1:], [""]]
+    isolated = previous_same & next_same & (regions_ordered != prev_region) & (regions_ordered != next_region)
+    region_flags = np.zeros(len(df), dtype=bool)
+    region_flags[order] = isolated
+    flags["region"] = region_flags
+    add("region", region_flags)
+
+    # Un contrôle de cohérence (bornes, colonnes inversées, région) vaut au moins le seuil
+    consistency = flags[["bounds", "swap", "region"]].any(axis=1).to_numpy()
+    scores = np.where(consistency, np.maximum(scores, 1.0), scores)
+
+    details = pd.concat(records, ignore_index=True) if records else \
+        pd.DataFrame(columns=['row', 'check', 'column', 'value', 'score'])
+    rows = details['row'].to_numpy(dtype=np.intp)
+    details.insert(1, 'Country', df['Country'].to_numpy()[rows])
+    details.insert(2, 'Year', year.to_numpy()[rows])
+    # Lignes les plus suspectes d'abord
+    details['_rank'] = -scores[rows]
+    details = details.sort_values(['_rank', 'row', 'check'], kind='stable').drop(columns='_rank')
+    return AnomalyReport(flags, details.reset_index(drop=True), scores)
@@ -0,0 +1,154 @@
+import multiprocessing
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Intervalles de confiance bootstrap de la moyenne des indicateurs, par cellule Région × Année
+# (plus une cellule "toutes régions" par année). Chaque cellule a son propre flux aléatoire,
+# dérivé d'une graine unique par SeedSequence.spawn : le résultat ne dépend ni du nombre
+# de processus ni de l'ordre de calcul.
+
+ALL_REGIONS = "Toutes"
+
+# En dessous de ce volume de tirages (lignes × rééchantillons × indicateurs), on calcule dans
+# le processus courant : démarrer un pool coûterait plus cher que le calcul lui-même.
+PARALLEL_MIN_WORK = 100_000_000
+
+
+def bootstrap_cell(values, seed, n_resamples, confidence):
+    """
+    Rééchantillonnage vectorisé d'une cellule : un tirage (n_resamples, n) d'indices,
+    moyenne de chaque rééchantillon pour tous les indicateurs en même temps (valeurs manquantes ignorées).
+
+    :param values: Tableau (n, nb indicateurs)
+    :return: (bornes basses, bornes hautes), un tableau par indicateur
+    """
+    n = len(values)
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, n, size=(n_resamples, n))
+
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+    # Somme et effectif de chaque rééchantillon : (n_resamples, nb indicateurs)
+    sums = filled[idx].sum(axis=1)
+    counts = valid[idx].sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+
+    alpha = (1 - confidence) / 2
+    with warnings.catch_warnings():
+        # Indicateur entièrement manquant dans la cellule : bornes NaN, sans avertissement
+        warnings.simplefilter("ignore", RuntimeWarning)
+        low, high = np.nanquantile(means, [alpha, 1 - alpha], axis=0)
+    return low, high
+
+
+def _bootstrap_chunk(tasks, n_resamples, confidence):
+    # Exécuté dans un processus du pool : une liste de cellules (valeurs, graine)
+    return [bootstrap_cell(values, seed, n_resamples, confidence) for values, seed in tasks]
+
+
+def compute_bootstrap_ci(df, columns, n_resamples=1000, confidence=0.95, seed=0, max_workers=None,
+                         by_region=True):
+    """
+    Calcule moyenne et intervalle de confiance bootstrap de chaque indicateur pour chaque cellule
+    Région × Année et pour chaque année toutes régions confondues (Region = "Toutes").
+
+    :param columns: Indicateurs à traiter
+    :param seed: Graine globale (même graine -> mêmes intervalles)
+    :param max_workers: Nombre de processus (1 = calcul dans le processus courant)
+    :param by_region: False pour ne calculer que les cellules "toutes régions" de chaque année
+    :return: DataFrame (Region, Year, Indicator, n, mean, low, high)
+    """
+    columns = [c for c in columns if c in df.columns]
+    values = df[columns].to_numpy(dtype=float, na_value=np.nan)
+    years = df['Year'].astype(str).to_numpy()
+    regions = df['Region'].astype(str).to_numpy() if by_region else None
+
+    # Cellules : positions des lignes de chaque (Région, Année), puis de chaque année entière
+    cells = []
+    if by_region:
+        for (region, year), positions in pd.Series(np.arange(len(df))).groupby([regions, years]).groups.items():
+            cells.append((region, year, np.asarray(positions)))
+    for year, positions in pd.Series(np.arange(len(df))).groupby(years).groups.items():
+        cells.append((ALL_REGIONS, year, np.asarray(positions)))
+
+    # Un flux aléatoire indépendant par cellule, dans l'ordre (déterministe) des cellules
+    seeds = np.random.SeedSequence(seed).spawn(len(cells))
+    tasks = [(values[positions], s) for (_, _, positions), s in zip(cells, seeds)]
+
+    workers = max_workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+    work = len(df) * (2 if by_region else 1) * n_resamples * max(len(columns), 1)
+    if workers == 1 or work < PARALLEL_MIN_WORK:
+        results = _bootstrap_chunk(tasks, n_resamples, confidence)
+    else:
+        # Découpage en un bloc par processus ("spawn" : pas d'héritage de l'état Qt)
+        chunks = [tasks[i::workers] for i in range(workers)]
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            parts = list(executor.map(_bootstrap_chunk, chunks, [n_resamples] * workers, [confidence] * workers))
+        results = [None] * len(tasks)
+        for i, part in enumerate(parts):
+            results[i::workers] = part
+
+    rows = []
+    for (region, year, positions), (low, high) in zip(cells, results):
+        cell_values = values[positions]
+        n = (~np.isnan(cell_values)).sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.nansum(cell_values, axis=0) / n
+        for j, column in enumerate(columns):
+            rows.append((region, year, column, int(n[j]), mean[j], low[j], high[j]))
+    return pd.DataFrame(rows, columns=['Region', 'Year', 'Indicator', 'n', 'mean', 'low', 'high'])
+
+
+# Nombre de sous-ensembles filtrés dont on garde les intervalles (voir band_for)
+SUBSET_CACHE_SIZE = 16
+
+
+class BootstrapIntervals:
+    """Résultats du bootstrap gardés en cache, avec accès par région et indicateur."""
+    def __init__(self, df, columns, n_resamples=1000, confidence=0.95, seed=0, max_workers=None):
+        self.n_resamples = n_resamples
+        self.confidence = confidence
+        self.seed = seed
+        self.table = compute_bootstrap_ci(df, columns, n_resamples, confidence, seed, max_workers)
+        self._by_key = {key: group.set_index('Year')
+                        for key, group in self.table.groupby(['Region', 'Indicator'], sort=False)}
+        # Intervalles des derniers sous-ensembles filtrés : clé (lignes, indicateur) -> bande
+        self._subsets = {}
+
+    def band(self, region=ALL_REGIONS, indicator="Happiness Score"):
+        """
+        Renvoie la bande d'une région (ou "Toutes") pour un indicateur :
+        DataFrame indexé par année avec n, mean, low, high (vide si inconnue).
+        """
+        band = self._by_key.get((region, indicator))
+        if band is None:
+            return pd.DataFrame(columns=['n', 'mean', 'low', 'high'])
+        return band[['n', 'mean', 'low', 'high']]
+
+    def band_for(self, df, region=ALL_REGIONS, indicator="Happiness Score"):
+        """
+        Bande correspondant aux lignes affichées (une valeur par année).
+        Si elles forment des cellules Région × Année complètes, on lit le résultat en cache ;
+        sinon (filtres Min/Max, valeurs manquantes...) on rééchantillonne ce sous-ensemble par année
+        et on garde le résultat pour les prochains affichages.
+        """
+        shown = df.loc[df[indicator].notna(), 'Year'].astype(str).value_counts()
+        if shown.empty:
+            return None
+        band = self.band(region, indicator)
+        if shown.index.isin(band.index).all() and (band.loc[shown.index, 'n'].to_numpy() == shown.to_numpy()).all():
+            return band.loc[shown.index].sort_index()
+
+        key = (df.index.to_numpy().tobytes(), indicator)
+        if key not in self._subsets:
+            if len(self._subsets) >= SUBSET_CACHE_SIZE:
+                self._subsets.pop(next(iter(self._subsets)))
+            table = compute_bootstrap_ci(df, [indicator], self.n_resamples, self.confidence, self.seed,
+                                         max_workers=1, by_region=False)
+            self._subsets[key] = table.set_index('Year')[['n', 'mean', 'low', 'high']].sort_index()
+        return self._subsets[key]
@@ -0,0 +1,182 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Groupes de pays au profil d'indicateurs proche : k-means vectorisé (initialisation k-means++) sur les
+# indicateurs standardisés, une partition par année. Les partitions sont gardées en cache par
+# (année, k, indicateurs) : revenir à un k déjà essayé ne recalcule rien, et un nouveau k ne coûte
+# que quelques millisecondes (~150 pays par année). Le calcul de toutes les années d'un coup peut être
+# réparti sur un pool de processus ; chaque année a sa graine, le résultat ne dépend pas du découpage.
+
+DEFAULT_CLUSTERS = 4
+# Nombre d'initialisations k-means++ (la partition d'inertie minimale est gardée)
+N_INIT = 4
+MAX_ITER = 100
+# Couleurs des groupes (carte et nuage de points), dans l'ordre des groupes
+CLUSTER_COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd',
+                  '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf']
+MAX_CLUSTERS = len(CLUSTER_COLORS)
+# En dessous de ce volume (lignes × k × initialisations × itérations × indicateurs), calcul dans le
+# processus courant : démarrer un pool coûterait plus cher que le calcul lui-même.
+PARALLEL_MIN_WORK = 200_000_000
+
+
+def standardize(values):
+    """Centre-réduit chaque colonne ; une valeur manquante prend la moyenne de sa colonne (0 une fois centrée)."""
+    mean = np.nanmean(values, axis=0)
+    std = np.nanstd(values, axis=0)
+    std[~(std > 0)] = 1.0
+    scaled = (values - mean) / std
+    return np.where(np.isnan(scaled), 0.0, scaled)
+
+
+def squared_distances(points, centers):
+    """Distances au carré (n, k) de chaque point à chaque centre, sans tableau (n, k, d) intermédiaire."""
+    distances = (points ** 2).sum(axis=1)[:, None] - 2 * points @ centers.T + (centers ** 2).sum(axis=1)[None, :]
+    return np.maximum(distances, 0.0)
+
+
+def kmeans_plus_plus(points, k, rng):
+    """Centres initiaux k-means++ : chaque nouveau centre est tiré avec une probabilité ∝ distance² au plus proche."""
+    centers = np.empty((k, points.shape[1]))
+    centers[0] = points[rng.integers(len(points))]
+    closest = squared_distances(points, centers[:1])[:, 0]
+    for i in range(1, k):
+        total = closest.sum()
+        index = rng.choice(len(points), p=closest / total) if total > 0 else rng.integers(len(points))
+        centers[i] = points[index]
+        closest = np.minimum(closest, squared_distances(points, centers[i:i + 1])[:, 0])
+    return centers
+
+
+def kmeans(points, k, seed=0, n_init=N_INIT, max_iter=MAX_ITER):
+    """
+    k-means (Lloyd) vectorisé : affectation par une multiplication de matrices, centres par sommes groupées.
+    Un groupe vidé reprend le point le plus éloigné de son centre.
+
+    :return: (groupes, centres, inertie) ; les groupes sont numérotés par valeur décroissante du centre
+             sur le premier indicateur (numérotation stable d'un k ou d'une année à l'autre)
+    """
+    n = len(points)
+    k = min(k, n)
+    rng = np.random.default_rng(seed)
+    best = None
+    for _ in range(n_init):
+        centers = kmeans_plus_plus(points, k, rng)
+        labels = None
+        for _ in range(max_iter):
+            distances = squared_distances(points, centers)
+            new_labels = distances.argmin(axis=1)
+            if labels is not None and (new_labels == labels).all():
+                break
+            labels = new_labels
+            counts = np.bincount(labels, minlength=k)
+            sums = np.zeros_like(centers)
+            np.add.at(sums, labels, points)
+            empty = counts == 0
+            centers[~empty] = sums[~empty] / counts[~empty, None]
+            if empty.any():
+                farthest = np.argsort(distances[np.arange(n), labels])[::-1][:empty.sum()]
+                centers[empty] = points[farthest]
+        inertia = float(squared_distances(points, centers)[np.arange(n), labels].sum())
+        if best is None or inertia < best[2]:
+            best = (labels, centers.copy(), inertia)
+
+    labels, centers, inertia = best
+    order = np.argsort(-centers[:, 0], kind='stable')
+    rank = np.empty(k, dtype=np.intp)
+    rank[order] = np.arange(k)
+    return rank[labels], centers[order], inertia
+
+
+def _cluster_chunk(tasks, k, n_init):
+    # Exécuté dans un processus du pool : une liste d'années (valeurs standardisées, graine)
+    return [kmeans(points, k, seed, n_init)[0] for points, seed in tasks]
+
+
+class CountryClusters:
+    """
+    Partitions k-means des pays de chaque année, en cache par (année, k, indicateurs).
+    Toutes les partitions d'une année portent sur toutes ses lignes (et non sur la sélection affichée) :
+    les groupes d'un pays ne changent pas avec les filtres.
+    """
+    def __init__(self, df, columns, seed=0, n_init=N_INIT):
+        self.columns = [c for c in columns if c in df.columns]
+        self.values = {c: df[c].to_numpy(dtype=float, na_value=np.nan) for c in self.columns}
+        self.year_codes, self.years = pd.factorize(df['Year'].astype(str), sort=True)
+        self.n_rows = len(df)
+        self.seed = seed
+        self.n_init = n_init
+        # (année, k, indicateurs) -> groupe de chaque ligne de l'année (dans l'ordre de year_rows)
+        self._labels = {}
+        self._year_rows = None
+
+    def year_rows(self, year_code):
+        if self._year_rows is None:
+            order = np.argsort(self.year_codes, kind='stable')
+            bounds = np.concatenate([[0], np.bincount(self.year_codes, minlength=len(self.years)).cumsum()])
+            self._year_rows = [order[bounds[i]:bounds[i + 1]] for i in range(len(self.years))]
+        return self._year_rows[year_code]
+
+    def _task(self, year_code, features):
+        rows = self.year_rows(year_code)
+        points = standardize(np.column_stack([self.values[c][rows] for c in features]))
+        # Une graine par année, dérivée de la graine globale
+        return points, (self.seed, year_code)
+
+    def features(self, features=None):
+        return tuple(c for c in (features or self.columns) if c in self.values)
+
+    def year_labels(self, year, k=DEFAULT_CLUSTERS, features=None):
+        """Groupe de chaque ligne d'une année (positions : year_rows), calculé au premier appel."""
+        features = self.features(features)
+        year_code = self.years.get_loc(str(year))
+        key = (str(year), k, features)
+        if key not in self._labels:
+            points, seed = self._task(year_code, features)
+            self._labels[key] = kmeans(points, k, seed, self.n_init)[0]
+        return self._labels[key]
+
+    def run_batch(self, k=DEFAULT_CLUSTERS, features=None, years=None, max_workers=None):
+        """
+        Calcule les partitions de plusieurs années (toutes par défaut) qui ne sont pas encore en cache,
+        sur un pool de processus si le volume de calcul le justifie.
+        """
+        features = self.features(features)
+        years = [str(y) for y in (self.years if years is None else years)]
+        missing = [y for y in years if (y, k, features) not in self._labels]
+        if not missing:
+            return
+        tasks = [self._task(self.years.get_loc(y), features) for y in missing]
+        workers = max_workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        work = sum(len(points) for points, _ in tasks) * k * self.n_init * MAX_ITER * max(len(features), 1)
+        if workers == 1 or len(tasks) == 1 or work < PARALLEL_MIN_WORK:
+            results = _cluster_chunk(tasks, k, self.n_init)
+        else:
+            # Découpage en un bloc par processus ("spawn" : pas d'héritage de l'état Qt)
+            chunks = [tasks[i::workers] for i in range(workers)]
+            with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+                parts = list(executor.map(_cluster_chunk, chunks, [k] * workers, [self.n_init] * workers))
+            results = [None] * len(tasks)
+            for i, part in enumerate(parts):
+                results[i::workers] = part
+        for year, labels in zip(missing, results):
+            self._labels[(year, k, features)] = labels
+
+    def labels_for_rows(self, rows, k=DEFAULT_CLUSTERS, features=None):
+        """
+        Groupe de chaque ligne sélectionnée, selon la partition de l'année de la ligne
+        (les années de la sélection absentes du cache sont calculées ensemble, voir run_batch).
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        year_codes = self.year_codes[rows]
+        present = np.unique(year_codes)
+        self.run_batch(k, features, [self.years[c] for c in present])
+        full = np.full(self.n_rows, -1, dtype=np.intp)
+        for code in present:
+            full[self.year_rows(code)] = self.year_labels(self.years[code], k, features)
+        return full[rows]
+
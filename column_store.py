@@ -0,0 +1,85 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Format "column store" : un dossier contenant
+# - un fichier .npy par colonne (ouvert en mémoire partagée via np.load(mmap_mode='r')),
+# - les colonnes texte encodées en dictionnaire (codes entiers + liste des catégories),
+# - un petit manifeste JSON qui décrit les colonnes.
+# Plusieurs processus qui ouvrent le même dossier partagent les mêmes pages via le cache du système.
+MANIFEST_NAME = "manifest.json"
+FORMAT_VERSION = 1
+
+
+def is_column_store(path):
+    """Indique si le chemin est un dossier column store (présence du manifeste)."""
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, MANIFEST_NAME))
+
+
+def _column_file(index):
+    return f"col_{index:03d}.npy"
+
+
+def write_column_store(df, directory):
+    """
+    Écrit le DataFrame au format column store dans le dossier indiqué.
+    Les colonnes numériques sont écrites telles quelles, les autres sont encodées en dictionnaire.
+    Le manifeste est écrit en dernier : un dossier sans manifeste est considéré comme incomplet.
+    """
+    os.makedirs(directory, exist_ok=True)
+
+    manifest_path = os.path.join(directory, MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    columns = []
+    for i, name in enumerate(df.columns):
+        col = df[name]
+        entry = {"name": str(name), "file": _column_file(i)}
+
+        if pd.api.types.is_numeric_dtype(col.dtype) and not isinstance(col.dtype, pd.CategoricalDtype):
+            values = col.to_numpy()
+            entry["kind"] = "numeric"
+        else:
+            # Encodage dictionnaire : on garde le type d'entier choisi par pandas pour les codes,
+            # ce qui permet de les réutiliser sans conversion (donc sans copie) à l'ouverture
+            cat = pd.Categorical(col)
+            values = cat.codes
+            entry["kind"] = "categorical"
+            entry["categories"] = [str(c) for c in cat.categories]
+
+        np.save(os.path.join(directory, entry["file"]), np.ascontiguousarray(values), allow_pickle=False)
+        entry["dtype"] = str(values.dtype)
+        columns.append(entry)
+
+    manifest = {"version": FORMAT_VERSION, "n_rows": len(df), "columns": columns}
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
+def open_column_store(directory):
+    """
+    Ouvre un column store sans copie : chaque colonne est un tableau NumPy projeté en mémoire (lecture seule).
+    Les colonnes encodées sont reconstruites en Categorical qui référence directement les codes projetés.
+    """
+    with open(os.path.join(directory, MANIFEST_NAME), encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    if manifest.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Version de column store non supportée : {manifest.get('version')}")
+
+    data = {}
+    for entry in manifest["columns"]:
+        values = np.load(os.path.join(directory, entry["file"]), mmap_mode='r', allow_pickle=False)
+        if len(values) != manifest["n_rows"]:
+            raise ValueError(f"Colonne {entry['name']} : {len(values)} lignes au lieu de {manifest['n_rows']}")
+
+        if entry["kind"] == "categorical":
+            dtype = pd.CategoricalDtype(entry["categories"])
+            data[entry["name"]] = pd.Categorical.from_codes(values, dtype=dtype, validate=False)
+        else:
+            data[entry["name"]] = values
+
+    return pd.DataFrame(data, copy=False)
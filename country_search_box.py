@@ -0,0 +1,91 @@
+import numpy as np
+from PyQt6.QtWidgets import QLineEdit, QCompleter, QComboBox, QListWidget
+from PyQt6.QtCore import QSortFilterProxyModel, QStringListModel
+
+
+class CountryFilterProxy(QSortFilterProxyModel):
+    """
+    Modèle filtrant la liste des pays avec l'index de recherche du DataManager (voir search_index.py).
+    Les éléments ne sont jamais reconstruits : seul le masque des lignes visibles change.
+    """
+    def __init__(self, search_index, parent=None):
+        super().__init__(parent)
+        self.search_index = search_index
+        self._mask = np.ones(len(search_index), dtype=bool)
+        self.setSourceModel(QStringListModel(search_index.names, self))
+
+    def set_search_index(self, search_index):
+        self.search_index = search_index
+        self._mask = np.ones(len(search_index), dtype=bool)
+        self.setSourceModel(QStringListModel(search_index.names, self))
+
+    def set_query(self, text):
+        self._mask = self.search_index.matches(text)
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        return bool(self._mask[source_row])
+
+
+class CountrySearchBox(QLineEdit):
+    """
+    Champ de recherche incrémentale relié à un sélecteur de pays :
+    - QComboBox : les pays correspondants s'affichent dans une liste de suggestions
+      (complétion sur le modèle filtrant) ; en choisir un le sélectionne dans le menu,
+    - QListWidget : les lignes qui ne correspondent pas sont masquées (la sélection est conservée).
+    """
+    def __init__(self, search_index, target, parent=None):
+        super().__init__(parent)
+        self.search_index = search_index
+        self.target = target
+        self.setPlaceholderText("🔍 Rechercher un pays...")
+        self.setClearButtonEnabled(True)
+
+        if isinstance(target, QComboBox):
+            self.proxy = CountryFilterProxy(search_index, self)
+            completer = QCompleter(self.proxy, self)
+            # Le filtrage est fait par le modèle : le completer affiche toutes ses lignes
+            completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+            completer.activated[str].connect(self.select_country)
+            self.setCompleter(completer)
+            self.textEdited.connect(self.proxy.set_query)
+            self.returnPressed.connect(self.select_first_match)
+        elif isinstance(target, QListWidget):
+            self.map_list_rows()
+            self.textChanged.connect(self.filter_list)
+
+    def map_list_rows(self):
+        # Position dans l'index de chaque ligne de la liste (-1 : ligne hors index, toujours visible)
+        positions = {name: i for i, name in enumerate(self.search_index.names)}
+        self._rows = np.array([positions.get(self.target.item(i).text(), -1) for i in range(self.target.count())],
+                              dtype=np.intp)
+        self._visible = np.ones(len(self._rows), dtype=bool)
+
+    def set_search_index(self, search_index):
+        """Nouvel index (pays ajoutés au jeu de données) : la recherche en cours est réappliquée"""
+        self.search_index = search_index
+        if isinstance(self.target, QComboBox):
+            self.proxy.set_search_index(search_index)
+            self.proxy.set_query(self.text())
+        elif isinstance(self.target, QListWidget):
+            self.map_list_rows()
+            for row in range(self.target.count()):
+                self.target.setRowHidden(row, False)
+            self.filter_list(self.text())
+
+    def select_country(self, name):
+        if self.target.findText(name) >= 0:
+            self.target.setCurrentText(name)
+
+    def select_first_match(self):
+        """Entrée : sélectionne la première suggestion"""
+        if self.proxy.rowCount() > 0:
+            self.select_country(self.proxy.index(0, 0).data())
+
+    def filter_list(self, text):
+        mask = self.search_index.matches(text)
+        visible = np.where(self._rows >= 0, mask[self._rows], True)
+        # On ne touche qu'aux lignes dont la visibilité change
+        for row in np.flatnonzero(visible != self._visible):
+            self.target.setRowHidden(int(row), not visible[row])
+        self._visible = visible
@@ -0,0 +1,70 @@
+import io
+import os
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+# Lecture incrémentale d'un fichier CSV qui grossit par la fin (nouvelles lignes d'enquête ajoutées en
+# cours d'année) : on retient la position atteinte et l'en-tête, puis on ne lit que les octets ajoutés.
+# Seules les lignes complètes (terminées par un saut de ligne) sont lues : une ligne en cours d'écriture
+# attend le prochain passage.
+
+
+@dataclass
+class CsvTail:
+    """
+    Position de lecture d'un fichier CSV :
+    - offset : octet à partir duquel commencent les lignes pas encore lues,
+    - header : première ligne du fichier (un en-tête différent signale un fichier réécrit).
+    """
+    path: str
+    offset: int
+    header: bytes
+
+    @classmethod
+    def at_end(cls, path):
+        """Position en fin de fichier (après un chargement complet)."""
+        with open(path, 'rb') as f:
+            header = f.readline()
+            return cls(path, os.fstat(f.fileno()).st_size, header)
+
+    def read(self, columns, sep=';', decimal='.'):
+        """
+        Lit les lignes complètes ajoutées depuis la dernière position et avance la position.
+        Renvoie un DataFrame (éventuellement vide), ou None si le fichier n'est plus un simple ajout
+        (plus court qu'avant, ou en-tête modifié) : il faut alors le recharger entièrement.
+
+        :param columns: Noms des colonnes (ceux du chargement complet, dans l'ordre du fichier)
+        """
+        with open(self.path, 'rb') as f:
+            if f.readline() != self.header or os.fstat(f.fileno()).st_size < self.offset:
+                return None
+            f.seek(self.offset)
+            data = f.read()
+
+        end = data.rfind(b'\n') + 1
+        if end == 0:
+            return pd.DataFrame(columns=columns)
+        self.offset += end
+        # Le fichier chargé pouvait ne pas finir par un saut de ligne : l'ajout commence alors par celui-ci
+        text = data[:end].lstrip(b'\r\n')
+        if not text.strip():
+            return pd.DataFrame(columns=columns)
+        return pd.read_csv(io.BytesIO(text), sep=sep, decimal=decimal, header=None, names=columns)
+
+
+@dataclass
+class AppendedRows:
+    """
+    Résumé d'un ajout de lignes au DataManager :
+    - rows : positions des nouvelles lignes (à la suite des anciennes),
+    - years, regions, countries : valeurs qui n'existaient pas encore (à ajouter aux listes des onglets).
+    """
+    rows: np.ndarray = field(default_factory=lambda: np.array([], dtype=np.intp))
+    years: list = field(default_factory=list)
+    regions: list = field(default_factory=list)
+    countries: list = field(default_factory=list)
+
+    def __len__(self):
+        return len(self.rows)
@@ -0,0 +1,128 @@
+import os
+
+# Formats d'export disponibles (extension -> nom du format)
+EXPORT_FORMATS = {".csv": "csv", ".parquet": "parquet", ".xlsx": "xlsx"}
+
+# Limite de lignes d'une feuille Excel (en-tête compris)
+EXCEL_MAX_ROWS = 1048576
+
+
+def export_format_for(path):
+    """Déduit le format d'export de l'extension du fichier."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in EXPORT_FORMATS:
+        raise ValueError(f"Format d'export non supporté : {ext or path}")
+    return EXPORT_FORMATS[ext]
+
+
+class _CsvWriter:
+    def __init__(self, path):
+        self.file = open(path, "w", encoding="utf-8", newline="")
+        self.header = True
+
+    def write(self, chunk):
+        # Même convention que le fichier source (délimiteur ';')
+        chunk.to_csv(self.file, sep=';', index=False, header=self.header)
+        self.header = False
+
+    def close(self):
+        self.file.close()
+
+
+class _ParquetWriter:
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("L'export Parquet nécessite le paquet 'pyarrow'")
+        self.pa, self.pq = pa, pq
+        self.path = path
+        self.writer = None
+
+    def write(self, chunk):
+        if self.writer is None:
+            table = self.pa.Table.from_pandas(chunk, preserve_index=False)
+            self.writer = self.pq.ParquetWriter(self.path, table.schema)
+        else:
+            table = self.pa.Table.from_pandas(chunk, preserve_index=False, schema=self.writer.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+class _ExcelWriter:
+    def __init__(self, path):
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise ImportError("L'export Excel nécessite le paquet 'openpyxl'")
+        # Mode "write_only" : les lignes sont écrites au fil de l'eau sans garder la feuille en mémoire
+        self.path = path
+        self.book = Workbook(write_only=True)
+        self.sheet = self.book.create_sheet("Données")
+        self.header = True
+
+    def write(self, chunk):
+        if self.header:
+            self.sheet.append([str(c) for c in chunk.columns])
+            self.header = False
+        for row in chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None):
+            self.sheet.append(row)
+
+    def close(self):
+        self.book.save(self.path)
+
+
+def _remove_partial(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+_WRITERS = {"csv": _CsvWriter, "parquet": _ParquetWriter, "xlsx": _ExcelWriter}
+
+
+def export_rows(df, rows, path, fmt=None, chunk_size=50000, progress=None, is_cancelled=None):
+    """
+    Exporte les lignes df.iloc[rows] par blocs : seul le bloc en cours est matérialisé en mémoire.
+    Le fichier est écrit sous un nom temporaire puis renommé à la fin (pas de fichier partiel).
+
+    :param rows: Positions des lignes à exporter (résultat d'un filtre)
+    :param fmt: "csv", "parquet" ou "xlsx" (déduit de l'extension si absent)
+    :param progress: Fonction appelée avec (lignes écrites, total) après chaque bloc
+    :param is_cancelled: Fonction sans argument, renvoie True pour interrompre l'export
+    :return: True si l'export est terminé, False s'il a été annulé
+    """
+    fmt = fmt or export_format_for(path)
+    total = len(rows)
+    if fmt == "xlsx" and total + 1 > EXCEL_MAX_ROWS:
+        raise ValueError(f"Trop de lignes pour une feuille Excel ({total})")
+
+    tmp_path = path + ".part"
+    writer = _WRITERS[fmt](tmp_path)
+    done = 0
+    cancelled = False
+    try:
+        for start in range(0, max(total, 1), chunk_size):
+            if is_cancelled is not None and is_cancelled():
+                cancelled = True
+                break
+            chunk = df.iloc[rows[start:start + chunk_size]]
+            writer.write(chunk)
+            done += len(chunk)
+            if progress is not None:
+                progress(done, total)
+    except Exception:
+        writer.close()
+        _remove_partial(tmp_path)
+        raise
+    writer.close()
+
+    if cancelled:
+        _remove_partial(tmp_path)
+        return False
+
+    os.replace(tmp_path, path)
+    return True
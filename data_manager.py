@@ -1,5 +1,71 @@
 import pandas as pd  # Importation de la bibliothèque Pandas pour la manipulation de données
+import numpy as np  # Importation de NumPy pour les calculs vectorisés (masques, positions)
 import os  # Importation du module OS pour gérer les chemins de fichiers sur le système d'exploitation
+from histogram_engine import ScoreHistogram
+from column_store import is_column_store, open_column_store, write_column_store
+from filter_expr import And, IsIn, Range, FilterContext
+from range_index import SortedColumnIndex
+from mask_cache import MaskCache
+from data_export import export_rows
+from session_store import dataset_fingerprint
+from data_validation import validate_dataset
+from similarity_index import SimilarityIndex
+from bootstrap_engine import BootstrapIntervals
+from decomposition_engine import ScoreDecomposition
+from search_index import CountrySearchIndex
+from anomaly_engine import AnomalyReport, detect_anomalies
+from panel_engine import CountryYearPanel
+from storage_backend import PandasBackend, SQLiteBackend, is_sqlite_file
+from csv_tail import CsvTail, AppendedRows
+from memory_report import MemoryReport
+from ranking_engine import RankingIndex, DEFAULT_TOP_K
+from cluster_engine import CountryClusters, DEFAULT_CLUSTERS
+
+# Indicateurs numériques et bornes des filtres Min/Max utilisés par les onglets (spinbox)
+INDICATOR_BOUNDS = {
+    "Happiness Score": (0, 10),
+    "Economy (GDP per Capita)": (0, 2),
+    "Family": (0, 2),
+    "Health (Life Expectancy)": (0, 1),
+    "Freedom": (0, 1),
+    "Trust (Government Corruption)": (0, 1),
+    "Generosity": (0, 1),
+}
+
+def build_selection_slots(year="Toutes", region="Toutes", country="Toutes", bounds=None):
+    '''
+    Construit un prédicat par widget des onglets : listes déroulantes (la valeur "Toutes" donne And(),
+    qui accepte toutes les lignes) et bornes Min/Max par indicateur.
+    Renvoie un dictionnaire {nom de l'emplacement: expression}, utilisable par un MaskCache.
+
+    :param bounds: Dictionnaire {colonne: (min, max)}
+    '''
+    slots = {}
+    for name, column, value in (('year', 'Year', year), ('region', 'Region', region), ('country', 'Country', country)):
+        slots[name] = And() if value == "Toutes" else IsIn(column, [value])
+    for column, (low, high) in (bounds or {}).items():
+        slots[column] = Range(column, low, high)
+    return slots
+
+def build_selection_filter(year="Toutes", region="Toutes", country="Toutes", bounds=None):
+    '''
+    Construit l'expression de filtre correspondant aux widgets des onglets (ET de tous les emplacements).
+
+    :param bounds: Dictionnaire {colonne: (min, max)}
+    '''
+    return And(*build_selection_slots(year, region, country, bounds).values())
+
+def cache_row_count(cache, default=None):
+    '''
+    Renvoie le nombre de lignes à partir desquelles un cache a été calculé, ou default
+    pour les caches qui ne le gardent pas (agrégats par groupe).
+
+    '''
+    if isinstance(cache, AnomalyReport):
+        return len(cache.flagged)
+    if isinstance(cache, ScoreHistogram):
+        return len(cache.bin_codes)
+    return getattr(cache, 'n_rows', default)
 
 class DataManager:
     def __init__(self, filename="happiness_fixed.csv"):
@@ -8,9 +74,34 @@ class DataManager:
         current_folder = os.path.dirname(os.path.abspath(__file__))
         # Construction du chemin complet 
         file_path = os.path.join(current_folder, filename)
+        self.file_path = file_path
         
         # Initialisation d'un DataFrame 
         self.df = pd.DataFrame()
+        # Stockage interrogé par les listes de valeurs et les filtres (voir storage_backend.py)
+        self.backend = None
+
+        # Caches calculés à la demande (voir les méthodes get_...)
+        self._score_histogram = None
+        self._filter_context = None
+        self._range_indexes = {}
+        self._similarity_indexes = {}
+        self._bootstrap = None
+        self._decomposition = None
+        self._country_search_index = None
+        self._anomalies = None
+        self._ranking_index = None
+        self._clusters = None
+        # Tableau dense Pays × Année × Indicateur (construit au chargement, voir panel_engine.py)
+        self._panel = None
+        # Rapport de validation du dernier chargement (voir data_validation.py)
+        self.validation_report = None
+        # Position de lecture du CSV pour intégrer les lignes ajoutées en fin de fichier (voir csv_tail.py)
+        self._tail = None
+        # Empreinte du fichier correspondant aux lignes chargées (voir fingerprint)
+        self._fingerprint = None
+        # Fichier réécrit pendant la session : les caches ne correspondent plus au fichier (voir export_caches)
+        self.file_rewritten = False
 
         # Vérification de l'existence du fichier 
         if not os.path.exists(file_path):
@@ -18,17 +109,48 @@ class DataManager:
             return
 
         try:
-            # --- CHARGEMENT DU FICHIER ---
-            self.df = pd.read_csv(file_path, sep=';', decimal='.')
-            
-            # Nettoyage des noms de colonnes :
-            self.df.columns = self.df.columns.str.strip().str.replace('\ufeff', '')
+            # --- CHARGEMENT D'UN COLUMN STORE (dossier .npy projetés en mémoire) ---
+            # Aucune copie : plusieurs processus partagent les mêmes pages via le cache du système.
+            if is_column_store(file_path):
+                self.df = open_column_store(file_path)
+            # --- CHARGEMENT D'UNE BASE SQLITE (filtres et agrégats exécutés par SQLite) ---
+            elif is_sqlite_file(file_path):
+                self.backend = SQLiteBackend(file_path)
+                # La sélection des lignes des onglets (filter_rows, MaskCache) est faite en SQL ;
+                # le DataFrame, lu une fois dans l'ordre des lignes, sert aux colonnes affichées et aux moteurs
+                self.df = self.backend.load()
+                self.df['Year'] = self.df['Year'].astype(str)
+            else:
+                # --- CHARGEMENT DU FICHIER ---
+                self.df = pd.read_csv(file_path, sep=';', decimal='.')
+
+                # Nettoyage des noms de colonnes :
+                self.df.columns = self.df.columns.str.strip().str.replace('\ufeff', '')
 
-            # Conversion de la colonne année en texte 
-            self.df['Year'] = self.df['Year'].astype(str)
+                # Conversion de la colonne année en texte 
+                self.df['Year'] = self.df['Year'].astype(str)
+
+                # Les lignes ajoutées plus tard au fichier seront lues à partir d'ici
+                self._tail = CsvTail.at_end(file_path)
 
         except Exception as e:
             print(f"ERREUR : {e}")
+            self.backend = None
+            return
+
+        if self.backend is None:
+            self.backend = PandasBackend(self.df, self.get_filter_context)
+
+        # Empreinte prise au chargement : c'est elle qui décrit les lignes à partir desquelles les caches sont calculés
+        self._fingerprint = dataset_fingerprint(file_path)
+
+        # --- VALIDATION DES DONNÉES ---
+        # Contrôles vectorisés (schéma, bornes, doublons, rang/score...) à chaque chargement
+        self.validation_report = validate_dataset(self.df, INDICATOR_BOUNDS)
+
+        # --- TABLEAU DENSE PAYS × ANNÉE ---
+        # Construit une fois : les séries temporelles n'ont plus à réaligner les lignes à chaque rafraîchissement
+        self._panel = CountryYearPanel(self.df, list(INDICATOR_BOUNDS))
 
     def get_all_years(self):
         '''
@@ -37,7 +159,7 @@ class DataManager:
         '''
         if self.df.empty: return []
        
-        return sorted(self.df['Year'].unique())
+        return self.backend.years()
 
     def get_all_regions(self):
         '''
@@ -46,7 +168,7 @@ class DataManager:
         '''
         if self.df.empty or 'Region' not in self.df.columns: return []
         
-        return sorted(self.df['Region'].dropna().unique())
+        return self.backend.regions()
 
     def get_all_countries(self):
         '''
@@ -55,8 +177,442 @@ class DataManager:
         '''
 
         if self.df.empty: return []
-        return sorted(self.df['Country'].unique())
+        return self.backend.countries()
+
+    def get_country_search_index(self):
+        '''
+        Renvoie l'index de recherche des pays (préfixes et trigrammes, sans accents ni casse),
+        construit une seule fois et partagé par les champs de recherche des onglets.
+
+        '''
+        if self._country_search_index is None:
+            self._country_search_index = CountrySearchIndex(self.get_all_countries())
+        return self._country_search_index
+
+    def save_column_store(self, directory):
+        '''
+        Écrit les données chargées au format column store (un fichier .npy par colonne + manifeste).
+        Le dossier peut ensuite être passé à DataManager(directory) par l'interface ou les traitements batch.
+
+        :param directory: Dossier de destination (créé s'il n'existe pas)
+        '''
+        if self.df.empty: return
+        write_column_store(self.df, directory)
+
+    def save_sqlite(self, path):
+        '''
+        Écrit les données chargées dans une base SQLite indexée (Year, Region, Country et indicateurs).
+        Le fichier peut ensuite être passé à DataManager(path) : filtres et agrégats y sont exécutés en SQL.
+
+        :param path: Fichier de destination (.sqlite, .sqlite3 ou .db ; la table est remplacée)
+        '''
+        if self.df.empty: return
+        SQLiteBackend.create(path, self.df).close()
+
+    # --- LIGNES AJOUTÉES AU FICHIER (surveillance, sans rechargement complet) ---
+    def can_ingest_appends(self):
+        '''
+        Indique si les lignes ajoutées en fin de fichier peuvent être intégrées sans recharger (fichier CSV).
+
+        '''
+        return self._tail is not None and not self.df.empty
+
+    def ingest_appended_rows(self):
+        '''
+        Lit uniquement les lignes ajoutées au fichier CSV depuis le dernier passage et les intègre (append_rows).
+        Renvoie le résumé de l'ajout (vide si rien de nouveau), ou None si le fichier a été réécrit
+        autrement que par un ajout en fin de fichier (un rechargement complet est alors nécessaire).
+
+        '''
+        if not self.can_ingest_appends(): return None
+        try:
+            new_rows = self._tail.read(list(self.df.columns))
+        except (OSError, ValueError, pd.errors.ParserError) as e:
+            print(f"ERREUR : lecture des lignes ajoutées impossible ({e})")
+            return AppendedRows()
+        if new_rows is None:
+            # Fichier réécrit : les lignes en mémoire (et les caches) ne correspondent plus au fichier
+            self.file_rewritten = True
+            return None
+        appended = self.append_rows(new_rows)
+        # Les lignes en mémoire correspondent de nouveau au fichier
+        self._fingerprint = dataset_fingerprint(self.file_path)
+        return appended
+
+    def append_rows(self, new_rows):
+        '''
+        Ajoute des lignes à la fin des données et met à jour les caches sans tout reconstruire :
+        - contexte de filtrage, index triés et histogramme : prolongés avec les seules nouvelles lignes,
+        - tableau dense, rapport de validation : recalculés (opérations vectorisées),
+        - index de voisins des années touchées, bootstrap, décomposition, anomalies : recalculés à la demande.
+        Les positions des lignes existantes ne changent pas.
+
+        :param new_rows: DataFrame des nouvelles lignes (mêmes colonnes que le fichier)
+        :return: Résumé de l'ajout (positions des lignes, années, régions et pays inédits)
+        '''
+        if self.df.empty or new_rows.empty: return AppendedRows()
+        new_rows = new_rows.reindex(columns=self.df.columns)
+        new_rows['Year'] = new_rows['Year'].astype(str)
+
+        summary = AppendedRows(rows=np.arange(len(self.df), len(self.df) + len(new_rows)))
+        for name, column in (('years', 'Year'), ('regions', 'Region'), ('countries', 'Country')):
+            known = set(self.df[column].dropna().unique())
+            setattr(summary, name, sorted(v for v in new_rows[column].dropna().unique() if v not in known))
+
+        new_rows.index = summary.rows
+        self.df = pd.concat([self.df, new_rows])
+
+        # --- Caches prolongés ---
+        if self._filter_context is not None:
+            self._filter_context = self._filter_context.extended(self.df)
+        for column, index in self._range_indexes.items():
+            index.append(new_rows[column].to_numpy(dtype=float, na_value=np.nan))
+        if self._score_histogram is not None:
+            self._score_histogram.append(new_rows)
+        self.backend = PandasBackend(self.df, self.get_filter_context)
+
+        # --- Caches recalculés ---
+        self._panel = CountryYearPanel(self.df, list(INDICATOR_BOUNDS))
+        self.validation_report = validate_dataset(self.df, INDICATOR_BOUNDS)
+        for year in set(new_rows['Year']):
+            self._similarity_indexes.pop(year, None)
+        self._bootstrap = None
+        self._decomposition = None
+        self._anomalies = None
+        self._ranking_index = None
+        self._clusters = None
+        if summary.countries:
+            self._country_search_index = None
+        return summary
+
+    # --- DIAGNOSTIC MÉMOIRE ---
+    def memory_report(self):
+        '''
+        Renvoie la mémoire occupée par chaque colonne du jeu de données et par chaque cache calculé
+        (voir memory_report.py). Les colonnes partagées sans copie par les caches ne sont comptées qu'une fois.
+
+        '''
+        report = MemoryReport()
+        if self.df.empty: return report
+        report.add_dataframe("Jeu de données", self.df)
+        report.add_caches("Caches du DataManager", self,
+                          ['_filter_context', '_range_indexes', '_score_histogram', '_panel', '_similarity_indexes',
+                           '_bootstrap', '_decomposition', '_anomalies', '_ranking_index', '_clusters',
+                           '_country_search_index', 'validation_report'])
+        return report
+
+    # --- INSTANTANÉ DES CACHES (démarrage à chaud) ---
+    def fingerprint(self):
+        '''
+        Renvoie l'empreinte du fichier de données (taille, date, hachage partiel) telle qu'au chargement,
+        ou après la dernière intégration de lignes ajoutées ; None si le fichier était absent.
+        Un fichier modifié depuis sans être relu garde l'ancienne empreinte : la session ne sera pas reprise.
+
+        '''
+        return self._fingerprint
+
+    def export_caches(self):
+        '''
+        Renvoie les index et agrégats déjà calculés, pour les enregistrer dans l'instantané de session,
+        avec le nombre de lignes à partir desquelles ils ont été calculés. Aucun cache si le fichier a été réécrit.
+
+        '''
+        if self.file_rewritten: return {}
+        return {
+            'n_rows': len(self.df),
+            'score_histogram': self._score_histogram,
+            'range_indexes': dict(self._range_indexes),
+            'similarity_indexes': dict(self._similarity_indexes),
+            'bootstrap': self._bootstrap,
+            'decomposition': self._decomposition,
+            'anomalies': self._anomalies,
+            'ranking_index': self._ranking_index,
+            'clusters': self._clusters,
+        }
+
+    def import_caches(self, caches):
+        '''
+        Recharge des index et agrégats enregistrés (l'appelant a vérifié l'empreinte du fichier).
+
+        Un cache calculé sur un autre nombre de lignes que les données chargées est ignoré (recalculé à la demande).
+
+        :param caches: Dictionnaire renvoyé par export_caches
+        '''
+        if self.df.empty: return
+        n_rows = len(self.df)
+        built_rows = caches.get('n_rows')
+
+        def fits(cache):
+            return cache is not None and cache_row_count(cache, built_rows) == n_rows
+
+        if fits(caches.get('score_histogram')):
+            self._score_histogram = caches['score_histogram']
+        self._range_indexes.update({col: index for col, index in caches.get('range_indexes', {}).items() if fits(index)})
+        if built_rows == n_rows:
+            self._similarity_indexes.update(caches.get('similarity_indexes', {}))
+        if fits(caches.get('bootstrap')):
+            self._bootstrap = caches['bootstrap']
+        if fits(caches.get('decomposition')):
+            self._decomposition = caches['decomposition']
+        if fits(caches.get('anomalies')):
+            self._anomalies = caches['anomalies']
+        if fits(caches.get('ranking_index')):
+            self._ranking_index = caches['ranking_index']
+        if fits(caches.get('clusters')):
+            self._clusters = caches['clusters']
+
+    def get_score_histogram(self):
+        '''
+        Renvoie le moteur d'histogramme des scores (tranches fixes sur 0-10), construit au premier appel puis gardé en cache.
+
+        '''
+        if self._score_histogram is None:
+            self._score_histogram = ScoreHistogram(self.df)
+        return self._score_histogram
     
+    def get_bootstrap_intervals(self):
+        '''
+        Renvoie les intervalles de confiance bootstrap (95 %) des moyennes par Région × Année,
+        calculés au premier appel (graine fixe, pool de processus pour les gros volumes) puis gardés en cache.
+
+        '''
+        if self._bootstrap is None:
+            self._bootstrap = BootstrapIntervals(self.df, list(INDICATOR_BOUNDS))
+        return self._bootstrap
+
+    def get_score_decomposition(self):
+        '''
+        Renvoie le moteur de décomposition de l'évolution du score (cube Pays × Année × indicateurs),
+        construit au premier appel puis gardé en cache.
+
+        '''
+        if self._decomposition is None:
+            self._decomposition = ScoreDecomposition(self.df, self.get_country_year_panel())
+        return self._decomposition
+
+    def get_country_year_panel(self):
+        '''
+        Renvoie le tableau dense Pays × Année × Indicateur (cellules manquantes signalées),
+        construit au chargement du fichier.
+
+        '''
+        if self._panel is None:
+            self._panel = CountryYearPanel(self.df, list(INDICATOR_BOUNDS))
+        return self._panel
+
+    def time_series(self, rows, column, fill=None):
+        '''
+        Renvoie les séries temporelles d'un indicateur pour les pays des lignes sélectionnées,
+        alignées sur toutes les années (trous ou valeurs estimées, voir panel_engine.py).
+
+        :param rows: Positions des lignes sélectionnées
+        :param column: Indicateur à lire
+        :param fill: None (trous), "linear" ou "ffill"
+        '''
+        return self.get_country_year_panel().view(rows, column, fill)
+
+    def decompose_score_change(self, year_from, year_to):
+        '''
+        Renvoie, pour tous les pays présents les deux années, la contribution de chaque indicateur
+        à l'évolution du score entre year_from et year_to (voir decomposition_engine.py).
+
+        :param year_from: Année de départ
+        :param year_to: Année d'arrivée
+        '''
+        if self.df.empty: return pd.DataFrame()
+        return self.get_score_decomposition().between(year_from, year_to)
+
+    def get_anomalies(self):
+        '''
+        Renvoie le rapport d'anomalies (scores z robustes par année et par région, sauts d'une année
+        sur l'autre, bornes, colonnes inversées, région isolée), calculé une fois pour toutes les lignes.
+
+        '''
+        if self._anomalies is None:
+            self._anomalies = detect_anomalies(self.df, INDICATOR_BOUNDS)
+        return self._anomalies
+
+    # --- CLASSEMENTS (top-K / bottom-K) ---
+    def get_ranking_index(self):
+        '''
+        Renvoie les ordres par année de chaque indicateur (voir ranking_engine.py), calculés au premier appel.
+
+        '''
+        if self._ranking_index is None:
+            self._ranking_index = RankingIndex(self.df, list(INDICATOR_BOUNDS))
+        return self._ranking_index
+
+    def top_k(self, rows, column, k=DEFAULT_TOP_K, largest=True):
+        '''
+        Renvoie le classement des k plus grandes (ou plus petites) valeurs d'un indicateur parmi les lignes
+        sélectionnées : DataFrame (Rank, Country, Year, indicateur) indexé par la position des lignes, dans
+        l'ordre d'affichage. Rank est le rang dense dans la sélection (1 = plus grande valeur).
+
+        :param rows: Positions des lignes sélectionnées
+        :param column: Indicateur classé
+        :param k: Nombre de lignes
+        :param largest: True pour les plus grandes valeurs, False pour les plus petites
+        '''
+        if self.df.empty: return pd.DataFrame(columns=['Rank', 'Country', 'Year', column])
+        positions, values, ranks = self.get_ranking_index().top_k(rows, column, k, largest)
+        return pd.DataFrame({'Rank': ranks,
+                             'Country': self.df['Country'].to_numpy()[positions],
+                             'Year': self.df['Year'].to_numpy()[positions],
+                             column: values}, index=positions)
+
+    # --- GROUPES DE PAYS (k-means par année) ---
+    def get_country_clusters(self):
+        '''
+        Renvoie le cache des partitions k-means par année (voir cluster_engine.py), créé au premier appel.
+
+        '''
+        if self._clusters is None:
+            self._clusters = CountryClusters(self.df, list(INDICATOR_BOUNDS))
+        return self._clusters
+
+    def cluster_labels(self, rows, k=DEFAULT_CLUSTERS, features=None):
+        '''
+        Renvoie le groupe (0 à k-1) de chaque ligne sélectionnée, selon la partition k-means de son année
+        sur les indicateurs standardisés.
+
+        :param rows: Positions des lignes sélectionnées
+        :param k: Nombre de groupes
+        :param features: Indicateurs utilisés (tous par défaut)
+        '''
+        if self.df.empty: return np.zeros(0, dtype=np.intp)
+        return self.get_country_clusters().labels_for_rows(rows, k, features)
+
+    # --- PAYS SIMILAIRES (k plus proches voisins) ---
+    def get_similarity_index(self, year):
+        '''
+        Renvoie l'index des plus proches voisins d'une année (indicateurs standardisés), construit au premier appel.
+
+        :param year: Année (texte, comme dans la colonne Year)
+        '''
+        year = str(year)
+        if year not in self._similarity_indexes:
+            df_year = self.df[self.df['Year'] == year] if not self.df.empty else self.df
+            self._similarity_indexes[year] = SimilarityIndex(df_year)
+        return self._similarity_indexes[year]
+
+    def similar_countries(self, country, year, k=5):
+        '''
+        Renvoie les k pays les plus proches d'un pays pour une année (DataFrame Country, Distance).
+
+        :param country: Pays de référence
+        :param year: Année
+        :param k: Nombre de voisins
+        '''
+        if self.df.empty: return pd.DataFrame(columns=['Country', 'Distance'])
+        return self.get_similarity_index(year).query(country, k)
+
+    def similar_countries_all(self, year, k=5):
+        '''
+        Renvoie les k voisins de tous les pays d'une année en une requête groupée
+        (DataFrame Country, Rank, Neighbor, Distance), par exemple pour un rapport de groupes de pairs.
+
+        :param year: Année
+        :param k: Nombre de voisins par pays
+        '''
+        if self.df.empty: return pd.DataFrame(columns=['Country', 'Rank', 'Neighbor', 'Distance'])
+        return self.get_similarity_index(year).query_all(k)
+
+    # --- FILTRAGE PAR EXPRESSIONS ---
+    def get_filter_context(self):
+        '''
+        Renvoie le contexte d'évaluation des filtres (tableaux NumPy des colonnes gardés en cache).
+
+        '''
+        if self._filter_context is None:
+            self._filter_context = FilterContext(self.df, range_index=self.get_range_index)
+        return self._filter_context
+
+    def get_range_index(self, column):
+        '''
+        Renvoie l'index trié (permutation + valeurs triées) d'une colonne indicateur, construit au premier appel.
+        Renvoie None pour les colonnes qui ne sont pas des indicateurs.
+
+        :param column: Nom de la colonne
+        '''
+        if column not in INDICATOR_BOUNDS or column not in self.df.columns:
+            return None
+        if column not in self._range_indexes:
+            values = self.df[column].to_numpy(dtype=float, na_value=np.nan)
+            self._range_indexes[column] = SortedColumnIndex(values)
+        return self._range_indexes[column]
+
+    def filter_rows(self, expr):
+        '''
+        Renvoie les positions des lignes retenues par une expression de filtre (voir filter_expr.py).
+
+        :param expr: Expression (And, Or, Not, Range, IsIn, IsNull, Derived...)
+        '''
+        if self.df.empty: return np.array([], dtype=np.intp)
+        return self.backend.rows(expr)
+
+    def filter_mask(self, expr, rows=None):
+        '''
+        Renvoie le masque booléen d'une expression de filtre, évalué par le stockage
+        (tableaux en mémoire, ou requête SQL sur les index d'une base SQLite).
+
+        :param expr: Expression de filtre
+        :param rows: Positions des lignes à évaluer (toutes si None)
+        '''
+        if self.df.empty: return np.zeros(0 if rows is None else len(rows), dtype=bool)
+        return self.backend.mask(expr, rows)
+
+    def create_mask_cache(self):
+        '''
+        Crée un cache de masques par prédicat (un par onglet) : quand un seul filtre change,
+        seul son masque est recalculé (voir mask_cache.py).
+
+        '''
+        return MaskCache(self)
+
+    def take_rows(self, rows):
+        '''
+        Renvoie les lignes du DataFrame aux positions indiquées (résultat d'un filtre ou d'un MaskCache).
+
+        :param rows: Positions des lignes
+        '''
+        if self.df.empty: return pd.DataFrame()
+        return self.df.iloc[rows]
+
+    def export_rows(self, rows, path, fmt=None, chunk_size=50000, progress=None, is_cancelled=None):
+        '''
+        Exporte les lignes indiquées (résultat d'un filtre) en CSV, Parquet ou Excel, bloc par bloc,
+        sans copie complète des données en mémoire (voir data_export.py).
+
+        :param rows: Positions des lignes à exporter
+        :param path: Fichier de destination (le format est déduit de l'extension si fmt est absent)
+        :param progress: Fonction appelée avec (lignes écrites, total)
+        :param is_cancelled: Fonction renvoyant True pour interrompre l'export
+        :return: True si l'export est terminé, False s'il a été annulé
+        '''
+        return export_rows(self.df, rows, path, fmt, chunk_size, progress, is_cancelled)
+
+    def filter(self, expr):
+        '''
+        Renvoie le sous-ensemble du DataFrame retenu par une expression de filtre.
+
+        :param expr: Expression (And, Or, Not, Range, IsIn, IsNull, Derived...)
+        '''
+        if self.df.empty: return pd.DataFrame()
+        return self.df.iloc[self.filter_rows(expr)]
+
+    def aggregate(self, expr, by, column, func="mean"):
+        '''
+        Renvoie un agrégat d'une colonne par groupe sur les lignes retenues par le filtre,
+        calculé par le stockage (GROUP BY pour une base SQLite) : colonnes de groupe, valeur, nombre "n".
+
+        :param expr: Expression de filtre
+        :param by: Colonne ou liste de colonnes de groupe (ex : "Region" ou ["Region", "Year"])
+        :param column: Colonne agrégée
+        :param func: "mean", "sum", "min", "max" ou "count"
+        '''
+        if self.df.empty: return pd.DataFrame()
+        return self.backend.aggregate(expr, by, column, func)
+
     # --- NOUVELLE FONCTION DE FILTRAGE AVANCÉ ---
     def filter_data_advanced(self, year, region, country, 
                              happ_min, happ_max,
@@ -69,6 +625,8 @@ class DataManager:
         '''
     Applique un filtrage avancé sur les données en combinant des filtres textuels (année, région, pays) et des filtres
     numériques (bornes minimales et maximales sur plusieurs indicateurs).
+    Conservée pour compatibilité : le filtre est construit par build_selection_filter puis évalué par le stockage
+    (masque vectorisé en mémoire, ou clause WHERE sur les index d'une base SQLite).
 
     :param year: Année sélectionnée pour le filtrage 
     :param region: Région sélectionnée ou "Toutes"
@@ -95,32 +653,13 @@ class DataManager:
     :param gen_min: Valeur minimale de l'indicateur Generosity
     :param gen_max: Valeur maximale de l'indicateur Generosity
         '''
-        
         if self.df.empty: return pd.DataFrame()
-        
-        # Création d'une cope du DataFrame original.
-        df = self.df.copy()
-
-        # 1. Filtres Textuels (Listes déroulantes)
-        if year != "Toutes":
-            df = df[df['Year'] == year]
-        if region != "Toutes":
-            df = df[df['Region'] == region]
-        if country != "Toutes":
-            df = df[df['Country'] == country]
-
-        # 2. Filtres Numériques (Bornes Min et Max)
+
+        bounds = dict(zip(INDICATOR_BOUNDS, [(happ_min, happ_max), (gdp_min, gdp_max), (fam_min, fam_max),
+                                             (health_min, health_max), (free_min, free_max),
+                                             (trust_min, trust_max), (gen_min, gen_max)]))
         try:
-            df = df[
-                (df['Happiness Score'] >= happ_min) & (df['Happiness Score'] <= happ_max) &
-                (df['Economy (GDP per Capita)'] >= gdp_min) & (df['Economy (GDP per Capita)'] <= gdp_max) &
-                (df['Family'] >= fam_min) & (df['Family'] <= fam_max) &
-                (df['Health (Life Expectancy)'] >= health_min) & (df['Health (Life Expectancy)'] <= health_max) &
-                (df['Freedom'] >= free_min) & (df['Freedom'] <= free_max) &
-                (df['Trust (Government Corruption)'] >= trust_min) & (df['Trust (Government Corruption)'] <= trust_max) &
-                (df['Generosity'] >= gen_min) & (df['Generosity'] <= gen_max)
-            ]
+            return self.backend.select(build_selection_filter(year, region, country, bounds))
         except KeyError as e:
             print(f"Erreur de colonne manquante lors du filtrage : {e}")
-        
-        return df
\ No newline at end of file
+            return pd.DataFrame()
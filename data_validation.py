@@ -0,0 +1,158 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+# Schéma attendu du fichier (colonne -> type) : "text" ou "number"
+EXPECTED_SCHEMA = {
+    "Year": "text",
+    "Country": "text",
+    "Region": "text",
+    "Happiness Rank": "number",
+    "Happiness Score": "number",
+    "Economy (GDP per Capita)": "number",
+    "Family": "number",
+    "Health (Life Expectancy)": "number",
+    "Freedom": "number",
+    "Trust (Government Corruption)": "number",
+    "Generosity": "number",
+}
+
+# Nombre maximal de positions de lignes gardées comme exemples par problème
+MAX_EXAMPLE_ROWS = 20
+
+SEVERITY_ORDER = {"erreur": 0, "avertissement": 1, "info": 2}
+
+
+@dataclass
+class ValidationIssue:
+    """Un problème détecté : contrôle, gravité, message, nombre de lignes et exemples de positions."""
+    check: str
+    severity: str
+    message: str
+    count: int = 0
+    rows: list = field(default_factory=list)
+
+
+class ValidationReport:
+    """Rapport structuré de la validation d'un jeu de données."""
+    def __init__(self, n_rows):
+        self.n_rows = n_rows
+        self.issues = []
+
+    def add(self, check, severity, message, mask=None, count=None):
+        rows = []
+        if mask is not None:
+            positions = np.flatnonzero(mask)
+            count = len(positions) if count is None else count
+            rows = positions[:MAX_EXAMPLE_ROWS].tolist()
+        self.issues.append(ValidationIssue(check, severity, message, count or 0, rows))
+
+    def count(self, severity):
+        return sum(1 for issue in self.issues if issue.severity == severity)
+
+    @property
+    def has_errors(self):
+        return self.count("erreur") > 0
+
+    def summary(self):
+        if not self.issues:
+            return f"Validation : {self.n_rows} lignes, aucun problème détecté"
+        return (f"Validation : {self.n_rows} lignes, {self.count('erreur')} erreur(s), "
+                f"{self.count('avertissement')} avertissement(s)")
+
+    def to_frame(self):
+        """Rapport sous forme de DataFrame (trié par gravité), pratique pour l'affichage ou l'export."""
+        frame = pd.DataFrame([vars(issue) for issue in self.issues],
+                             columns=["check", "severity", "message", "count", "rows"])
+        return frame.sort_values("severity", key=lambda s: s.map(SEVERITY_ORDER), kind="stable")
+
+
+def _numeric(df, column):
+    return pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+
+def validate_dataset(df, bounds=None):
+    """
+    Valide le jeu de données en un passage vectorisé (aucune boucle sur les lignes) :
+    schéma et types, bornes des indicateurs (celles des filtres des onglets), doublons (Country, Year),
+    cohérence Rang/Score par année, valeurs manquantes et région unique par pays.
+
+    :param bounds: Dictionnaire {colonne: (min, max)} des bornes attendues
+    """
+    report = ValidationReport(len(df))
+    bounds = bounds or {}
+
+    # --- 1. Schéma et types ---
+    missing = [c for c in EXPECTED_SCHEMA if c not in df.columns]
+    if missing:
+        report.add("schéma", "erreur", f"Colonnes manquantes : {', '.join(missing)}", count=len(missing))
+    extra = [c for c in df.columns if c not in EXPECTED_SCHEMA]
+    if extra:
+        report.add("schéma", "info", f"Colonnes non utilisées : {', '.join(map(str, extra))}", count=len(extra))
+
+    present = [c for c in EXPECTED_SCHEMA if c in df.columns]
+    for column in present:
+        if EXPECTED_SCHEMA[column] != "number":
+            continue
+        if not pd.api.types.is_numeric_dtype(df[column].dtype):
+            # Valeurs non convertibles en nombre (texte dans une colonne numérique)
+            bad = df[column].notna().to_numpy() & np.isnan(_numeric(df, column))
+            report.add("types", "erreur", f"{column} : type {df[column].dtype} au lieu d'un nombre", mask=bad)
+
+    if "Happiness Rank" in df.columns:
+        rank = _numeric(df, "Happiness Rank")
+        not_integer = ~np.isnan(rank) & (rank != np.round(rank))
+        if not_integer.any():
+            report.add("types", "avertissement", "Happiness Rank : valeurs non entières", mask=not_integer)
+
+    # --- 2. Valeurs manquantes ---
+    if present:
+        nulls = df[present].isna().to_numpy()
+        for j in np.flatnonzero(nulls.any(axis=0)):
+            report.add("valeurs manquantes", "avertissement", f"{present[j]} : valeurs manquantes", mask=nulls[:, j])
+
+    # --- 3. Bornes des indicateurs (spinbox des onglets) ---
+    for column, (low, high) in bounds.items():
+        if column not in df.columns:
+            continue
+        values = _numeric(df, column)
+        with np.errstate(invalid="ignore"):
+            outside = (values < low) | (values > high)
+        if outside.any():
+            report.add("bornes", "avertissement",
+                       f"{column} : valeurs hors de [{low}, {high}] (invisibles avec les filtres par défaut)",
+                       mask=outside)
+
+    # --- 4. Doublons (Country, Year) ---
+    if "Country" in df.columns and "Year" in df.columns:
+        duplicated = df.duplicated(subset=["Country", "Year"], keep=False).to_numpy()
+        if duplicated.any():
+            report.add("doublons", "erreur", "Clés (Country, Year) en double", mask=duplicated)
+
+    # --- 5. Cohérence Rang / Score ---
+    # Dans une même année, un meilleur rang (plus petit) doit avoir un score supérieur ou égal.
+    # Les rangs peuvent avoir des trous (pays absents du fichier) : on contrôle l'ordre, pas les valeurs.
+    if {"Year", "Happiness Rank", "Happiness Score"} <= set(df.columns):
+        year_codes = pd.factorize(df["Year"])[0]
+        rank = _numeric(df, "Happiness Rank")
+        score = _numeric(df, "Happiness Score")
+        order = np.lexsort((rank, year_codes))
+        same_year = year_codes[order][1:] == year_codes[order][:-1]
+        inverted = same_year & (score[order][1:] > score[order][:-1] + 1e-9)
+        inconsistent = np.zeros(len(df), dtype=bool)
+        inconsistent[order[1:][inverted]] = True
+        if inconsistent.any():
+            report.add("rang/score", "avertissement",
+                       "Happiness Rank ne suit pas l'ordre des scores de l'année", mask=inconsistent)
+
+    # --- 6. Une seule région par pays ---
+    if "Country" in df.columns and "Region" in df.columns:
+        n_regions = df.groupby("Country", observed=True)["Region"].transform("nunique").to_numpy()
+        several = n_regions > 1
+        if several.any():
+            n_countries = df.loc[several, "Country"].nunique()
+            report.add("régions", "avertissement",
+                       f"{n_countries} pays associés à plusieurs régions", mask=several)
+
+    return report
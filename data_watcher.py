@@ -0,0 +1,60 @@
+import bisect
+
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+from PyQt6.QtWidgets import QComboBox
+
+# Surveillance du fichier de données : quand des lignes sont ajoutées, la fenêtre principale demande au
+# DataManager de lire seulement la fin du fichier (voir csv_tail.py) puis complète les listes des onglets.
+
+
+class DataFileWatcher(QObject):
+    """
+    Surveille un fichier et émet changed une fois les écritures terminées (délai sans nouvelle
+    modification), pour ne pas relire un fichier à chaque bloc écrit par le programme d'ajout.
+    """
+    changed = pyqtSignal()
+
+    def __init__(self, path, delay_ms=500, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.watcher = QFileSystemWatcher(self)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay_ms)
+        self.timer.timeout.connect(self.changed)
+        self.watcher.fileChanged.connect(self.on_file_changed)
+
+    def set_enabled(self, enabled):
+        if enabled and self.path not in self.watcher.files():
+            self.watcher.addPath(self.path)
+        elif not enabled:
+            self.timer.stop()
+            if self.watcher.files():
+                self.watcher.removePaths(self.watcher.files())
+
+    def is_enabled(self):
+        return bool(self.watcher.files())
+
+    def on_file_changed(self, path):
+        # Certains programmes remplacent le fichier : le chemin sort alors de la surveillance
+        if path not in self.watcher.files():
+            self.watcher.addPath(path)
+        self.timer.start()
+
+
+def insert_sorted_items(widget, values, first=0):
+    """
+    Insère des valeurs dans une liste déroulante ou une liste (QComboBox / QListWidget) déjà triée,
+    à leur place alphabétique, sans reconstruire les éléments existants (sélection conservée).
+
+    :param first: Nombre d'éléments fixes en tête de liste (ex : "Toutes"), laissés en place
+    """
+    is_combo = isinstance(widget, QComboBox)
+    texts = [widget.itemText(i) if is_combo else widget.item(i).text() for i in range(first, widget.count())]
+    widget.blockSignals(True)
+    for value in sorted(values):
+        position = bisect.bisect_left(texts, value)
+        texts.insert(position, value)
+        # Même signature pour les deux widgets : insertItem(position, texte)
+        widget.insertItem(first + position, value)
+    widget.blockSignals(False)
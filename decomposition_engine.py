@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+# Indicateurs qui composent le score : l'écart de score entre deux années se décompose en
+# somme des écarts de ces indicateurs, plus un résidu (part non expliquée, "Dystopia + résidu").
+COMPONENTS = [
+    "Economy (GDP per Capita)", "Family", "Health (Life Expectancy)",
+    "Freedom", "Trust (Government Corruption)", "Generosity",
+]
+RESIDUAL = "Résidu"
+
+
+class ScoreDecomposition:
+    """
+    Cube Pays × Année × (Score + indicateurs) construit une fois à partir du DataFrame.
+    La décomposition entre deux années est alors une simple différence de deux tranches du cube,
+    calculée pour tous les pays à la fois.
+    """
+    def __init__(self, df, panel=None):
+        """
+        :param panel: Tableau dense CountryYearPanel déjà construit (voir panel_engine.py) ;
+                      le cube en est extrait sans réaligner les lignes
+        """
+        self.columns = ["Happiness Score"] + [c for c in COMPONENTS if c in df.columns]
+        if panel is not None and set(self.columns) <= set(panel.columns):
+            self.countries, self.years = panel.countries, panel.years
+            self.cube = panel.values[:, :, [panel.columns.index(c) for c in self.columns]]
+        else:
+            country_codes, self.countries = pd.factorize(df['Country'].astype(str), sort=True)
+            year_codes, self.years = pd.factorize(df['Year'].astype(str), sort=True)
+
+            self.cube = np.full((len(self.countries), len(self.years), len(self.columns)), np.nan)
+            # En cas de doublon (Country, Year), la dernière ligne l'emporte
+            self.cube[country_codes, year_codes] = df[self.columns].to_numpy(dtype=float, na_value=np.nan)
+        self._year_pos = {y: i for i, y in enumerate(self.years)}
+
+    def between(self, year_from, year_to):
+        """
+        Contribution de chaque indicateur à l'évolution du score entre deux années, pour tous les pays
+        présents les deux années. Colonnes : score de départ, score d'arrivée, écart, un écart par
+        indicateur (NaN si l'indicateur manque une des deux années) et le résidu (écart de score non
+        expliqué par les indicateurs disponibles).
+        """
+        columns = ["Score départ", "Score arrivée", "Δ Score"] + self.columns[1:] + [RESIDUAL]
+        i, j = self._year_pos.get(str(year_from)), self._year_pos.get(str(year_to))
+        if i is None or j is None:
+            return pd.DataFrame(columns=columns)
+
+        start, end = self.cube[:, i], self.cube[:, j]
+        delta = end - start
+        present = ~np.isnan(delta[:, 0])
+        # Un indicateur manquant une des deux années ne contribue pas : son écart reste dans le résidu,
+        # et départ + contributions disponibles + résidu = arrivée pour chaque pays
+        residual = delta[:, 0] - np.nansum(delta[:, 1:], axis=1)
+
+        data = np.column_stack([start[:, 0], end[:, 0], delta, residual])[present]
+        return pd.DataFrame(data, index=pd.Index(self.countries[present], name='Country'), columns=columns)
@@ -0,0 +1,42 @@
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem,
+                             QDialogButtonBox, QHeaderView)
+from PyQt6.QtGui import QColor
+
+# Couleur de fond de la ligne selon la gravité
+SEVERITY_COLORS = {"erreur": "#F8D7DA", "avertissement": "#FFF3CD", "info": "#E2E3E5"}
+
+
+class ValidationDialog(QDialog):
+    """
+    Fenêtre affichant le rapport de validation des données (un problème par ligne).
+    La colonne "Exemples" donne les premières lignes concernées avec leur pays et leur année.
+    """
+    def __init__(self, report, df, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Rapport de validation des données")
+        self.resize(900, 400)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel(f"<b>{report.summary()}</b>"))
+
+        frame = report.to_frame()
+        table = QTableWidget(len(frame), 5)
+        table.setHorizontalHeaderLabels(["Contrôle", "Gravité", "Message", "Lignes", "Exemples"])
+
+        for i, issue in enumerate(frame.itertuples(index=False)):
+            # Exemples lisibles : "Pays (Année)" pour les premières lignes concernées
+            examples = ", ".join(f"{df['Country'].iloc[r]} ({df['Year'].iloc[r]})" for r in issue.rows[:5]) \
+                if {"Country", "Year"} <= set(df.columns) else ""
+            values = [issue.check, issue.severity, issue.message, str(issue.count), examples]
+            for j, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                item.setBackground(QColor(SEVERITY_COLORS.get(issue.severity, "#FFFFFF")))
+                table.setItem(i, j, item)
+
+        table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
+        table.resizeColumnsToContents()
+        layout.addWidget(table)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
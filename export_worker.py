@@ -0,0 +1,47 @@
+import threading
+
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+
+
+class ExportWorker(QObject):
+    """
+    Export des lignes filtrées dans un thread séparé (l'interface reste utilisable pendant l'écriture).
+    Usage : créer le worker puis appeler start() ; cancel() peut être appelé depuis l'interface.
+    """
+    progress = pyqtSignal(int, int)   # (lignes écrites, total)
+    finished = pyqtSignal(bool, str, int)  # (export terminé ? False si annulé, chemin du fichier, lignes exportées)
+    failed = pyqtSignal(str)          # message d'erreur
+
+    def __init__(self, data_manager, rows, path, fmt=None):
+        super().__init__()
+        self.data_manager = data_manager
+        self.rows = rows
+        # Nombre de lignes de l'export, fixé au lancement (la sélection de l'onglet peut changer pendant l'écriture)
+        self.total = len(rows)
+        self.path = path
+        self.fmt = fmt
+        self._cancel = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """Lance l'export dans un QThread dédié, arrêté automatiquement à la fin."""
+        self.thread = QThread()
+        self.moveToThread(self.thread)
+        self.thread.started.connect(self.run)
+        self.finished.connect(self.thread.quit)
+        self.failed.connect(self.thread.quit)
+        self.thread.start()
+
+    def cancel(self):
+        # Simple drapeau thread-safe, lu entre deux blocs par export_rows
+        self._cancel.set()
+
+    def run(self):
+        try:
+            done = self.data_manager.export_rows(self.rows, self.path, self.fmt,
+                                                 progress=self.progress.emit,
+                                                 is_cancelled=self._cancel.is_set)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.finished.emit(done, self.path, self.total)
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+# Petits multiples : un panneau par région (ou par année) sur une grille à axes partagés.
+# Les données de tous les panneaux sont calculées en un seul passage groupé (bincount sur un code
+# combiné groupe × abscisse, ou un tri stable puis découpage), jamais panneau par panneau.
+
+# Découpages proposés (None = un seul graphique)
+FACETS = {
+    None: "Un seul graphique",
+    "Region": "Un panneau par région",
+    "Year": "Un panneau par année",
+}
+
+# Au-delà de ce nombre de points, les artistes d'un panneau sont rastérisés (export vectoriel léger)
+DENSE_PANEL_POINTS = 1000
+
+
+def grid_shape(n):
+    """Nombre de lignes et de colonnes d'une grille presque carrée pour n panneaux."""
+    if n <= 0:
+        return 0, 0
+    ncols = int(np.ceil(np.sqrt(n)))
+    return int(np.ceil(n / ncols)), ncols
+
+
+def facet_codes(df, by):
+    """
+    Code de groupe de chaque ligne et libellés des groupes (triés).
+
+    :param by: Colonne de découpage ("Region" ou "Year")
+    """
+    codes, labels = pd.factorize(df[by].astype(str), sort=True)
+    return codes, np.asarray(labels, dtype=object)
+
+
+def grouped_mean(group_codes, n_groups, x_codes, n_x, values):
+    """
+    Moyenne de values pour chaque couple (groupe, abscisse), en un seul passage.
+    Renvoie une matrice groupes × abscisses (NaN si la case est vide).
+    """
+    values = np.asarray(values, dtype=float)
+    keep = ~np.isnan(values) & (x_codes >= 0)
+    flat = group_codes[keep] * n_x + x_codes[keep]
+    sums = np.bincount(flat, weights=values[keep], minlength=n_groups * n_x)
+    counts = np.bincount(flat, minlength=n_groups * n_x)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan).reshape(n_groups, n_x)
+
+
+def grouped_counts(group_codes, n_groups, x_codes, n_x):
+    """Nombre de lignes de chaque couple (groupe, abscisse) ; les codes négatifs sont ignorés."""
+    keep = x_codes >= 0
+    flat = group_codes[keep] * n_x + x_codes[keep]
+    return np.bincount(flat, minlength=n_groups * n_x).reshape(n_groups, n_x)
+
+
+def split_groups(group_codes, n_groups):
+    """Positions des lignes de chaque groupe : un tri stable puis un découpage (ordre des lignes conservé)."""
+    order = np.argsort(group_codes, kind="stable")
+    bounds = np.cumsum(np.bincount(group_codes, minlength=n_groups))[:-1]
+    return np.split(order, bounds)
+
+
+def padded_limits(*arrays, margin=0.05):
+    """Limites (min, max) communes à tous les panneaux, avec une marge ; None si aucune valeur."""
+    values = np.concatenate([np.asarray(a, dtype=float).ravel() for a in arrays]) if arrays else np.array([])
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return None
+    low, high = values.min(), values.max()
+    pad = (high - low) * margin or 0.5
+    return low - pad, high + pad
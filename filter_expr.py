@@ -0,0 +1,354 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# =========================================================================
+# EXPRESSIONS DE FILTRAGE
+# =========================================================================
+# Un filtre est un petit arbre d'expressions (prédicats + opérateurs logiques) :
+#
+#     And(IsIn("Year", ["2019"]),
+#         Or(Range("Freedom", low=0.5), IsNull("Freedom")),
+#         Range(Derived("Family + Freedom"), high=1.5))
+#
+# L'arbre est compilé (aplatissement, fusion des bornes) puis évalué en un seul passage
+# vectorisé : dans un And, le prédicat le plus sélectif est évalué en premier et les suivants
+# ne sont évalués que sur les lignes encore retenues.
+
+
+@dataclass(frozen=True)
+class Derived:
+    """
+    Colonne dérivée, calculée par pandas.eval sur le DataFrame.
+    Les noms de colonnes contenant des espaces s'écrivent entre accents graves :
+    Derived("`Economy (GDP per Capita)` + Family")
+    """
+    expression: str
+
+
+@dataclass(frozen=True)
+class Range:
+    """Intervalle fermé [low, high] (None = pas de borne). Les valeurs manquantes sont exclues sauf si keep_null=True."""
+    column: object
+    low: float = None
+    high: float = None
+    keep_null: bool = False
+
+
+@dataclass(frozen=True)
+class IsIn:
+    """Valeur appartenant à une liste (None dans la liste accepte les valeurs manquantes)."""
+    column: object
+    values: tuple
+    negate: bool = False
+
+    def __post_init__(self):
+        # Un tuple garde l'expression hachable (utile pour la mise en cache)
+        object.__setattr__(self, 'values', tuple(self.values))
+
+
+@dataclass(frozen=True)
+class IsNull:
+    """Valeur manquante (ou présente si negate=True)."""
+    column: object
+    negate: bool = False
+
+
+@dataclass(frozen=True, init=False)
+class And:
+    """Toutes les conditions doivent être vraies (And() sans condition accepte toutes les lignes)."""
+    children: tuple
+
+    def __init__(self, *children):
+        object.__setattr__(self, 'children', tuple(children))
+
+
+@dataclass(frozen=True, init=False)
+class Or:
+    """Au moins une condition doit être vraie (Or() sans condition n'accepte aucune ligne)."""
+    children: tuple
+
+    def __init__(self, *children):
+        object.__setattr__(self, 'children', tuple(children))
+
+
+@dataclass(frozen=True)
+class Not:
+    """Négation d'une condition."""
+    child: object
+
+
+# =========================================================================
+# CONTEXTE D'ÉVALUATION (tableaux en cache)
+# =========================================================================
+class FilterContext:
+    """
+    Garde en cache, pour un DataFrame donné, les tableaux NumPy utilisés par les filtres :
+    valeurs numériques, codes des colonnes texte (factorisation), masques des valeurs manquantes
+    et colonnes dérivées. Un même contexte sert pour tous les filtres appliqués au même DataFrame.
+
+    range_index : fonction colonne -> SortedColumnIndex (ou None) qui permet de résoudre les
+    intervalles par recherche dichotomique plutôt que par comparaison sur toute la colonne.
+    """
+    # Taille de l'échantillon utilisé pour estimer la sélectivité d'un prédicat
+    SAMPLE_SIZE = 512
+
+    def __init__(self, df, range_index=None):
+        self.df = df
+        self.range_index = range_index
+        self.n_rows = len(df)
+        self._series = {}
+        self._numeric = {}
+        self._codes = {}
+        self._nulls = {}
+        step = max(1, self.n_rows // self.SAMPLE_SIZE)
+        self._sample = np.arange(0, self.n_rows, step)
+        # Contexte précédent dont celui-ci prolonge les lignes (voir extended)
+        self.extends = None
+
+    def extended(self, df):
+        '''
+        Contexte pour df = DataFrame de ce contexte + lignes ajoutées à la fin. Les tableaux déjà en cache
+        sont prolongés avec les seules nouvelles lignes ; les valeurs texte inédites reçoivent de nouveaux
+        codes (les codes existants ne changent pas). Les colonnes dérivées sont recalculées à la demande.
+        '''
+        ctx = FilterContext(df, self.range_index)
+        added = df.iloc[self.n_rows:]
+        for column, values in self._numeric.items():
+            if not isinstance(column, Derived):
+                ctx._numeric[column] = np.concatenate([values, added[column].to_numpy(dtype=float, na_value=np.nan)])
+        for column, (codes, uniques) in self._codes.items():
+            if isinstance(column, Derived):
+                continue
+            new_values = added[column]
+            new_codes = uniques.get_indexer(new_values)
+            unseen = (new_codes < 0) & new_values.notna().to_numpy()
+            if unseen.any():
+                extra_codes, extra_uniques = pd.factorize(new_values[unseen])
+                new_codes[unseen] = len(uniques) + extra_codes
+                uniques = uniques.append(pd.Index(extra_uniques))
+            ctx._codes[column] = (np.concatenate([codes, new_codes]), uniques)
+        for column, nulls in self._nulls.items():
+            if not isinstance(column, Derived):
+                ctx._nulls[column] = np.concatenate([nulls, added[column].isna().to_numpy()])
+        # Un seul maillon : les caches qui suivaient ce contexte peuvent se prolonger, pas les plus anciens
+        ctx.extends = self
+        self.extends = None
+        return ctx
+
+    def series(self, column):
+        if column not in self._series:
+            if isinstance(column, Derived):
+                self._series[column] = self.df.eval(column.expression)
+            else:
+                self._series[column] = self.df[column]
+        return self._series[column]
+
+    def numeric(self, column):
+        if column not in self._numeric:
+            self._numeric[column] = self.series(column).to_numpy(dtype=float, na_value=np.nan)
+        return self._numeric[column]
+
+    def codes(self, column):
+        """Codes entiers (-1 = manquant) et valeurs distinctes d'une colonne, calculés une seule fois."""
+        if column not in self._codes:
+            s = self.series(column)
+            if isinstance(s.dtype, pd.CategoricalDtype):
+                self._codes[column] = (np.asarray(s.array.codes), s.cat.categories)
+            else:
+                codes, uniques = pd.factorize(s)
+                self._codes[column] = (codes, pd.Index(uniques))
+        return self._codes[column]
+
+    def nulls(self, column):
+        if column not in self._nulls:
+            self._nulls[column] = self.series(column).isna().to_numpy()
+        return self._nulls[column]
+
+    def index_for(self, node):
+        """Index trié utilisable pour un prédicat Range (None si la colonne n'est pas indexée)."""
+        if self.range_index is None or not isinstance(node, Range) or isinstance(node.column, Derived):
+            return None
+        return self.range_index(node.column)
+
+    def selectivity(self, node):
+        """
+        Proportion de lignes retenues par un nœud : exacte pour un intervalle indexé (recherche dichotomique),
+        estimée sur un échantillon régulier sinon.
+        """
+        if self.n_rows == 0:
+            return 1.0
+        index = self.index_for(node)
+        if index is not None:
+            return index.count(node.low, node.high, node.keep_null) / self.n_rows
+        return float(_evaluate(node, self, self._sample).mean())
+
+    def prune(self, node):
+        '''
+        Simplifie un prédicat d'intervalle grâce à l'index : un intervalle qui couvre toute la plage des
+        valeurs ne filtre que les valeurs manquantes (IsNull), voire rien du tout (None) si la colonne est complète.
+        '''
+        index = self.index_for(node)
+        if index is None or not index.covers(node.low, node.high):
+            return node
+        if node.keep_null or not index.has_nulls:
+            return None
+        return IsNull(node.column, negate=True)
+
+
+def _take(values, rows):
+    return values if rows is None else values[rows]
+
+
+def _leaf_mask(node, ctx, rows):
+    if isinstance(node, Range):
+        values = _take(ctx.numeric(node.column), rows)
+        mask = np.ones(len(values), dtype=bool)
+        with np.errstate(invalid='ignore'):
+            if node.low is not None:
+                mask &= values >= node.low
+            if node.high is not None:
+                mask &= values <= node.high
+        if node.keep_null:
+            mask |= np.isnan(values)
+        return mask
+
+    if isinstance(node, IsNull):
+        mask = _take(ctx.nulls(node.column), rows)
+        return ~mask if node.negate else mask.copy()
+
+    if isinstance(node, IsIn):
+        codes, uniques = ctx.codes(node.column)
+        wanted = [v for v in node.values if not pd.isna(v)]
+        allowed = uniques.get_indexer(wanted)
+        allowed = allowed[allowed >= 0]
+        if len(wanted) < len(node.values):
+            allowed = np.append(allowed, -1)
+        mask = np.isin(_take(codes, rows), allowed)
+        return ~mask if node.negate else mask
+
+    raise TypeError(f"Expression de filtre inconnue : {node!r}")
+
+
+def _evaluate(node, ctx, rows):
+    '''
+    Évalue un nœud sur les lignes indiquées (positions, ou None pour toutes les lignes).
+    Renvoie un masque booléen de la même longueur que rows.
+    '''
+    n = ctx.n_rows if rows is None else len(rows)
+
+    if isinstance(node, And):
+        # Les intervalles à leur plage complète sont ignorés (voir FilterContext.prune)
+        children = [c for c in map(ctx.prune, node.children) if c is not None]
+        # Le prédicat le plus sélectif d'abord : les suivants ne voient que les lignes survivantes
+        children.sort(key=ctx.selectivity)
+
+        index = ctx.index_for(children[0]) if (rows is None and children) else None
+        if index is not None:
+            # Le plus petit ensemble de lignes est obtenu directement par recherche dichotomique ;
+            # les autres ensembles (du plus petit au plus grand) sont intersectés en testant
+            # uniquement les lignes survivantes.
+            first = children.pop(0)
+            survivors = np.sort(index.rows(first.low, first.high, first.keep_null))
+        else:
+            survivors = np.arange(n)
+
+        for child in children:
+            if len(survivors) == 0:
+                break
+            positions = survivors if rows is None else rows[survivors]
+            survivors = survivors[_evaluate(child, ctx, positions)]
+        mask = np.zeros(n, dtype=bool)
+        mask[survivors] = True
+        return mask
+
+    if isinstance(node, Or):
+        # Le prédicat le plus large d'abord : les suivants ne voient que les lignes pas encore retenues
+        mask = np.zeros(n, dtype=bool)
+        remaining = np.arange(n)
+        for child in sorted(node.children, key=ctx.selectivity, reverse=True):
+            if len(remaining) == 0:
+                break
+            positions = remaining if rows is None else rows[remaining]
+            hit = _evaluate(child, ctx, positions)
+            mask[remaining[hit]] = True
+            remaining = remaining[~hit]
+        return mask
+
+    if isinstance(node, Not):
+        return ~_evaluate(node.child, ctx, rows)
+
+    if rows is None and ctx.index_for(node) is not None:
+        # Intervalle seul sur toute la colonne : les lignes viennent directement de l'index trié
+        node = ctx.prune(node)
+        if node is None:
+            return np.ones(n, dtype=bool)
+        if isinstance(node, Range):
+            mask = np.zeros(n, dtype=bool)
+            mask[ctx.index_for(node).rows(node.low, node.high, node.keep_null)] = True
+            return mask
+
+    return _leaf_mask(node, ctx, rows)
+
+
+# =========================================================================
+# COMPILATION
+# =========================================================================
+def _simplify(node):
+    '''Aplatit les And/Or imbriqués, supprime les doubles négations et fusionne les bornes d'une même colonne.'''
+    if isinstance(node, Not):
+        child = _simplify(node.child)
+        return child.child if isinstance(child, Not) else Not(child)
+
+    if isinstance(node, (And, Or)):
+        kind = type(node)
+        flat = []
+        for child in node.children:
+            child = _simplify(child)
+            if isinstance(child, kind):
+                flat.extend(child.children)
+            else:
+                flat.append(child)
+
+        if kind is And:
+            # Fusion des intervalles portant sur la même colonne : [max des min, min des max]
+            merged, others = {}, []
+            for child in flat:
+                if isinstance(child, Range):
+                    key = (child.column, child.keep_null)
+                    if key in merged:
+                        prev = merged[key]
+                        lows = [v for v in (prev.low, child.low) if v is not None]
+                        highs = [v for v in (prev.high, child.high) if v is not None]
+                        child = Range(child.column, max(lows) if lows else None,
+                                      min(highs) if highs else None, child.keep_null)
+                    merged[key] = child
+                else:
+                    others.append(child)
+            flat = others + list(merged.values())
+
+        if len(flat) == 1:
+            return flat[0]
+        return kind(*flat)
+
+    return node
+
+
+class CompiledFilter:
+    """Filtre compilé, réutilisable sur n'importe quel contexte (FilterContext)."""
+    def __init__(self, expr):
+        self.expr = _simplify(expr)
+
+    def mask(self, ctx, rows=None):
+        """Masque booléen sur toutes les lignes du contexte, ou sur les positions rows seulement."""
+        return _evaluate(self.expr, ctx, rows)
+
+    def rows(self, ctx):
+        """Positions (croissantes) des lignes retenues."""
+        return np.flatnonzero(self.mask(ctx))
+
+
+def compile_filter(expr):
+    """Compile une expression de filtre."""
+    return CompiledFilter(expr)
@@ -0,0 +1,72 @@
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from data_manager import build_selection_slots
+
+# État de filtre partagé par les onglets qui ont les mêmes filtres (Année, Région, Pays, bornes Min/Max) :
+# Exploration et Carte. En mode lié, un changement de filtre dans un onglet est évalué une seule fois
+# (un MaskCache commun) puis diffusé : les autres onglets recopient les valeurs dans leurs widgets et,
+# s'ils sont masqués, sont seulement marqués « à recalculer » jusqu'à leur prochain affichage.
+
+
+def read_filter_widgets(tab):
+    """Valeurs des filtres communs d'un onglet (combo_year, combo_region, combo_country, range_spins)."""
+    return {
+        "year": tab.combo_year.currentText(),
+        "region": tab.combo_region.currentText(),
+        "country": tab.combo_country.currentText(),
+        "bounds": {col: (spin_min.value(), spin_max.value()) for col, (spin_min, spin_max) in tab.range_spins.items()},
+    }
+
+
+def write_filter_widgets(tab, filters):
+    """Recopie les valeurs des filtres communs dans les widgets d'un onglet, sans déclencher de rafraîchissement."""
+    widgets = [tab.combo_year, tab.combo_region, tab.combo_country]
+    widgets += [spin for pair in tab.range_spins.values() for spin in pair]
+    for w in widgets:
+        w.blockSignals(True)
+    for combo, key in ((tab.combo_year, "year"), (tab.combo_region, "region"), (tab.combo_country, "country")):
+        if combo.findText(filters[key]) >= 0:
+            combo.setCurrentText(filters[key])
+    for col, (low, high) in filters["bounds"].items():
+        if col in tab.range_spins:
+            tab.range_spins[col][0].setValue(low)
+            tab.range_spins[col][1].setValue(high)
+    for w in widgets:
+        w.blockSignals(False)
+
+
+class FilterState(QObject):
+    """
+    Filtres communs des onglets liés, détenus par la fenêtre principale.
+    - rows_for : sélection des lignes pour des filtres (évaluée une fois, cache de masques commun),
+    - changed(source, filtres) : émis quand un onglet change les filtres, pour les autres onglets abonnés.
+    """
+    changed = pyqtSignal(object, object)
+
+    def __init__(self, data_manager, parent=None):
+        super().__init__(parent)
+        self.data_manager = data_manager
+        self.mask_cache = data_manager.create_mask_cache()
+        self.linked = False
+        self.filters = None
+
+    def set_linked(self, linked, source=None):
+        """
+        Active ou coupe le mode lié. À l'activation, les filtres de l'onglet source (l'onglet affiché)
+        deviennent ceux de tous les onglets liés.
+        """
+        self.linked = linked
+        self.filters = None
+        if linked and source is not None:
+            self.rows_for(source, read_filter_widgets(source))
+
+    def rows_for(self, source, filters):
+        """
+        Positions des lignes retenues par les filtres communs. Si les filtres ont changé, le changement
+        est diffusé aux autres onglets liés (après l'évaluation : ils réutilisent le même résultat).
+        """
+        rows = self.mask_cache.rows(build_selection_slots(**filters))
+        if filters != self.filters:
+            self.filters = filters
+            self.changed.emit(source, filters)
+        return rows
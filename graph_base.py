@@ -1,8 +1,16 @@
 import sys
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QSizePolicy
+import io
+from multiprocessing import shared_memory
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QSizePolicy, QLabel, QStackedWidget, QStackedLayout
+from PyQt6.QtGui import QPixmap, QImage
+from PyQt6.QtCore import Qt, pyqtSignal, QByteArray, QBuffer, QIODevice
 # Import du "backend" spécifique qui permet à Matplotlib de s'afficher DANS une fenêtre Qt
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
+from matplotlib.ticker import MaxNLocator
+from render_pool import draw_spec, get_render_pool, release_shared_raster
+from raster_cache import get_raster_cache
+from facet_engine import grid_shape
 import matplotlib.pyplot as plt
 
 class GraphBase(QWidget):
@@ -10,9 +18,30 @@ class GraphBase(QWidget):
     Classe de base pour tous les widgets graphiques.
     Elle prépare le terrain (la toile vide) où les courbes et barres seront dessinées.
     Elle hérite de QWidget pour pouvoir être intégrée dans l'interface PyQt.
+
+    Deux modes de rendu :
+    - "interactive" : tracé directement dans le canvas Qt (par défaut),
+    - "process" : les specs de graphique (voir render_pool.py) sont dessinées par un pool de processus
+      et l'image revient par mémoire partagée ; l'interface n'est pas bloquée pendant le tracé.
     """
+    # Signal émis (depuis un thread du pool) quand une image rendue hors processus est prête
+    raster_ready = pyqtSignal(int, object)
+    # Le canvas a été redimensionné pendant qu'une image (cache ou processus) était affichée :
+    # son contenu ne correspond pas forcément à la vue, l'onglet doit la redessiner
+    stale_view = pyqtSignal()
+
     def __init__(self):
         super().__init__()
+
+        self.render_mode = "interactive"
+        # Numéro de la dernière demande de rendu : les réponses plus anciennes sont ignorées
+        self._render_token = 0
+        self.raster_ready.connect(self._on_raster_ready)
+        # Clé de cache de la vue affichée, et de la vue en cours de rendu hors processus
+        self.current_view_key = None
+        self._pending_key = None
+        # True quand une image est affichée et que les axes Matplotlib contiennent une autre vue
+        self._canvas_stale = False
         
         # --- GESTION DU REDIMENSIONNEMENT ---
         # Définit la politique de taille du widget sur "Expanding".
@@ -37,7 +66,12 @@ class GraphBase(QWidget):
         self.canvas = FigureCanvas(self.figure)
         
         # 3. Ajout du Canvas dans le layout de notre widget pour qu'il soit visible.
-        self.layout.addWidget(self.canvas)
+        # Le canvas et l'image (voir plus bas) sont empilés ; en mode StackAll, l'image recouvre le canvas
+        # sans le cacher : le canvas suit la taille de la zone même quand l'image est affichée.
+        self.stack = QStackedWidget()
+        self.stack.layout().setStackingMode(QStackedLayout.StackingMode.StackAll)
+        self.stack.addWidget(self.canvas)
+        self.layout.addWidget(self.stack)
         
         # --- CRÉATION DES AXES ---
         # add_subplot(111) signifie :
@@ -47,10 +81,243 @@ class GraphBase(QWidget):
         # C'est l'objet 'self.ax' qui servira à tracer les courbes (plot, bar, scatter...).
         self.ax = self.figure.add_subplot(111)
 
+        # --- PETITS MULTIPLES (voir grid_axes) ---
+        # Panneaux de la grille affichée (None = graphique unique sur self.ax)
+        self.grid = None
+        self._grid_key = None
+        # Artistes de chaque panneau (courbes, barres, nuages), réutilisés d'un rafraîchissement à l'autre
+        self.grid_artists = []
+        self._grid_labels = []
+
+        # --- IMAGE À LA PLACE DU CANVAS ---
+        # Sert à afficher l'image du dernier graphique de la session précédente (démarrage à chaud)
+        # jusqu'au premier vrai tracé, et les images rendues hors processus (mode "process").
+        self.image_label = QLabel()
+        self.image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        # La taille de l'image ne doit pas imposer de taille minimale à la zone du graphique
+        self.image_label.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
+        self.image_label.setAutoFillBackground(True)
+        self.stack.addWidget(self.image_label)
+        # Dès que Matplotlib dessine, l'image d'attente est retirée
+        self.canvas.mpl_connect('draw_event', self._on_canvas_drawn)
+        self.canvas.mpl_connect('resize_event', self._on_canvas_resized)
+
     def clear_ax(self):
         """
         Nettoie le graphique pour le prochain tracé.
         Indispensable avant de redessiner un graphe quand on change de filtre,
         sinon les anciens dessins restent en fond et tout se superpose.
         """
-        self.ax.clear()
\ No newline at end of file
+        self.cancel_pending_render()
+        if self.grid is not None:
+            # Retour au graphique unique : la grille de petits multiples est retirée
+            self.figure.clear()
+            self.ax = self.figure.add_subplot(111)
+            self.grid = None
+            self._grid_key = None
+            self.grid_artists = []
+            self._grid_labels = []
+        else:
+            self.ax.clear()
+
+    def cancel_pending_render(self):
+        """
+        À appeler avant tout tracé direct dans le canvas : une image encore en rendu hors processus
+        (mode "process") ne doit plus venir recouvrir ce tracé (voir _on_raster_ready).
+        """
+        self._render_token += 1
+        self._pending_key = None
+
+    def grid_axes(self, n, kind):
+        """
+        Renvoie (panneaux, reused) : n axes sur une grille presque carrée, à axes partagés.
+        Tant que le type de tracé et le nombre de panneaux ne changent pas, la grille et ses artistes
+        (self.grid_artists) sont réutilisés : reused = True, l'appelant met seulement les données à jour.
+        """
+        # Tracé direct dans le canvas, même quand la grille est réutilisée
+        self.cancel_pending_render()
+        if self.grid is not None and self._grid_key == (kind, n):
+            return self.grid, True
+        if self.grid is None:
+            # Les artistes gardés par les graphiques uniques (ex : barres de l'histogramme) ne sont plus valides
+            self.clear_ax()
+        self.figure.clear()
+        nrows, ncols = grid_shape(n)
+        axes = self.figure.subplots(nrows, ncols, sharex=True, sharey=True, squeeze=False).ravel()
+        for i, ax in enumerate(axes):
+            if i >= n:
+                ax.set_visible(False)
+            elif i + ncols >= n:
+                # Dernier panneau de sa colonne : il porte les graduations de l'axe X
+                ax.xaxis.set_tick_params(labelbottom=True)
+            ax.tick_params(labelsize=7)
+        # Les axes partagés partagent aussi leurs graduations : peu de graduations, moins de textes à dessiner
+        axes[0].xaxis.set_major_locator(MaxNLocator(5))
+        axes[0].yaxis.set_major_locator(MaxNLocator(4))
+        # Marges fixes : pas de tight_layout à chaque tracé (coûteux avec beaucoup d'axes)
+        self.figure.subplots_adjust(left=0.07, right=0.98, top=0.92, bottom=0.08, hspace=0.15, wspace=0.08)
+        self.grid = list(axes[:n])
+        self._grid_key = (kind, n)
+        self.grid_artists = [None] * n
+        # Nom de chaque panneau dans son coin (un texte dans l'axe : pas de placement de titre à calculer)
+        self._grid_labels = [ax.text(0.03, 0.95, "", transform=ax.transAxes, va='top', fontsize=8,
+                                     bbox=dict(facecolor='white', alpha=0.7, edgecolor='none', pad=1))
+                             for ax in self.grid]
+        self.ax = axes[0]
+        return self.grid, False
+
+    def set_panel_label(self, i, text):
+        self._grid_labels[i].set_text(text)
+
+    def finish_grid(self, title, xlim=None, ylim=None):
+        """
+        Met les limites partagées, le titre général et dessine la grille.
+        xlim / ylim : limites calculées par l'appelant à partir des données (sinon recalcul sur les artistes).
+        """
+        if xlim is None or ylim is None:
+            for ax in self.grid:
+                ax.relim()
+            self.grid[0].autoscale_view()
+        # Axes partagés : fixer les limites du premier panneau suffit
+        if xlim is not None:
+            self.grid[0].set_xlim(*xlim)
+        if ylim is not None:
+            self.grid[0].set_ylim(*ylim)
+        self.figure.suptitle(title)
+        self.canvas.draw()
+
+    def render_png(self):
+        """Renvoie le graphique actuel au format PNG (octets), pour l'instantané de session."""
+        if self._canvas_stale and self.image_label.pixmap() is not None:
+            # Image affichée (cache ou rendu hors processus) : les axes contiennent une autre vue
+            data = QByteArray()
+            qbuffer = QBuffer(data)
+            qbuffer.open(QIODevice.OpenModeFlag.WriteOnly)
+            self.image_label.pixmap().save(qbuffer, "PNG")
+            return bytes(data)
+        buffer = io.BytesIO()
+        self.figure.savefig(buffer, format='png', dpi=self.figure.dpi)
+        return buffer.getvalue()
+
+    def show_snapshot(self, png):
+        """Affiche une image PNG à la place du canvas jusqu'au prochain tracé."""
+        pixmap = QPixmap()
+        if not pixmap.loadFromData(png):
+            return
+        self._show_image(pixmap)
+
+    def _show_image(self, pixmap):
+        self.image_label.setPixmap(pixmap)
+        self.stack.setCurrentWidget(self.image_label)
+
+    def hide_snapshot(self):
+        self._canvas_stale = False
+        if self.stack.currentWidget() is not self.canvas:
+            self.stack.setCurrentWidget(self.canvas)
+            self.image_label.clear()
+
+    def _on_canvas_drawn(self, event):
+        # Le canvas affiche un nouveau tracé : la vue en cache affichée n'est plus celle-ci
+        # (store_view, appelé juste après le tracé d'une vue, remet sa clé)
+        self.current_view_key = None
+        self.hide_snapshot()
+
+    def _on_canvas_resized(self, event):
+        if self._canvas_stale:
+            # Les axes contiennent une autre vue que l'image affichée : on la fait redessiner
+            self.current_view_key = None
+            self.stale_view.emit()
+
+    # --- CACHE DES VUES DÉJÀ RENDUES (voir raster_cache.py) ---
+    def view_key(self, kind, signature):
+        """Clé de cache d'une vue : graphique, type de tracé, signature des données et taille du canvas."""
+        return (type(self).__name__, kind, signature,
+                self.canvas.width(), self.canvas.height(), self.canvas.devicePixelRatioF())
+
+    def show_cached(self, key):
+        """
+        Affiche la vue depuis le cache si elle y est (ou si elle est déjà affichée).
+        Renvoie False s'il faut la dessiner ; l'appelant dessine puis appelle store_view(key).
+        """
+        if key is None:
+            return False
+        if key == self.current_view_key:
+            return True
+        image = get_raster_cache().get(key)
+        if image is None:
+            return False
+        # Une éventuelle image encore en rendu hors processus ne doit pas remplacer celle-ci
+        self._render_token += 1
+        self._canvas_stale = True
+        self.current_view_key = key
+        self._show_image(QPixmap.fromImage(image))
+        return True
+
+    def store_view(self, key):
+        """Garde une copie de l'image du canvas (qui vient d'être dessiné) sous la clé de la vue."""
+        self.current_view_key = key
+        if key is None:
+            return
+        buffer = self.canvas.buffer_rgba()
+        height, width = buffer.shape[:2]
+        image = QImage(buffer, width, height, width * 4, QImage.Format.Format_RGBA8888).copy()
+        image.setDevicePixelRatio(self.canvas.devicePixelRatioF())
+        get_raster_cache().put(key, image, image.sizeInBytes())
+
+    # --- RENDU À PARTIR D'UNE SPEC ---
+    def set_render_mode(self, mode):
+        """Choisit le mode de rendu : "interactive" (canvas Matplotlib) ou "process" (pool de processus)."""
+        self.render_mode = mode
+        if mode == "interactive":
+            self.hide_snapshot()
+
+    def render_spec(self, spec, key=None):
+        """
+        Dessine une spec de graphique selon le mode de rendu courant.
+        key : clé de cache de la vue (voir view_key) ; l'image rendue y est gardée.
+        """
+        if self.show_cached(key):
+            return
+        self._render_token += 1
+        self._pending_key = key
+        if self.render_mode == "process":
+            # Taille en pixels de la zone d'affichage (le canvas peut être caché en mode process)
+            width, height = max(self.width(), 100), max(self.height(), 100)
+            future = get_render_pool().submit(spec, width, height, self.figure.dpi)
+            token = self._render_token
+            future.add_done_callback(lambda f: self.raster_ready.emit(token, f))
+            return
+
+        self.clear_ax()
+        draw_spec(self.ax, spec)
+        self.figure.tight_layout()
+        self.canvas.draw()
+        self.store_view(key)
+
+    def _on_raster_ready(self, token, future):
+        """Reçoit l'image d'un processus de rendu (dans le thread de l'interface)."""
+        try:
+            name, width, height = future.result()
+        except Exception as e:
+            print(f"ERREUR de rendu : {e}")
+            return
+
+        if token != self._render_token or self.render_mode != "process":
+            # Une demande plus récente est en cours : cette image ne sert plus
+            release_shared_raster(name)
+            return
+
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            # Une seule copie : du segment partagé vers l'image Qt
+            image = QImage(shm.buf, width, height, width * 4, QImage.Format.Format_RGBA8888).copy()
+        finally:
+            shm.close()
+            shm.unlink()
+
+        if self._pending_key is not None:
+            get_raster_cache().put(self._pending_key, image, image.sizeInBytes())
+        self.current_view_key = self._pending_key
+        # Les axes Matplotlib ne contiennent pas ce graphique (dessiné dans un autre processus)
+        self._canvas_stale = True
+        self._show_image(QPixmap.fromImage(image))
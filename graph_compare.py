@@ -1,4 +1,8 @@
+import numpy as np
 from graph_base import GraphBase
+from render_pool import COLORS, draw_series
+from facet_engine import DENSE_PANEL_POINTS, padded_limits
+from cluster_engine import CLUSTER_COLORS
 import matplotlib.pyplot as plt
 
 class CompareGraph(GraphBase):
@@ -11,101 +15,146 @@ class CompareGraph(GraphBase):
         super().__init__()
         # Palette de couleurs manuelle ('b'=blue, 'g'=green, etc.)
         # Utilisée pour distinguer visuellement les pays quand on trace plusieurs courbes
-        self.colors = ['b', 'g', 'r', 'c', 'm', 'y', 'k', 'orange', 'purple', 'brown']
+        self.colors = COLORS
 
-    def plot_scatter(self, df, col_x, col_y):
-        """1. Nuage de points (Permet de voir la corrélation entre deux variables)"""
-        # Efface le graphique précédent (sinon les points s'accumulent)
-        self.clear_ax()
-        
+    def plot_scatter(self, df, col_x, col_y, key=None, groups=None, n_groups=None):
+        """
+        1. Nuage de points (Permet de voir la corrélation entre deux variables)
+        - groups : groupe k-means (0 à n_groups-1) de chaque ligne de df (points colorés par groupe), ou None
+        """
         # Gestion de cas vide (éviter de planter si le filtre est trop restrictif)
         if df.empty:
-            self.ax.text(0.5, 0.5, "Pas de données", ha='center')
+            spec = {"kind": "scatter", "empty": "Pas de données"}
         else:
-            # Récupération des colonnes à comparer
-            x = df[col_x]
-            y = df[col_y]
-            
-            # Tracé du Scatter plot (nuage de points)
-            # alpha=0.7 : Transparence (0 à 1) pour voir les points superposés
-            # edgecolors='k' : Contour noir autour des cercles bleus pour la netteté
-            self.ax.scatter(x, y, alpha=0.7, c='blue', edgecolors='k')
-
-            # --- Habillage du graphique ---
-            self.ax.set_xlabel(col_x) # Label axe X
-            self.ax.set_ylabel(col_y) # Label axe Y
-            self.ax.set_title(f"Corrélation : {col_x} vs {col_y}")
-            # Grille en pointillés pour faciliter la lecture
-            self.ax.grid(True, linestyle='--', alpha=0.6)
-
-        # Ajustement des marges pour éviter que les titres soient coupés
-        self.figure.tight_layout()
-        # Commande vitale : Demande à PyQt de redessiner le widget avec la nouvelle image
-        self.canvas.draw()
+            # Spec du graphique : les colonnes à comparer + l'habillage.
+            # Le tracé lui-même est fait par render_pool.draw_spec (dans le canvas ou dans un processus).
+            spec = {
+                "kind": "scatter",
+                "x": df[col_x].to_numpy(), "y": df[col_y].to_numpy(),
+                "xlabel": col_x, "ylabel": col_y,
+                "title": f"Corrélation : {col_x} vs {col_y}",
+            }
+            if groups is not None:
+                spec["groups"] = groups
+                spec["group_colors"] = CLUSTER_COLORS[:n_groups]
+                spec["title"] += f" ({n_groups} groupes k-means)"
+        self.render_spec(spec, key)
 
-    def plot_bar(self, df, col_metric):
-        """2. Diagramme en barres horizontales (Classement)"""
+    def plot_bar(self, ranking, col_metric, largest=True):
+        """
+        2. Diagramme en barres horizontales (Classement)
+        - ranking : classement déjà calculé (DataManager.top_k), dans l'ordre d'affichage,
+          avec le rang dense de chaque pays dans la sélection
+        """
         self.clear_ax()
         
-        if df.empty:
+        if ranking.empty:
             self.ax.text(0.5, 0.5, "Pas de données", ha='center')
         else:
-            # --- Préparation des données pour un classement lisible ---
-            # 1. sort_values : On trie les données par ordre croissant
-            # 2. tail(15) : On prend les 15 dernières valeurs (donc les 15 plus grandes)
-            #    Dans un barh (horizontal), les dernières valeurs s'affichent en haut.
-            df_sorted = df.sort_values(by=col_metric, ascending=True).tail(15) 
-            
-            countries = df_sorted['Country']
-            values = df_sorted[col_metric]
+            # --- Étiquettes : rang dans la sélection, pays (et année si le classement en mélange plusieurs) ---
+            labels = "#" + ranking['Rank'].astype(str) + " " + ranking['Country'].astype(str)
+            if ranking['Year'].nunique() > 1:
+                labels += " (" + ranking['Year'].astype(str) + ")"
 
-            # Tracé des barres horizontales (barH)
-            self.ax.barh(countries, values, color='skyblue', edgecolor='black')
+            # Tracé des barres horizontales (barH), la première ligne du classement en haut
+            self.ax.barh(labels.to_numpy(), ranking[col_metric].to_numpy(), color='skyblue', edgecolor='black')
+            self.ax.invert_yaxis()
             
             # --- Habillage ---
             self.ax.set_xlabel(col_metric)
-            self.ax.set_title(f"Classement par : {col_metric}")
+            direction = "plus élevés" if largest else "plus bas"
+            self.ax.set_title(f"Classement par : {col_metric} ({len(ranking)} {direction})")
             # Grille verticale seulement (axis='x') pour comparer la longueur des barres
             self.ax.grid(axis='x', linestyle='--', alpha=0.6)
 
         self.figure.tight_layout()
         self.canvas.draw()
 
-    def plot_multi_curves(self, df, col_metric):
-        """3. Courbes d'évolution superposables (Analyse temporelle)"""
-        self.clear_ax()
-        
+    def plot_multi_curves(self, df, col_metric, key=None, series=None):
+        """
+        3. Courbes d'évolution superposables (Analyse temporelle)
+        - series : séries alignées sur toutes les années (PanelView, voir panel_engine.py) ;
+          les années manquantes font un trou ou sont estimées (pointillés)
+        """
         if df.empty:
-            self.ax.text(0.5, 0.5, "Pas de données\nSélectionnez des pays", ha='center')
+            spec = {"kind": "multi_curves", "empty": "Pas de données\nSélectionnez des pays"}
+        elif series is not None:
+            title = f"Évolution temporelle : {col_metric}"
+            if series.imputed.any():
+                title += " (pointillés : valeurs estimées)"
+            spec = {
+                "kind": "multi_curves",
+                "series": [{"label": country, "x": series.years, "y": series.values[i], "imputed": series.imputed[i]}
+                           for i, country in enumerate(series.countries)],
+                "xlabel": "Année", "ylabel": col_metric, "title": title,
+            }
         else:
-            # On récupère la liste unique des pays présents dans le DataFrame filtré
-            countries_list = df['Country'].unique()
-            
-            # --- Boucle de traçage ---
-            # Pour chaque pays, on trace une ligne distincte sur le MEME graphique
-            for i, country in enumerate(countries_list):
-                # 1. On isole les données de CE pays
-                # 2. On trie par année pour que la ligne ne fasse pas des zig-zags temporels
-                df_country = df[df['Country'] == country].sort_values(by='Year')
-                
-                # Sélection de la couleur :
-                # i % len(self.colors) permet de boucler sur la liste si on a plus de pays que de couleurs
-                # (ex: si i=10 et len=10, on reprend la couleur 0)
-                color = self.colors[i % len(self.colors)]
-                
-                # Tracé de la courbe
-                # marker='o' : Ajoute un point à chaque année
-                # label=country : Indispensable pour la légende
-                self.ax.plot(df_country['Year'], df_country[col_metric], 
-                             marker='o', label=country, color=color)
+            # Une série par pays présent dans le DataFrame filtré (dans l'ordre du DataFrame).
+            # On trie par année pour que la ligne ne fasse pas des zig-zags temporels.
+            series = []
+            for country, df_country in df.groupby('Country', sort=False, observed=True):
+                df_country = df_country.sort_values(by='Year')
+                series.append({"label": country,
+                               "x": df_country['Year'].to_numpy(),
+                               "y": df_country[col_metric].to_numpy()})
+            spec = {
+                "kind": "multi_curves", "series": series,
+                "xlabel": "Année", "ylabel": col_metric,
+                "title": f"Évolution temporelle : {col_metric}",
+            }
+        self.render_spec(spec, key)
 
-            # --- Habillage ---
-            self.ax.set_xlabel("Année")
-            self.ax.set_ylabel(col_metric)
-            self.ax.set_title(f"Évolution temporelle : {col_metric}")
-            # Affiche la légende (boîte avec noms des pays) en utilisant les 'label' définis plus haut
-            self.ax.legend() 
-            self.ax.grid(True)
+    # --- PETITS MULTIPLES (UN PANNEAU PAR RÉGION OU PAR ANNÉE) ---
+    # Toujours tracés dans le canvas (la grille et ses artistes sont réutilisés d'un rafraîchissement à l'autre)
 
-        self.figure.tight_layout()
-        self.canvas.draw()
\ No newline at end of file
+    def plot_scatter_grid(self, points, titles, col_x, col_y, key=None):
+        """
+        Nuages de points, un panneau par groupe (axes partagés).
+        - points : liste de couples (x, y) de tableaux, un par panneau
+        """
+        axes, reused = self.grid_axes(len(titles), "scatter")
+        for i, (ax, (x, y)) in enumerate(zip(axes, points)):
+            offsets = np.column_stack([x, y])
+            if reused:
+                # Même grille : on déplace seulement les points du nuage existant
+                self.grid_artists[i].set_offsets(offsets)
+            else:
+                self.grid_artists[i] = ax.scatter(x, y, s=12, alpha=0.7, c='blue', edgecolors='k', linewidths=0.3)
+                ax.grid(True, linestyle='--', alpha=0.6)
+            # Panneau dense : rastérisé (export PNG/PDF plus léger, tracé plus rapide)
+            self.grid_artists[i].set_rasterized(len(offsets) > DENSE_PANEL_POINTS)
+            self.set_panel_label(i, f"{titles[i]} ({len(offsets)})")
+        self.finish_grid(f"Corrélation : {col_x} (X) vs {col_y} (Y)",
+                         padded_limits(*[x for x, _ in points]), padded_limits(*[y for _, y in points]))
+        self.store_view(key)
+
+    def plot_multi_curves_grid(self, series, panels, titles, col_metric, key=None):
+        """
+        Courbes d'évolution, un panneau par groupe (axes partagés).
+        - series : séries alignées sur toutes les années (PanelView, voir panel_engine.py)
+        - panels : numéro de panneau de chaque pays de series
+        """
+        axes, reused = self.grid_axes(len(titles), "multi_curves")
+        for i, ax in enumerate(axes):
+            members = np.flatnonzero(panels == i)
+            lines = self.grid_artists[i] if reused else None
+            if lines is not None and len(lines) == len(members) and not series.imputed[members].any():
+                # Même nombre de pays dans le panneau : on change seulement les données des courbes
+                for line, j in zip(lines, members):
+                    line.set_data(series.years, series.values[j])
+                    line.set_label(series.countries[j])
+            else:
+                for line in list(ax.lines):
+                    line.remove()
+                lines = [draw_series(ax, series.years, series.values[j], series.imputed[j], marker='o', markersize=3,
+                                     linewidth=1, label=series.countries[j], color=self.colors[n % len(self.colors)])[0]
+                         for n, j in enumerate(members)]
+                self.grid_artists[i] = None if series.imputed[members].any() else lines
+                ax.grid(True, alpha=0.4)
+            rasterized = len(members) * len(series.years) > DENSE_PANEL_POINTS
+            for line in ax.lines:
+                line.set_rasterized(rasterized)
+            self.set_panel_label(i, f"{titles[i]} ({len(members)})")
+        self.finish_grid(f"Évolution temporelle : {col_metric}",
+                         padded_limits(series.years, margin=0.03), padded_limits(series.values))
+        self.store_view(key)
@@ -1,8 +1,30 @@
+import numpy as np
 from graph_base import GraphBase
+from histogram_engine import SCORE_BIN_EDGES, score_bin_codes
+from render_pool import draw_series
+from facet_engine import padded_limits
+
+# Libellés courts des indicateurs pour l'axe du graphique en cascade
+WATERFALL_LABELS = {
+    "Economy (GDP per Capita)": "Économie",
+    "Family": "Famille",
+    "Health (Life Expectancy)": "Santé",
+    "Freedom": "Liberté",
+    "Trust (Government Corruption)": "Confiance",
+    "Generosity": "Générosité",
+}
 
 class CountryGraph(GraphBase):
     def __init__(self):
-        super().__init__()    
+        super().__init__()
+        # Conteneur de barres de l'histogramme, réutilisé d'un rafraîchissement à l'autre
+        self._hist_bars = None
+
+    def clear_ax(self):
+        """Nettoie le graphique : le conteneur de barres de l'histogramme n'est plus valide."""
+        super().clear_ax()
+        self._hist_bars = None
+
     # =========================================================================
     # 1. LE DIAGRAMME CIRCULAIRE (CAMEMBERT)
     # =========================================================================
@@ -29,11 +51,15 @@ class CountryGraph(GraphBase):
     # =========================================================================
     # 2. LA COURBE D'ÉVOLUTION 
     # =========================================================================
-    def plot_line(self, df):
+    def plot_line(self, df, band=None, series=None):
         """
         Affiche l'évolution du score au fil des années
         - Si 1 seul pays est sélectionné : évolution de ce pays
         - Sinon : évolution du score moyen (tous pays filtrés)
+        - band : intervalles de confiance du score moyen par année (colonnes low/high, index année),
+          dessinés en bande autour de la courbe moyenne
+        - series : scores alignés sur toutes les années (PanelView, voir panel_engine.py) ;
+          une année manquante coupe la courbe ou est estimée (pointillés, marqueur creux)
         """
 
         self.clear_ax()
@@ -53,25 +79,34 @@ class CountryGraph(GraphBase):
         if nb_countries == 1:
             # --- CAS 1 : Un seul pays ---
             country_name = df["Country"].iloc[0]
-            df_sorted = df.sort_values("Year")
-
-            years = df_sorted["Year"].values
-            scores = df_sorted["Happiness Score"].values
+            if series is not None:
+                years, scores, imputed = series.years, series.values[0], series.imputed[0]
+            else:
+                df_sorted = df.sort_values("Year")
+                years, scores, imputed = df_sorted["Year"].values, df_sorted["Happiness Score"].values, None
 
-            self.ax.plot(years, scores, marker='o', linestyle='-', label=country_name)
+            draw_series(self.ax, years, scores, imputed, marker='o', linestyle='-', label=country_name)
             self.ax.grid(True)
             self.ax.set_title(f"Évolution du Score — {country_name}")
 
         else:
             # --- CAS 2 : Plusieurs pays (moyenne par année) ---
-            df_grouped = df.groupby("Year")["Happiness Score"].mean().sort_index()
-
-            years = df_grouped.index.values
-            scores = df_grouped.values
-
-            self.ax.plot(years, scores, marker='o', linestyle='-', label="Score Moyen")
+            if series is not None:
+                # Moyenne sur les pays filtrés, année par année ; une année estimée pour au moins un pays est marquée
+                years, scores, imputed = series.years, series.mean_by_year(), series.imputed.any(axis=0)
+            else:
+                df_grouped = df.groupby("Year")["Happiness Score"].mean().sort_index()
+                years, scores, imputed = df_grouped.index.values, df_grouped.values, None
+
+            draw_series(self.ax, years, scores, imputed, marker='o', linestyle='-', label="Score Moyen")
             self.ax.set_title("Évolution du Score Moyen")
 
+            if band is not None:
+                # Bande de l'intervalle de confiance bootstrap (moteur en cache, voir bootstrap_engine.py)
+                self.ax.fill_between(band.index.astype(int), band["low"], band["high"],
+                                     alpha=0.2, label="IC 95 % (bootstrap)")
+                self.ax.legend()
+
             self.ax.set_xlabel("Année")
             self.ax.set_ylabel("Score")
             self.ax.set_title("Évolution du Score")
@@ -83,30 +118,133 @@ class CountryGraph(GraphBase):
     # =========================================================================
     # 3. L'HISTOGRAMME (DISTRIBUTION)
     # =========================================================================
-    def plot_hist(self, df):
-        """Affiche combien de pays se trouvent dans chaque tranche de score"""
-        
-        self.clear_ax() 
-        
+    def plot_hist(self, df, counts=None):
+        """
+        Affiche combien de pays se trouvent dans chaque tranche de score.
+        Les tranches sont fixes (0 à 10 par pas de 0.5) : les distributions restent comparables d'un filtre à l'autre.
+        - counts : comptes par tranche déjà calculés (moteur ScoreHistogram). Si absent, on les compte à partir de df.
+        """
+
         if df.empty:
+            self.clear_ax()
             self.ax.text(0.5, 0.5, "Pas de données", ha='center')
-        else:
-            # Récupération de la colonne des scores
-            data = df['Happiness Score']
-            
-            # Création des intervalles 
-            #bins = [i * 0.5 for i in range(21)] 
-            
-            # Tracage de l'histogramme.
-            #self.ax.hist(data, bins=bins, color='#4CAF50', edgecolor='black', alpha=0.8, rwidth=0.9)
-            self.ax.hist(data, bins=30, color='#4CAF50',edgecolor='black', alpha=0.8)
+            self.figure.tight_layout()
+            self.canvas.draw()
+            return
+
+        if counts is None:
+            # Comptage direct sur les tranches fixes (sans passer par ax.hist)
+            codes = score_bin_codes(df['Happiness Score'].to_numpy(dtype=float, na_value=np.nan))
+            counts = np.bincount(codes[codes >= 0], minlength=len(SCORE_BIN_EDGES) - 1)
+
+        if self._hist_bars is None:
+            # Premier tracé : création du conteneur de barres, réutilisé ensuite
+            self.clear_ax()
+            bins = SCORE_BIN_EDGES
+            self._hist_bars = self.ax.bar(bins[:-1], counts, width=np.diff(bins), align='edge',
+                                          color='#4CAF50', edgecolor='black', alpha=0.8)
             self.ax.set_xlim(0, 10)
-            self.ax.set_xticks(bin)
-            self.ax.set_xticklabels([str(b) for b in bin], rotation=45, fontsize=9)
+            self.ax.set_xticks(bins)
+            self.ax.set_xticklabels([str(b) for b in bins], rotation=45, fontsize=9)
             self.ax.set_xlabel("Score de Bonheur (0 à 10)")
             self.ax.set_ylabel("Nombre de Pays")
             self.ax.set_title("Distribution des Scores de Bonheur")
             self.ax.grid(axis='y', alpha=0.5, linestyle='--')
+            self.figure.tight_layout() # Ajustement marges
+        else:
+            # Tracés suivants : on change seulement la hauteur des barres existantes
+            for rect, height in zip(self._hist_bars, counts):
+                rect.set_height(height)
+
+        self.ax.set_ylim(0, max(int(np.max(counts)), 1) * 1.1)
+        self.canvas.draw() # Affichage
+
+    # =========================================================================
+    # 3 bis. PETITS MULTIPLES (UN PANNEAU PAR RÉGION OU PAR ANNÉE)
+    # =========================================================================
+    def plot_line_grid(self, years, means, titles, imputed=None):
+        """
+        Évolution du score moyen, un panneau par groupe (axes partagés).
+        - means : matrice groupes × années (NaN = année sans donnée, la courbe est coupée)
+        - imputed : masque groupes × années des moyennes qui contiennent des valeurs estimées
+        """
+        axes, reused = self.grid_axes(len(titles), "line")
+        for i, ax in enumerate(axes):
+            if reused and self.grid_artists[i] is not None and (imputed is None or not imputed[i].any()):
+                # Même grille : on change seulement les données de la courbe existante
+                self.grid_artists[i].set_data(years, means[i])
+            else:
+                for line in list(ax.lines):
+                    line.remove()
+                lines = draw_series(ax, years, means[i], None if imputed is None else imputed[i],
+                                    marker='o', markersize=3, color='tab:blue')
+                # Avec des valeurs estimées, le panneau a plusieurs artistes : il sera redessiné au prochain tracé
+                self.grid_artists[i] = lines[0] if imputed is None or not imputed[i].any() else None
+                ax.grid(True, alpha=0.4)
+            self.set_panel_label(i, titles[i])
+        self.finish_grid("Évolution du Score Moyen", padded_limits(years, margin=0.03), padded_limits(means))
+
+    def plot_hist_grid(self, counts, titles):
+        """
+        Distribution des scores, un panneau par groupe (tranches fixes, axes partagés).
+        - counts : matrice groupes × tranches (comptes calculés en un seul passage)
+        """
+        axes, reused = self.grid_axes(len(titles), "hist")
+        bins = SCORE_BIN_EDGES
+        for i, ax in enumerate(axes):
+            if reused:
+                # Même grille : seules les hauteurs changent
+                self.grid_artists[i].set_data(values=counts[i])
+            else:
+                # Un seul artiste en escalier par panneau (au lieu de 20 rectangles) : tracé plus rapide
+                self.grid_artists[i] = ax.stairs(counts[i], bins, fill=True, color='#4CAF50', alpha=0.8)
+                ax.grid(axis='y', alpha=0.5, linestyle='--')
+            self.set_panel_label(i, titles[i])
+        self.finish_grid("Distribution des Scores de Bonheur", (0, 10),
+                         (0, max(int(np.max(counts)) if counts.size else 0, 1) * 1.15))
+
+    # =========================================================================
+    # 4. LA DÉCOMPOSITION (CASCADE / WATERFALL)
+    # =========================================================================
+    def plot_waterfall(self, contributions, start, end, title):
+        """
+        Graphique en cascade : score de départ, contribution de chaque indicateur (barres flottantes,
+        vertes si positives, rouges si négatives), puis score d'arrivée.
+        - contributions : Series (nom de l'indicateur -> écart), dans l'ordre d'affichage
+        """
+        self.clear_ax()
+
+        if contributions is None or len(contributions) == 0 or np.isnan(start) or np.isnan(end):
+            self.ax.text(0.5, 0.5, "Pas de données pour ces deux années", ha='center')
+            self.figure.tight_layout()
+            self.canvas.draw()
+            return
+
+        values = np.nan_to_num(contributions.to_numpy(dtype=float))
+        # Bas de chaque barre flottante : score de départ + contributions précédentes
+        bottoms = start + np.concatenate([[0], np.cumsum(values)[:-1]])
+
+        labels = ["Départ"] + [WATERFALL_LABELS.get(c, c) for c in contributions.index] + ["Arrivée"]
+        x = np.arange(len(labels))
+        self.ax.bar(x[0], start, color='grey', edgecolor='black')
+        self.ax.bar(x[1:-1], values, bottom=bottoms, edgecolor='black',
+                    color=np.where(values >= 0, '#4CAF50', '#E53935'))
+        self.ax.bar(x[-1], end, color='grey', edgecolor='black')
+
+        # Valeur de chaque contribution au-dessus de sa barre
+        for xi, bottom, value in zip(x[1:-1], bottoms, values):
+            self.ax.text(xi, bottom + max(value, 0), f"{value:+.2f}", ha='center', va='bottom', fontsize=8)
+
+        # Zoom sur la zone utile : les barres de départ et d'arrivée partent de 0
+        levels = np.concatenate([[start, end], bottoms, bottoms + values])
+        margin = max(0.1, (levels.max() - levels.min()) * 0.15)
+        self.ax.set_ylim(max(0, levels.min() - margin), levels.max() + margin)
+
+        self.ax.set_xticks(x)
+        self.ax.set_xticklabels(labels, rotation=30, ha='right', fontsize=9)
+        self.ax.set_ylabel("Score")
+        self.ax.set_title(title)
+        self.ax.grid(axis='y', alpha=0.5, linestyle='--')
 
         self.figure.tight_layout() # Ajustement marges
-        self.canvas.draw() # Affichage
\ No newline at end of file
+        self.canvas.draw() # Affichage
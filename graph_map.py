@@ -0,0 +1,121 @@
+import numpy as np
+from matplotlib.cm import ScalarMappable
+from matplotlib.collections import PathCollection
+from matplotlib.colors import Normalize, to_rgba
+from graph_base import GraphBase
+from map_geometry import GridIndex, get_country_shapes
+
+# Fond des pays sans données (ou hors filtre)
+NO_DATA_COLOR = "#E0E0E0"
+# Latitudes affichées (l'Antarctique n'a pas de données)
+LAT_LIMITS = (-58, 84)
+
+
+class MapGraph(GraphBase):
+    """
+    Carte choroplèthe native (Matplotlib), alternative légère à la carte web Plotly :
+    tous les pays sont une seule collection de chemins (contours en cache, voir map_geometry.py),
+    colorés par valeur ; le survol affiche la fiche du pays sous la souris (recherche dans la grille d'index).
+    """
+    def __init__(self):
+        super().__init__()
+        self.shapes = get_country_shapes()
+        self.index = GridIndex(self.shapes) if self.shapes is not None else None
+        self._colorbar = None
+        # Texte de survol par position de pays dans les géométries (pays affichés seulement)
+        self._hover_texts = {}
+        self._hovered = -1
+        self._annotation = None
+        self.canvas.mpl_connect('motion_notify_event', self._on_hover)
+
+    def clear_ax(self):
+        """Nettoie la carte : l'échelle de couleurs et la fiche de survol sont retirées."""
+        if self._colorbar is not None:
+            self._colorbar.remove()
+            self._colorbar = None
+        super().clear_ax()
+        self._hover_texts = {}
+        self._hovered = -1
+        self._annotation = None
+
+    def show_message(self, text):
+        self.clear_ax()
+        self.ax.set_axis_off()
+        self.ax.text(0.5, 0.5, text, ha='center', va='center', transform=self.ax.transAxes)
+        self.canvas.draw()
+
+    def plot_choropleth(self, df_map, color_col, title, cmap="plasma", limits=None, hover_columns=()):
+        """
+        Dessine la carte.
+        - df_map : une ligne par pays (colonnes iso3, Country, Anomalies, color_col et hover_columns)
+        - limits : bornes de l'échelle de couleurs (None : valeurs extrêmes de color_col)
+        - hover_columns : colonnes montrées dans la fiche de survol
+        """
+        if self.shapes is None:
+            self.show_message("Géométries des pays absentes (geodata/countries_110m.geojson)")
+            return
+        self.clear_ax()
+
+        positions = self.shapes.positions(df_map["iso3"])
+        known = positions >= 0
+        shown = positions[known]
+        values = df_map[color_col].to_numpy(dtype=float)[known]
+        if limits is None:
+            limits = (np.nanmin(values), np.nanmax(values)) if len(values) else (0.0, 1.0)
+        colors = ScalarMappable(Normalize(*limits), cmap)
+
+        # Une couleur de fond, de contour et une épaisseur par pays des géométries
+        n = len(self.shapes)
+        facecolors = np.tile(to_rgba(NO_DATA_COLOR), (n, 1))
+        facecolors[shown] = colors.to_rgba(values)
+        edgecolors = np.tile(to_rgba("white"), (n, 1))
+        linewidths = np.full(n, 0.3)
+        # Contour rouge épais des pays avec au moins une ligne suspecte
+        flagged = shown[df_map["Anomalies"].to_numpy()[known] > 0]
+        edgecolors[flagged] = to_rgba("red")
+        linewidths[flagged] = 1.5
+        self.ax.add_collection(PathCollection(self.shapes.paths(), facecolors=facecolors, edgecolors=edgecolors,
+                                              linewidths=linewidths, transform=self.ax.transData))
+
+        countries = df_map["Country"].to_numpy()[known]
+        columns = {col: df_map[col].to_numpy()[known] for col in hover_columns}
+        for k, position in enumerate(shown):
+            lines = [str(countries[k])] + [f"{col} : {format_value(v[k])}" for col, v in columns.items()]
+            self._hover_texts[int(position)] = "\n".join(lines)
+
+        self.ax.set_xlim(-180, 180)
+        self.ax.set_ylim(*LAT_LIMITS)
+        self.ax.set_aspect('equal')
+        self.ax.set_axis_off()
+        self.ax.set_title(title)
+        self.figure.subplots_adjust(left=0.01, right=0.92, bottom=0.02, top=0.93)
+        self._colorbar = self.figure.colorbar(colors, ax=self.ax, fraction=0.025, pad=0.01, label=color_col)
+        self.canvas.draw()
+
+    def _on_hover(self, event):
+        """Fiche du pays sous la souris (mise à jour seulement quand le pays survolé change)"""
+        if self.index is None or not self._hover_texts:
+            return
+        hovered = self.index.lookup(event.xdata, event.ydata) if event.inaxes is self.ax else -1
+        if hovered == self._hovered:
+            return
+        self._hovered = hovered
+        text = self._hover_texts.get(hovered)
+        if text is None:
+            if self._annotation is not None and self._annotation.get_visible():
+                self._annotation.set_visible(False)
+                self.canvas.draw_idle()
+            return
+        if self._annotation is None:
+            self._annotation = self.ax.annotate("", xy=(0, 0), xytext=(12, 12), textcoords='offset points',
+                                                fontsize=8, bbox=dict(boxstyle='round', facecolor='white', alpha=0.9))
+        self._annotation.xy = (event.xdata, event.ydata)
+        self._annotation.set_text(text)
+        self._annotation.set_visible(True)
+        self.canvas.draw_idle()
+
+
+def format_value(value):
+    if isinstance(value, (float, np.floating)):
+        return f"{value:.3f}"
+    return str(value)
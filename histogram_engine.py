@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+
+# Bornes fixes des intervalles : 20 tranches de 0.5 sur l'échelle 0 à 10.
+# Elles ne dépendent pas des données, donc deux histogrammes restent comparables
+# quels que soient les filtres appliqués.
+SCORE_BIN_EDGES = np.linspace(0.0, 10.0, 21)
+
+
+def score_bin_codes(values):
+    """
+    Renvoie l'indice de tranche de chaque score (-1 si le score est manquant ou hors de 0-10).
+    """
+    values = np.asarray(values, dtype=float)
+    n_bins = len(SCORE_BIN_EDGES) - 1
+    codes = np.searchsorted(SCORE_BIN_EDGES, values, side='right') - 1
+    # Le score 10 exact appartient à la dernière tranche (intervalle fermé à droite)
+    codes[values == SCORE_BIN_EDGES[-1]] = n_bins - 1
+    codes[~((values >= SCORE_BIN_EDGES[0]) & (values <= SCORE_BIN_EDGES[-1]))] = -1
+    return codes
+
+
+class ScoreHistogram:
+    """
+    Moteur d'histogramme des scores de bonheur.
+    Les comptes par tranche sont précalculés une seule fois pour chaque couple (Année, Région) :
+    un filtre année/région se résout ensuite par une simple somme de vecteurs.
+    """
+    def __init__(self, df, column='Happiness Score'):
+        self.edges = SCORE_BIN_EDGES
+        n_bins = len(self.edges) - 1
+
+        years = pd.Categorical(df['Year'])
+        regions = pd.Categorical(df['Region'])
+        self.years = list(years.categories)
+        self.regions = list(regions.categories)
+
+        # Indice de tranche de chaque ligne, aligné sur l'index du DataFrame source
+        codes = score_bin_codes(df[column].to_numpy(dtype=float, na_value=np.nan))
+        self.bin_codes = pd.Series(codes, index=df.index)
+
+        # Les régions manquantes sont rangées dans une case supplémentaire (comptées dans "Toutes")
+        n_years, n_regions = len(self.years), len(self.regions) + 1
+        year_codes = years.codes.astype(np.int64)
+        region_codes = np.where(regions.codes < 0, n_regions - 1, regions.codes).astype(np.int64)
+
+        # Nombre total de lignes par cellule (y compris les scores invalides)
+        cell = year_codes * n_regions + region_codes
+        self.row_totals = np.bincount(cell, minlength=n_years * n_regions).reshape(n_years, n_regions)
+
+        # Comptes par tranche : tableau (années, régions, tranches) rempli en un seul bincount
+        valid = codes >= 0
+        flat = cell[valid] * n_bins + codes[valid]
+        self.counts = np.bincount(flat, minlength=n_years * n_regions * n_bins).reshape(n_years, n_regions, n_bins)
+
+    def append(self, df, column='Happiness Score'):
+        '''
+        Ajoute les comptes de lignes ajoutées au DataFrame source (index à la suite de l'existant).
+        Les années et régions inédites reçoivent une nouvelle case ; les comptes existants sont conservés.
+        '''
+        n_bins = len(self.edges) - 1
+        new_years = [y for y in pd.unique(df['Year'].dropna()) if y not in self.years]
+        new_regions = [r for r in pd.unique(df['Region'].dropna()) if r not in self.regions]
+        if new_years or new_regions:
+            # Nouvelles régions insérées avant la case des régions manquantes (toujours la dernière)
+            n_old = len(self.regions)
+            self.years += new_years
+            self.regions += new_regions
+            grow = ((0, len(new_years)), (0, 0))
+            self.row_totals = np.insert(np.pad(self.row_totals, grow), [n_old] * len(new_regions), 0, axis=1)
+            self.counts = np.insert(np.pad(self.counts, grow + ((0, 0),)), [n_old] * len(new_regions), 0, axis=1)
+
+        n_regions = len(self.regions) + 1
+        year_codes = pd.Index(self.years).get_indexer(df['Year']).astype(np.int64)
+        region_codes = pd.Index(self.regions).get_indexer(df['Region'])
+        region_codes = np.where(region_codes < 0, n_regions - 1, region_codes).astype(np.int64)
+        codes = score_bin_codes(df[column].to_numpy(dtype=float, na_value=np.nan))
+        self.bin_codes = pd.concat([self.bin_codes, pd.Series(codes, index=df.index)])
+
+        known = year_codes >= 0
+        np.add.at(self.row_totals, (year_codes[known], region_codes[known]), 1)
+        valid = known & (codes >= 0)
+        np.add.at(self.counts, (year_codes[valid], region_codes[valid], codes[valid]), 1)
+
+    def _select(self, year, region):
+        '''Renvoie les tranches (années, régions) correspondant aux choix des listes déroulantes.'''
+        if year == "Toutes":
+            y = slice(None)
+        elif year in self.years:
+            y = [self.years.index(year)]
+        else:
+            y = []
+        if region == "Toutes":
+            r = slice(None)
+        elif region in self.regions:
+            r = [self.regions.index(region)]
+        else:
+            r = []
+        return y, r
+
+    def group_counts(self, year="Toutes", region="Toutes"):
+        """Comptes par tranche pour un filtre Année/Région, obtenus en sommant les vecteurs en cache."""
+        y, r = self._select(year, region)
+        return self.counts[y][:, r].sum(axis=(0, 1))
+
+    def group_size(self, year="Toutes", region="Toutes"):
+        """Nombre de lignes du groupe Année/Région."""
+        y, r = self._select(year, region)
+        return int(self.row_totals[y][:, r].sum())
+
+    def counts_for(self, df, year="Toutes", region="Toutes"):
+        """
+        Comptes par tranche pour un DataFrame filtré issu du DataFrame source.
+        - Si le DataFrame contient exactement le groupe Année/Région : somme des vecteurs en cache.
+        - Sinon : simple comptage des indices de tranche déjà calculés (aucun re-découpage).
+        """
+        if len(df) == self.group_size(year, region):
+            return self.group_counts(year, region)
+
+        codes = self.bin_codes.loc[df.index].to_numpy()
+        codes = codes[codes >= 0]
+        return np.bincount(codes, minlength=len(self.edges) - 1)
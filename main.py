@@ -1,6 +1,13 @@
 import sys  
 from PyQt6.QtWidgets import QApplication, QMainWindow, QTabWidget, QMessageBox
+from PyQt6.QtCore import Qt
 from data_manager import DataManager
+from session_store import load_session, save_session
+from dialog_validation import ValidationDialog
+from data_watcher import DataFileWatcher
+from memory_panel import MemoryPanel
+from filter_state import FilterState
+from raster_cache import get_raster_cache
 
 # --- IMPORT DES ONGLETS PERSONNALISÉS ---
 from tab_country import CountryTab
@@ -27,21 +34,135 @@ class MainWindow(QMainWindow):
         if self.data_manager.df.empty:
             QMessageBox.critical(self, "Erreur", "Impossible de charger les données happiness.csv")
 
+        # Rapport de validation du chargement : résumé dans la barre de statut, détail dans le menu "Données"
+        self.setup_validation_ui()
+
+        # Instantané de la session précédente (None si absent ou si le fichier de données a changé)
+        session = load_session(self.data_manager.fingerprint())
+        tab_sessions = {}
+        if session is not None:
+            # Index et agrégats déjà calculés : pas besoin de les reconstruire depuis le CSV
+            self.data_manager.import_caches(session.get("caches", {}))
+            tab_sessions = session.get("tabs", {})
+
         # 2. Création du conteneur d'onglets
         self.tabs = QTabWidget()
         
         self.setCentralWidget(self.tabs)
         
         # 3. Instanciation des onglets 
-        self.tab_country = CountryTab(self.data_manager)
-        self.tab_comparison = ComparisonTab(self.data_manager)
-        self.tab_map = MapTabInteractive(self.data_manager)
+        # Avec une session, chaque onglet affiche tout de suite son dernier état et son image, puis se recalcule
+        # dès que la fenêtre est affichée (QTimer.singleShot : le calcul reste dans le thread de l'interface)
+        self.tab_country = CountryTab(self.data_manager, tab_sessions.get("country"))
+        self.tab_comparison = ComparisonTab(self.data_manager, tab_sessions.get("comparison"))
+        self.tab_map = MapTabInteractive(self.data_manager, tab_sessions.get("map"))
 
         # 4. Ajout visuel des onglets dans la fenêtre
         self.tabs.addTab(self.tab_country, "Vue d'ensemble")
         self.tabs.addTab(self.tab_comparison, "Comparaison")
         self.tabs.addTab(self.tab_map, "Carte")
 
+        if session is not None:
+            self.tabs.setCurrentIndex(session.get("current_tab", 0))
+
+        # Filtres liés : Vue d'ensemble et Carte partagent une seule sélection (option du menu "Données")
+        self.setup_filter_link()
+        if session is not None:
+            self.action_link.setChecked(session.get("linked_filters", False))
+
+        # Surveillance du fichier : les lignes ajoutées en fin de fichier sont intégrées sans redémarrer
+        self.setup_file_watcher()
+
+        # Diagnostic mémoire par composant (panneau masqué, ouvert depuis le menu "Données")
+        self.setup_memory_panel()
+
+    def setup_validation_ui(self):
+        report = self.data_manager.validation_report
+        self.menu_data = self.menuBar().addMenu("Données")
+        self.action_validation = self.menu_data.addAction("Rapport de validation...")
+        self.action_validation.triggered.connect(self.show_validation_report)
+        self.action_validation.setEnabled(report is not None)
+
+        if report is not None:
+            self.statusBar().showMessage(report.summary())
+            # Les erreurs bloquantes (schéma, types, doublons) sont montrées tout de suite
+            if report.has_errors:
+                self.show_validation_report()
+
+    def setup_file_watcher(self):
+        self.file_watcher = DataFileWatcher(self.data_manager.file_path, parent=self)
+        self.file_watcher.changed.connect(self.on_data_file_changed)
+        self.action_watch = self.menu_data.addAction("Surveiller le fichier de données")
+        self.action_watch.setCheckable(True)
+        self.action_watch.toggled.connect(self.file_watcher.set_enabled)
+        # Seul un CSV peut être complété par la fin (column store et SQLite : rechargement complet)
+        self.action_watch.setEnabled(self.data_manager.can_ingest_appends())
+        self.action_watch.setChecked(self.data_manager.can_ingest_appends())
+
+    def setup_filter_link(self):
+        self.filter_state = FilterState(self.data_manager, parent=self)
+        self.linked_tabs = (self.tab_country, self.tab_map)
+        for tab in self.linked_tabs:
+            tab.attach_filter_state(self.filter_state)
+        self.action_link = self.menu_data.addAction("Lier les filtres des onglets")
+        self.action_link.setCheckable(True)
+        self.action_link.toggled.connect(self.on_link_toggled)
+
+    def on_link_toggled(self, linked):
+        """À l'activation, les filtres de l'onglet affiché (ou de la vue d'ensemble) s'appliquent partout"""
+        current = self.tabs.currentWidget()
+        source = current if current in self.linked_tabs else self.tab_country
+        self.filter_state.set_linked(linked, source)
+
+    def setup_memory_panel(self):
+        self.memory_panel = MemoryPanel(self)
+        self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, self.memory_panel)
+        self.memory_panel.hide()
+        action = self.memory_panel.toggleViewAction()
+        action.setText("Diagnostic mémoire")
+        self.menu_data.addAction(action)
+        # Nouvelle mesure à chaque ouverture du panneau
+        self.memory_panel.visibilityChanged.connect(lambda visible: visible and self.memory_panel.measure())
+
+    def on_data_file_changed(self):
+        """Le fichier de données a été modifié : seules les lignes ajoutées sont lues et intégrées"""
+        appended = self.data_manager.ingest_appended_rows()
+        if appended is None:
+            self.statusBar().showMessage("Le fichier de données a été réécrit : relancer l'application pour le recharger")
+            return
+        if not len(appended):
+            return
+        # Les vues en cache (images, pages de la carte) ont été rendues sans les nouvelles lignes
+        get_raster_cache().clear()
+        for tab in (self.tab_country, self.tab_comparison, self.tab_map):
+            tab.merge_appended_rows(appended)
+        self.action_validation.setEnabled(True)
+        self.statusBar().showMessage(f"{len(appended)} ligne(s) ajoutée(s) au fichier de données. "
+                                     f"{self.data_manager.validation_report.summary()}")
+
+    def show_validation_report(self):
+        ValidationDialog(self.data_manager.validation_report, self.data_manager.df, self).exec()
+
+    def closeEvent(self, event):
+        """À la fermeture : enregistrement de l'instantané de session (filtres, caches, images)"""
+        fingerprint = self.data_manager.fingerprint()
+        if fingerprint is not None and not self.data_manager.df.empty:
+            try:
+                save_session({
+                    "fingerprint": fingerprint,
+                    "caches": self.data_manager.export_caches(),
+                    "current_tab": self.tabs.currentIndex(),
+                    "linked_filters": self.action_link.isChecked(),
+                    "tabs": {
+                        "country": self.tab_country.get_session(),
+                        "comparison": self.tab_comparison.get_session(),
+                        "map": self.tab_map.get_session(),
+                    },
+                })
+            except Exception as e:
+                print(f"ERREUR : instantané de session non enregistré ({e})")
+        super().closeEvent(event)
+
 if __name__ == "__main__":
     # 1. Création de l'application PyQt
     app = QApplication(sys.argv)
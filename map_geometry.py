@@ -0,0 +1,249 @@
+import json
+import os
+from dataclasses import dataclass
+
+import numpy as np
+from matplotlib.path import Path
+
+# Géométries des pays pour la carte native (Matplotlib, sans moteur web).
+# Le fichier GeoJSON livré avec l'application (Natural Earth 1:110m) est lu une seule fois : les contours sont
+# simplifiés (Douglas-Peucker) puis rangés dans des tableaux de sommets et de codes de tracé, un bloc par
+# pays (clé ISO3). Ces tableaux sont gardés dans un fichier .npz à côté de la session : les démarrages
+# suivants relisent directement les tableaux, sans JSON ni simplification.
+# Le survol de la carte passe par une grille (cases de GRID_CELL degrés) qui donne les quelques pays
+# candidats d'un point, avant le test exact « point dans le contour ».
+
+GEOMETRY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "geodata", "countries_110m.geojson")
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".happiness_analyzer")
+# Tolérance de simplification des contours (degrés)
+SIMPLIFY_TOLERANCE = 0.1
+# Taille des cases de la grille de recherche (degrés)
+GRID_CELL = 10.0
+# Propriétés GeoJSON qui portent le code ISO3 (Natural Earth met -99 dans ISO_A3 pour quelques pays)
+ISO3_PROPERTIES = ("ISO_A3", "ADM0_A3", "iso_a3", "ISO3")
+
+
+def simplify_ring(points, tolerance=SIMPLIFY_TOLERANCE):
+    """
+    Simplifie un contour fermé (Douglas-Peucker) : garde les sommets qui s'écartent de plus de tolerance
+    de la corde entre deux sommets gardés. Un contour qui tomberait sous 4 sommets est gardé tel quel.
+    """
+    n = len(points)
+    if n <= 4 or tolerance <= 0:
+        return points
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        i, j = stack.pop()
+        if j <= i + 1:
+            continue
+        a, segment = points[i], points[i + 1:j]
+        chord = points[j] - a
+        length = np.hypot(*chord)
+        if length == 0:
+            # Extrémités confondues (contour fermé) : distance au point de départ
+            distances = np.hypot(segment[:, 0] - a[0], segment[:, 1] - a[1])
+        else:
+            distances = np.abs(chord[0] * (segment[:, 1] - a[1]) - chord[1] * (segment[:, 0] - a[0])) / length
+        k = int(np.argmax(distances))
+        if distances[k] > tolerance:
+            m = i + 1 + k
+            keep[m] = True
+            stack.extend(((i, m), (m, j)))
+    simplified = points[keep]
+    return simplified if len(simplified) >= 4 else points
+
+
+def feature_iso3(feature):
+    properties = feature.get("properties") or {}
+    for name in ISO3_PROPERTIES:
+        code = properties.get(name)
+        if isinstance(code, str) and len(code) == 3 and code.isalpha():
+            return code.upper()
+    code = feature.get("id")
+    if isinstance(code, str) and len(code) == 3 and code.isalpha():
+        return code.upper()
+    return None
+
+
+def geometry_rings(geometry):
+    """Contours (extérieurs et trous) d'une géométrie Polygon ou MultiPolygon."""
+    if not geometry:
+        return []
+    if geometry["type"] == "Polygon":
+        polygons = [geometry["coordinates"]]
+    elif geometry["type"] == "MultiPolygon":
+        polygons = geometry["coordinates"]
+    else:
+        return []
+    return [np.asarray(ring, dtype=float)[:, :2] for polygon in polygons for ring in polygon if len(ring) >= 4]
+
+
+@dataclass
+class CountryShapes:
+    """
+    Contours simplifiés de tous les pays, dans des tableaux contigus :
+    - vertices (N, 2) longitude/latitude et codes (N,) de tracé Matplotlib (MOVETO, LINETO, CLOSEPOLY),
+    - starts : le pays i occupe vertices[starts[i]:starts[i + 1]],
+    - bboxes (n, 4) : xmin, ymin, xmax, ymax de chaque pays.
+    """
+    iso3: np.ndarray
+    vertices: np.ndarray
+    codes: np.ndarray
+    starts: np.ndarray
+    bboxes: np.ndarray
+
+    def __post_init__(self):
+        self._paths = None
+        self._positions = None
+
+    def __len__(self):
+        return len(self.iso3)
+
+    def path(self, i):
+        return self.paths()[i]
+
+    def paths(self):
+        """Un Path Matplotlib par pays (vues sur les tableaux, construites une fois)."""
+        if self._paths is None:
+            self._paths = [Path(self.vertices[s:e], self.codes[s:e])
+                           for s, e in zip(self.starts[:-1], self.starts[1:])]
+        return self._paths
+
+    def position(self, iso3):
+        """Position d'un pays dans les tableaux (None si sa géométrie n'est pas connue)."""
+        if self._positions is None:
+            self._positions = {code: i for i, code in enumerate(self.iso3)}
+        return self._positions.get(iso3)
+
+    def positions(self, codes):
+        """Positions d'une liste de codes ISO3 (-1 pour les pays sans géométrie)."""
+        return np.array([-1 if (i := self.position(code)) is None else i for code in codes], dtype=np.intp)
+
+    def save(self, path, source):
+        np.savez(path, iso3=self.iso3, vertices=self.vertices, codes=self.codes, starts=self.starts,
+                 bboxes=self.bboxes, source=source)
+
+    @classmethod
+    def from_arrays(cls, data):
+        return cls(data["iso3"], data["vertices"], data["codes"], data["starts"], data["bboxes"])
+
+
+def build_country_shapes(geojson_path, tolerance=SIMPLIFY_TOLERANCE):
+    """Lit un GeoJSON de pays et construit les tableaux de contours (les entités d'un même pays sont réunies)."""
+    with open(geojson_path, encoding="utf-8") as f:
+        features = json.load(f).get("features", [])
+
+    rings_by_country = {}
+    for feature in features:
+        iso3 = feature_iso3(feature)
+        if iso3 is None:
+            continue
+        rings = [simplify_ring(ring, tolerance) for ring in geometry_rings(feature.get("geometry"))]
+        if rings:
+            rings_by_country.setdefault(iso3, []).extend(rings)
+
+    vertices, codes, starts, bboxes = [], [], [0], []
+    for rings in rings_by_country.values():
+        for ring in rings:
+            ring_codes = np.full(len(ring), Path.LINETO, dtype=np.uint8)
+            ring_codes[0], ring_codes[-1] = Path.MOVETO, Path.CLOSEPOLY
+            vertices.append(ring)
+            codes.append(ring_codes)
+        points = np.concatenate(rings)
+        starts.append(starts[-1] + len(points))
+        bboxes.append((*points.min(axis=0), *points.max(axis=0)))
+
+    return CountryShapes(
+        iso3=np.array(list(rings_by_country), dtype="<U3"),
+        vertices=np.concatenate(vertices) if vertices else np.zeros((0, 2)),
+        codes=np.concatenate(codes) if codes else np.zeros(0, dtype=np.uint8),
+        starts=np.array(starts, dtype=np.intp),
+        bboxes=np.array(bboxes, dtype=float).reshape(-1, 4),
+    )
+
+
+def load_country_shapes(path=GEOMETRY_FILE, tolerance=SIMPLIFY_TOLERANCE, cache_dir=CACHE_DIR):
+    """
+    Contours des pays : relus depuis le cache .npz s'il correspond au fichier source (taille, date),
+    sinon construits depuis le GeoJSON puis mis en cache. None si le fichier de géométries est absent.
+    """
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    source = np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+    cache_path = os.path.join(cache_dir, f"country_shapes_{tolerance:g}.npz")
+    try:
+        with np.load(cache_path) as data:
+            if np.array_equal(data["source"], source):
+                return CountryShapes.from_arrays(data)
+    except (OSError, KeyError, ValueError):
+        pass
+
+    shapes = build_country_shapes(path, tolerance)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        shapes.save(cache_path, source)
+    except OSError as e:
+        print(f"ERREUR : géométries des pays non mises en cache ({e})")
+    return shapes
+
+
+class GridIndex:
+    """
+    Index spatial des pays pour le survol : grille régulière de cases de cell degrés ; chaque case liste
+    les pays dont la boîte englobante la touche, les plus petits d'abord (une enclave passe avant le pays
+    qui l'entoure). Stockage compact : members[starts[c]:starts[c + 1]] = pays de la case c.
+    """
+    def __init__(self, shapes, cell=GRID_CELL):
+        self.shapes = shapes
+        self.cell = cell
+        self.ncols = int(np.ceil(360 / cell))
+        self.nrows = int(np.ceil(180 / cell))
+
+        boxes = shapes.bboxes
+        areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+        cells, members = [], []
+        for i in np.argsort(areas, kind='stable'):
+            col0, row0 = self.cell_of(boxes[i, 0], boxes[i, 1])
+            col1, row1 = self.cell_of(boxes[i, 2], boxes[i, 3])
+            cols, rows = np.meshgrid(np.arange(col0, col1 + 1), np.arange(row0, row1 + 1))
+            cells.append((rows * self.ncols + cols).ravel())
+            members.append(np.full(cols.size, i, dtype=np.intp))
+        cells = np.concatenate(cells) if cells else np.zeros(0, dtype=np.intp)
+        members = np.concatenate(members) if members else np.zeros(0, dtype=np.intp)
+        # Tri stable par case : l'ordre des aires croissantes est conservé dans chaque case
+        order = np.argsort(cells, kind='stable')
+        self.members = members[order]
+        self.starts = np.concatenate([[0], np.bincount(cells, minlength=self.ncols * self.nrows).cumsum()])
+
+    def cell_of(self, x, y):
+        col = min(max(int((x + 180) // self.cell), 0), self.ncols - 1)
+        row = min(max(int((y + 90) // self.cell), 0), self.nrows - 1)
+        return col, row
+
+    def candidates(self, x, y):
+        col, row = self.cell_of(x, y)
+        c = row * self.ncols + col
+        return self.members[self.starts[c]:self.starts[c + 1]]
+
+    def lookup(self, x, y):
+        """Position du pays sous le point (longitude, latitude), ou -1."""
+        boxes = self.shapes.bboxes
+        for i in self.candidates(x, y):
+            if boxes[i, 0] <= x <= boxes[i, 2] and boxes[i, 1] <= y <= boxes[i, 3] \
+                    and self.shapes.path(i).contains_point((x, y)):
+                return int(i)
+        return -1
+
+
+_shapes = None
+
+
+def get_country_shapes():
+    """Contours des pays partagés par l'application (chargés au premier appel, None si absents)."""
+    global _shapes
+    if _shapes is None:
+        _shapes = load_country_shapes()
+    return _shapes
@@ -0,0 +1,105 @@
+import numpy as np
+
+from filter_expr import And, IsIn, Range
+
+
+def _narrows(old, new):
+    '''Indique si le prédicat new ne peut retenir qu'un sous-ensemble des lignes retenues par old.'''
+    if isinstance(old, And) and not old.children:
+        # L'ancien prédicat acceptait toutes les lignes ("Toutes")
+        return True
+    if isinstance(old, Range) and isinstance(new, Range):
+        if old.column != new.column or (new.keep_null and not old.keep_null):
+            return False
+        low_ok = old.low is None or (new.low is not None and new.low >= old.low)
+        high_ok = old.high is None or (new.high is not None and new.high <= old.high)
+        return low_ok and high_ok
+    if isinstance(old, IsIn) and isinstance(new, IsIn):
+        return (old.column == new.column and not old.negate and not new.negate
+                and set(new.values) <= set(old.values))
+    return False
+
+
+class MaskCache:
+    """
+    Cache de masques par prédicat pour un état de filtres (un onglet = un cache).
+    Chaque "emplacement" (ex: 'year', 'Freedom') garde son expression et son masque booléen.
+    Quand un seul widget change, seul son masque est recalculé ; la sélection finale est le ET
+    des masques en cache. Si le nouveau prédicat resserre l'ancien (ex: Min augmenté), il n'est évalué
+    que sur les lignes déjà retenues et le masque et la sélection sont affinés sur place.
+    """
+    def __init__(self, data_manager):
+        self.data_manager = data_manager
+        self._ctx = None
+        self._slots = {}
+        self._result = None
+
+    def reset(self):
+        self._ctx = None
+        self._slots = {}
+        self._result = None
+
+    def update(self, slots):
+        '''
+        Met à jour les emplacements et renvoie le masque de la sélection finale (ne pas modifier).
+
+        :param slots: Dictionnaire {nom de l'emplacement: expression de filtre}
+        '''
+        ctx = self.data_manager.get_filter_context()
+        if ctx is not self._ctx:
+            if self._ctx is not None and ctx.extends is self._ctx and self._result is not None:
+                # Lignes ajoutées à la fin des données : seuls les nouveaux masques sont évalués
+                self._extend(ctx)
+            else:
+                # Les données ont changé : les masques en cache ne sont plus valides
+                self.reset()
+            self._ctx = ctx
+
+        structure_changed = set(slots) != set(self._slots) or self._result is None
+        dropped = []
+        for name, expr in slots.items():
+            cached = self._slots.get(name)
+            if cached is not None and cached[0] == expr:
+                continue
+
+            if cached is not None and _narrows(cached[0], expr):
+                # Affinage : on n'évalue le nouveau prédicat que sur les lignes encore retenues
+                mask = cached[1]
+                rows = np.flatnonzero(mask)
+                lost = rows[~self.data_manager.filter_mask(expr, rows)]
+                mask[lost] = False
+                dropped.append(lost)
+            else:
+                mask = self.data_manager.filter_mask(expr)
+                structure_changed = True
+            self._slots[name] = (expr, mask)
+
+        for name in set(self._slots) - set(slots):
+            del self._slots[name]
+
+        if structure_changed:
+            masks = [mask for _, mask in self._slots.values()]
+            if masks:
+                self._result = np.logical_and.reduce(masks)
+            else:
+                self._result = np.ones(ctx.n_rows, dtype=bool)
+        else:
+            # Tous les changements sont des resserrements : on retire seulement les lignes perdues
+            for lost in dropped:
+                self._result[lost] = False
+
+        return self._result
+
+    def _extend(self, ctx):
+        '''Prolonge les masques en cache avec les lignes ajoutées depuis le contexte précédent.'''
+        added = np.arange(self._ctx.n_rows, ctx.n_rows)
+        result = np.ones(len(added), dtype=bool)
+        for name, (expr, mask) in self._slots.items():
+            added_mask = self.data_manager.filter_mask(expr, added)
+            self._slots[name] = (expr, np.concatenate([mask, added_mask]))
+            result &= added_mask
+        self._result = np.concatenate([self._result, result])
+
+    def rows(self, slots):
+        '''Positions des lignes de la sélection finale.'''
+        return np.flatnonzero(self.update(slots))
@@ -0,0 +1,135 @@
+from PyQt6.QtWidgets import (QDockWidget, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                             QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog, QMessageBox)
+from PyQt6.QtCore import Qt
+
+from memory_report import format_bytes, track_allocations
+from raster_cache import get_raster_cache
+
+
+class NumericItem(QTableWidgetItem):
+    """Cellule affichée en texte (Ko, Mo) mais triée sur sa valeur en octets"""
+    def __init__(self, value, text):
+        super().__init__(text)
+        self.setData(Qt.ItemDataRole.UserRole, value)
+        self.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+
+    def __lt__(self, other):
+        return self.data(Qt.ItemDataRole.UserRole) < other.data(Qt.ItemDataRole.UserRole)
+
+
+class MemoryPanel(QDockWidget):
+    """
+    Panneau « Diagnostic mémoire » de la fenêtre principale :
+    - une ligne par composant mesuré (colonnes, caches, cache d'images, tableau, figures, page de la carte)
+      avec l'écart depuis la mesure précédente : ce qui grossit d'une mesure à l'autre saute aux yeux,
+    - suivi tracemalloc autour d'un rafraîchissement de l'onglet affiché (mémoire gardée par ligne de code),
+    - export CSV du tout.
+    """
+    def __init__(self, window):
+        super().__init__("Diagnostic mémoire", window)
+        self.window = window
+        self.report = None
+        self._previous = {}
+
+        content = QWidget()
+        layout = QVBoxLayout(content)
+        self.lbl_summary = QLabel("")
+        layout.addWidget(self.lbl_summary)
+
+        buttons = QHBoxLayout()
+        self.btn_measure = QPushButton("Mesurer")
+        self.btn_measure.clicked.connect(self.measure)
+        self.btn_track = QPushButton("Suivre un rafraîchissement")
+        self.btn_track.setToolTip("Allocations gardées par le rafraîchissement de l'onglet affiché (tracemalloc)")
+        self.btn_track.clicked.connect(self.track_refresh)
+        self.btn_export = QPushButton("Exporter...")
+        self.btn_export.clicked.connect(self.export_report)
+        for button in (self.btn_measure, self.btn_track, self.btn_export):
+            buttons.addWidget(button)
+        layout.addLayout(buttons)
+
+        self.table_components = QTableWidget(0, 5)
+        self.table_components.setHorizontalHeaderLabels(["Composant", "Élément", "Taille", "Écart", "Détail"])
+        self.table_components.horizontalHeader().setSectionResizeMode(4, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table_components, 2)
+
+        layout.addWidget(QLabel("<b>Allocations gardées par le dernier rafraîchissement suivi :</b>"))
+        self.table_allocations = QTableWidget(0, 4)
+        self.table_allocations.setHorizontalHeaderLabels(["Ligne", "Taille", "Blocs", "Code"])
+        self.table_allocations.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table_allocations, 1)
+
+        self.setWidget(content)
+
+    def collect(self):
+        """Mesure tous les composants : DataManager (colonnes, caches) puis éléments de l'interface."""
+        window = self.window
+        report = window.data_manager.memory_report()
+        cache = get_raster_cache()
+        report.add("Cache d'images", "Vues rendues", cache.total_bytes,
+                   f"{len(cache)} vue(s), {cache.hits} réutilisée(s), {cache.misses} calculée(s)")
+        report.add_table("Onglet Exploration", window.tab_country.table_data)
+        report.add_figure("Onglet Exploration", window.tab_country.graph.figure)
+        report.add_figure("Onglet Comparaison", window.tab_comparison.graph.figure)
+        report.add_payload("Onglet Carte", "Page Plotly affichée", window.tab_map.last_html)
+        if window.tab_map.map_graph is not None:
+            report.add_figure("Onglet Carte", window.tab_map.map_graph.figure)
+        return report
+
+    def measure(self):
+        allocations = self.report.allocations if self.report is not None else None
+        self.report = self.collect()
+        self.report.allocations = allocations
+        self.fill_components()
+
+    def fill_components(self):
+        frame = self.report.to_frame()
+        table = self.table_components
+        table.setSortingEnabled(False)
+        table.setRowCount(len(frame))
+        for i, entry in enumerate(frame.itertuples(index=False)):
+            key = (entry.Composant, entry.Élément)
+            delta = entry.Octets - self._previous.get(key, entry.Octets)
+            table.setItem(i, 0, QTableWidgetItem(entry.Composant))
+            table.setItem(i, 1, QTableWidgetItem(str(entry.Élément)))
+            table.setItem(i, 2, NumericItem(entry.Octets, format_bytes(entry.Octets)))
+            table.setItem(i, 3, NumericItem(delta, f"+{format_bytes(delta)}" if delta > 0 else format_bytes(delta)))
+            table.setItem(i, 4, QTableWidgetItem(entry.Détail))
+        table.setSortingEnabled(True)
+        table.resizeColumnsToContents()
+        self._previous = {(c, e): size for c, e, size, _ in self.report.entries}
+
+        totals = ", ".join(f"{name} : {format_bytes(size)}" for name, size in self.report.by_component().items())
+        self.lbl_summary.setText(f"<b>{self.report.summary()}</b><br>{totals}")
+        self.lbl_summary.setWordWrap(True)
+
+    def track_refresh(self):
+        """Rafraîchit l'onglet affiché dans une session tracemalloc puis remesure les composants."""
+        tab = self.window.tabs.currentWidget()
+        allocations, peak = track_allocations(tab.refresh)
+        self.measure()
+        self.report.allocations = allocations
+
+        table = self.table_allocations
+        table.setRowCount(len(allocations))
+        for i, row in enumerate(allocations.itertuples(index=False)):
+            table.setItem(i, 0, QTableWidgetItem(row[0]))
+            table.setItem(i, 1, NumericItem(row[1], format_bytes(row[1])))
+            table.setItem(i, 2, NumericItem(row[2], str(row[2])))
+            table.setItem(i, 3, QTableWidgetItem(row[3]))
+        table.resizeColumnsToContents()
+        self.window.statusBar().showMessage(
+            f"Rafraîchissement suivi : {format_bytes(int(allocations['Octets alloués'].sum()))} gardés, "
+            f"pic {format_bytes(peak)}")
+
+    def export_report(self):
+        if self.report is None:
+            self.measure()
+        path, _ = QFileDialog.getSaveFileName(self, "Exporter le diagnostic mémoire", "memoire.csv",
+                                              "CSV (*.csv)")
+        if not path:
+            return
+        try:
+            self.report.to_csv(path)
+        except OSError as e:
+            QMessageBox.warning(self, "Export impossible", str(e))
@@ -0,0 +1,214 @@
+import linecache
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+# Comptabilité mémoire par composant : colonnes du jeu de données, caches du DataManager, cache d'images,
+# tableau de l'onglet Exploration (éléments de cellule), artistes des figures Matplotlib et page HTML de la
+# carte. Une session tracemalloc autour d'un rafraîchissement donne en plus les lignes de code qui ont alloué
+# (et gardé) de la mémoire : une croissance d'un rafraîchissement à l'autre y apparaît directement.
+
+# Profondeur maximale de parcours des objets (caches imbriqués)
+MAX_DEPTH = 8
+# Nombre de lignes de code gardées dans le suivi des allocations
+TOP_ALLOCATIONS = 25
+
+
+def object_size(obj, seen=None, depth=0):
+    """
+    Taille approximative (octets) d'un objet et de ce qu'il référence : tableaux NumPy (données comptées
+    une seule fois, même partagées par plusieurs vues), objets pandas (memory_usage profond), conteneurs
+    et attributs des objets. Les objets déjà comptés (seen) ne le sont pas une seconde fois.
+    """
+    if seen is None:
+        seen = set()
+    if obj is None or id(obj) in seen or depth > MAX_DEPTH:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, np.ndarray):
+        # Les vues partagent le tampon de leur tableau de base : compté une fois, au niveau de la base
+        base = _base_array(obj)
+        if base is not obj:
+            if id(base) in seen:
+                return 0
+            seen.add(id(base))
+        return base.nbytes
+    if isinstance(obj, (pd.Series, pd.Index)):
+        values = _column_buffer(obj)
+        if isinstance(values, np.ndarray):
+            return object_size(values, seen, depth + 1)
+        if id(values) in seen:
+            return 0
+        seen.add(id(values))
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, pd.DataFrame):
+        return sum(object_size(obj[column], seen, depth + 1) for column in obj.columns)
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool)):
+        return sys.getsizeof(obj)
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        items = list(obj.keys()) + list(obj.values())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        items = list(obj)
+    elif hasattr(obj, '__dict__'):
+        items = list(vars(obj).values())
+    elif hasattr(obj, '__slots__'):
+        items = [getattr(obj, name, None) for name in obj.__slots__]
+    else:
+        items = []
+    return size + sum(object_size(item, seen, depth + 1) for item in items)
+
+
+def _base_array(values):
+    while isinstance(values.base, np.ndarray):
+        values = values.base
+    return values
+
+
+def _column_buffer(series):
+    """Tableau qui porte les données d'une série : ndarray de base (types NumPy) ou tableau d'extension."""
+    if isinstance(series.dtype, np.dtype):
+        return _base_array(np.asarray(series.values))
+    return series.array
+
+
+def shared_buffers(df):
+    """Identifiants des tampons des colonnes d'un DataFrame (pour ne pas les recompter dans les caches)."""
+    return {id(_column_buffer(df[column])) for column in df.columns} | {id(df)}
+
+
+def figure_stats(figure):
+    """Nombre d'artistes d'une figure Matplotlib (tous niveaux) et taille de son tampon de rendu (octets)."""
+    count, stack = 0, [figure]
+    while stack:
+        artist = stack.pop()
+        count += 1
+        stack.extend(artist.get_children())
+    canvas = getattr(figure, 'canvas', None)
+    renderer = getattr(canvas, 'renderer', None)
+    buffer = int(renderer.width * renderer.height * 4) if renderer is not None else 0
+    return count, buffer
+
+
+@dataclass
+class MemoryReport:
+    """
+    Rapport mémoire : une ligne par élément mesuré (composant, élément, octets, détail) et,
+    après un suivi, les allocations par ligne de code (voir track_allocations).
+    """
+    entries: list = field(default_factory=list)
+    allocations: pd.DataFrame = None
+
+    def add(self, component, item, size, detail=""):
+        self.entries.append((component, item, int(size), detail))
+
+    def to_frame(self):
+        return pd.DataFrame(self.entries, columns=["Composant", "Élément", "Octets", "Détail"])
+
+    def by_component(self):
+        """Total par composant, du plus gros au plus petit."""
+        return self.to_frame().groupby("Composant", sort=False)["Octets"].sum().sort_values(ascending=False)
+
+    def total(self):
+        return sum(entry[2] for entry in self.entries)
+
+    def summary(self):
+        return f"Mémoire suivie : {format_bytes(self.total())} ({len(self.entries)} éléments)"
+
+    def to_csv(self, path):
+        """Exporte le rapport (et les allocations suivies s'il y en a) dans un fichier CSV (séparateur ;)."""
+        frame = self.to_frame()
+        if self.allocations is not None:
+            allocations = pd.DataFrame({
+                "Composant": "Allocations (suivi d'un rafraîchissement)",
+                "Élément": self.allocations["Ligne"],
+                "Octets": self.allocations["Octets alloués"],
+                "Détail": self.allocations["Blocs"].astype(str) + " bloc(s) : " + self.allocations["Code"],
+            })
+            frame = pd.concat([frame, allocations], ignore_index=True)
+        frame.to_csv(path, sep=';', index=False)
+
+    # --- MESURES PAR COMPOSANT ---
+    def add_dataframe(self, component, df):
+        """Une ligne par colonne du jeu de données (valeurs + index)."""
+        usage = df.memory_usage(index=True, deep=True)
+        for column, size in usage.items():
+            detail = "index" if column == "Index" else str(df[column].dtype)
+            self.add(component, column, size, detail)
+
+    def add_caches(self, component, owner, names):
+        """
+        Une ligne par cache d'un objet (attributs privés du DataManager, etc.). Les colonnes du DataFrame
+        référencées par un cache (vues sans copie) et les données partagées entre caches ne sont comptées qu'une fois.
+        """
+        df = getattr(owner, 'df', None)
+        seen = shared_buffers(df) if isinstance(df, pd.DataFrame) else set()
+        for name in names:
+            value = getattr(owner, name, None)
+            if value is None or (isinstance(value, dict) and not value):
+                continue
+            detail = f"{len(value)} entrée(s)" if isinstance(value, dict) else type(value).__name__
+            self.add(component, name.lstrip('_'), object_size(value, seen), detail)
+
+    def add_table(self, component, table):
+        """Tableau Qt : nombre de cellules remplies et taille des textes (estimation des éléments de cellule)."""
+        cells, text_bytes = 0, 0
+        for i in range(table.rowCount()):
+            for j in range(table.columnCount()):
+                item = table.item(i, j)
+                if item is not None:
+                    cells += 1
+                    text_bytes += sys.getsizeof(item.text())
+        # Un QTableWidgetItem coûte de l'ordre de 100 octets côté Qt, plus son wrapper Python
+        self.add(component, "Cellules du tableau", cells * 100 + text_bytes,
+                 f"{table.rowCount()} lignes × {table.columnCount()} colonnes, {cells} éléments")
+
+    def add_figure(self, component, figure):
+        artists, buffer = figure_stats(figure)
+        self.add(component, "Figure Matplotlib", buffer, f"{artists} artistes, tampon de rendu")
+
+    def add_payload(self, component, item, text):
+        """Contenu texte (page HTML) : taille encodée en UTF-8."""
+        self.add(component, item, len(text.encode('utf-8')) if text else 0, "HTML")
+
+
+def format_bytes(size):
+    for unit in ("o", "Ko", "Mo"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} Go"
+
+
+def track_allocations(func, top=TOP_ALLOCATIONS):
+    """
+    Exécute func dans une session tracemalloc et renvoie (DataFrame des allocations restantes par ligne
+    de code, pic de mémoire en octets). Seule la mémoire encore allouée après l'appel est listée :
+    c'est elle qui s'accumule si un rafraîchissement garde des références.
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        func()
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if started:
+            tracemalloc.stop()
+
+    ignored = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, linecache.__file__)]
+    stats = after.filter_traces(ignored).compare_to(before.filter_traces(ignored), 'lineno')
+    rows = []
+    for stat in stats[:top]:
+        frame = stat.traceback[0]
+        rows.append((f"{frame.filename}:{frame.lineno}", stat.size_diff, stat.count_diff,
+                     linecache.getline(frame.filename, frame.lineno).strip()))
+    return pd.DataFrame(rows, columns=["Ligne", "Octets alloués", "Blocs", "Code"]), peak
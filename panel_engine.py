@@ -0,0 +1,156 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Tableau dense Pays × Année × Indicateur construit une fois au chargement.
+# Les pays entrent et sortent du rapport selon les éditions : une série temporelle lue ligne à ligne
+# relie par un trait droit deux années séparées par un trou. Ici chaque cellule a sa place, les
+# cellules manquantes sont signalées et peuvent être estimées (interpolation linéaire ou report
+# de la dernière valeur), uniquement entre la première et la dernière année observée du pays.
+
+# Méthodes d'estimation des cellules manquantes (None = laisser un trou dans la courbe)
+FILL_METHODS = {
+    None: "Laisser un trou",
+    "linear": "Interpolation linéaire",
+    "ffill": "Report de la dernière valeur",
+}
+
+
+@dataclass
+class PanelView:
+    """
+    Séries temporelles d'un indicateur pour les pays d'une sélection de lignes :
+    - countries : noms des pays (ordre de première apparition dans la sélection),
+    - years : années (numériques, toutes les années du jeu de données),
+    - values : matrice pays × années (NaN = trou),
+    - imputed : masque des cellules estimées (absentes du jeu de données).
+    """
+    countries: np.ndarray
+    years: np.ndarray
+    values: np.ndarray
+    imputed: np.ndarray
+
+    def mean_by_year(self):
+        """Moyenne de chaque année sur les pays de la vue (NaN si aucune valeur cette année-là)"""
+        known = ~np.isnan(self.values)
+        counts = known.sum(axis=0)
+        sums = np.where(known, self.values, 0.0).sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, sums / counts, np.nan)
+
+
+class CountryYearPanel:
+    """
+    Cube dense values[pays, année, indicateur] et correspondance avec les lignes du DataFrame.
+    - present : la cellule (pays, année) existe dans le jeu de données,
+    - missing : cellule absente entre la première et la dernière année du pays (trou signalé).
+    En cas de doublon (Country, Year), la dernière ligne l'emporte.
+    """
+    def __init__(self, df, columns):
+        self.columns = [c for c in columns if c in df.columns]
+        self._column_pos = {c: i for i, c in enumerate(self.columns)}
+        country_codes, self.countries = pd.factorize(df['Country'].astype(str), sort=True)
+        year_codes, self.years = pd.factorize(df['Year'].astype(str), sort=True)
+        self.row_country = country_codes
+        self.row_year = year_codes
+
+        # Années numériques pour l'axe des graphiques et l'interpolation (rang si l'année n'est pas un nombre)
+        numbers = pd.to_numeric(pd.Series(self.years), errors='coerce').to_numpy(dtype=float)
+        self.year_numbers = numbers if not np.isnan(numbers).any() else np.arange(len(self.years), dtype=float)
+
+        n_countries, n_years = len(self.countries), len(self.years)
+        self.values = np.full((n_countries, n_years, len(self.columns)), np.nan)
+        self.values[country_codes, year_codes] = df[self.columns].to_numpy(dtype=float, na_value=np.nan)
+        self.row_of = np.full((n_countries, n_years), -1, dtype=np.intp)
+        self.row_of[country_codes, year_codes] = np.arange(len(df))
+        self.present = self.row_of >= 0
+        self.missing = _inside_span(self.present) & ~self.present
+        self._filled = {None: self.values}
+        self._year_pos = {y: i for i, y in enumerate(self.years)}
+        # Ligne de l'année la plus récente de chaque pays (région, libellés à jour)
+        last_year = n_years - 1 - self.present[:, ::-1].argmax(axis=1) if n_years else np.zeros(0, dtype=np.intp)
+        self.latest_row = self.row_of[np.arange(n_countries), last_year]
+
+    def column_values(self, column):
+        """Matrice pays × années d'un indicateur (vue sur le cube, sans copie)"""
+        return self.values[:, :, self._column_pos[column]]
+
+    def selected_cells(self, rows):
+        """Masque pays × années des cellules dont la ligne fait partie de la sélection (positions)"""
+        rows = np.asarray(rows, dtype=np.intp)
+        selected = np.zeros(self.present.shape, dtype=bool)
+        selected[self.row_country[rows], self.row_year[rows]] = True
+        return selected
+
+    def year_position(self, year):
+        """Position d'une année dans self.years (None si elle n'existe pas)"""
+        return self._year_pos.get(str(year))
+
+    def change(self, column, year_from, year_to):
+        """
+        Évolution d'un indicateur entre deux années pour tous les pays : (départ, arrivée, écart),
+        trois tableaux alignés sur self.countries (NaN si le pays manque l'une des deux années).
+        Une simple soustraction de deux tranches du cube : changer d'année ne refiltre rien.
+        """
+        i, j = self.year_position(year_from), self.year_position(year_to)
+        if i is None or j is None:
+            empty = np.full(len(self.countries), np.nan)
+            return empty, empty, empty
+        values = self.column_values(column)
+        return values[:, i], values[:, j], values[:, j] - values[:, i]
+
+    def filled(self, method):
+        """
+        Cube avec les cellules manquantes estimées, calculé une fois par méthode puis gardé en cache.
+        Seules les cellules entre deux années observées du pays sont estimées (pas d'extrapolation).
+
+        :param method: None, "linear" (interpolation sur l'année) ou "ffill" (report de la dernière valeur)
+        """
+        if method not in self._filled:
+            if method not in FILL_METHODS:
+                raise ValueError(f"Méthode d'estimation inconnue : {method}")
+            n_countries, n_years, n_columns = self.values.shape
+            # Une colonne par (pays, indicateur), les années en lignes : une seule passe pandas pour tout le cube
+            wide = pd.DataFrame(self.values.transpose(1, 0, 2).reshape(n_years, -1), index=self.year_numbers)
+            if method == "linear":
+                wide = wide.interpolate(method="index", limit_area="inside")
+            else:
+                wide = wide.ffill(limit_area="inside")
+            self._filled[method] = wide.to_numpy().reshape(n_years, n_countries, n_columns).transpose(1, 0, 2)
+        return self._filled[method]
+
+    def view(self, rows, column, fill=None):
+        """
+        Séries d'un indicateur pour les pays des lignes sélectionnées (positions dans le DataFrame).
+        Une cellule dont la ligne existe mais n'est pas sélectionnée (exclue par un filtre) reste vide ;
+        seules les cellules absentes du jeu de données sont estimées, entre la première et la dernière
+        année sélectionnée du pays.
+
+        :param rows: Positions des lignes sélectionnées
+        :param column: Indicateur à lire
+        :param fill: Méthode d'estimation (voir FILL_METHODS)
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        j = self._column_pos[column]
+        codes = pd.unique(self.row_country[rows])
+        selected = self.selected_cells(rows)[codes]
+
+        observed = np.where(selected, self.values[codes, :, j], np.nan)
+        imputed = np.zeros(observed.shape, dtype=bool)
+        if fill is not None and len(codes):
+            estimable = _inside_span(selected) & (~self.present[codes] | (selected & np.isnan(observed)))
+            estimates = self.filled(fill)[codes, :, j]
+            imputed = estimable & ~np.isnan(estimates)
+            observed = np.where(imputed, estimates, observed)
+        return PanelView(self.countries[codes].to_numpy(), self.year_numbers, observed, imputed)
+
+
+def _inside_span(mask):
+    """Cellules entre la première et la dernière cellule vraie de chaque ligne (incluses)"""
+    if mask.shape[1] == 0:
+        return mask.copy()
+    positions = np.arange(mask.shape[1])
+    first = mask.argmax(axis=1)
+    last = mask.shape[1] - 1 - mask[:, ::-1].argmax(axis=1)
+    return mask.any(axis=1)[:, None] & (positions >= first[:, None]) & (positions <= last[:, None])
@@ -0,0 +1,76 @@
+import numpy as np
+
+
+class SortedColumnIndex:
+    """
+    Index trié d'une colonne numérique : permutation qui trie les valeurs (valeurs manquantes à la fin).
+    Un intervalle [low, high] se résout par deux recherches dichotomiques (np.searchsorted)
+    au lieu de deux comparaisons sur toute la colonne.
+    """
+    def __init__(self, values):
+        values = np.asarray(values, dtype=float)
+        self.n_rows = len(values)
+
+        # argsort place les NaN en dernier : les n_valid premières positions sont les valeurs connues
+        self.order = np.argsort(values, kind='stable')
+        self.sorted_values = values[self.order]
+        self.n_valid = int(np.count_nonzero(~np.isnan(values)))
+        self.has_nulls = self.n_valid < self.n_rows
+
+        if self.n_valid:
+            self.min = self.sorted_values[0]
+            self.max = self.sorted_values[self.n_valid - 1]
+        else:
+            self.min = self.max = np.nan
+
+    def append(self, values):
+        '''
+        Ajoute des lignes à la fin de la colonne (positions n_rows, n_rows + 1, ...) sans retrier :
+        les nouvelles valeurs, triées entre elles, sont insérées par recherche dichotomique.
+        Le résultat est identique à un index reconstruit sur la colonne complète.
+        '''
+        values = np.asarray(values, dtype=float)
+        new_rows = np.arange(self.n_rows, self.n_rows + len(values))
+        valid = ~np.isnan(values)
+        order = np.argsort(values[valid], kind='stable')
+        added_values, added_rows = values[valid][order], new_rows[valid][order]
+
+        # side='right' : à valeur égale, les nouvelles lignes (positions plus grandes) passent après (tri stable)
+        known = self.sorted_values[:self.n_valid]
+        positions = np.searchsorted(known, added_values, side='right')
+        sorted_known = np.insert(known, positions, added_values)
+        self.order = np.concatenate([np.insert(self.order[:self.n_valid], positions, added_rows),
+                                     self.order[self.n_valid:], new_rows[~valid]])
+        self.sorted_values = np.concatenate([sorted_known, np.full(np.count_nonzero(~valid) + self.n_rows - self.n_valid, np.nan)])
+        self.n_rows += len(values)
+        self.n_valid = len(sorted_known)
+        self.has_nulls = self.n_valid < self.n_rows
+        if self.n_valid:
+            self.min = self.sorted_values[0]
+            self.max = self.sorted_values[self.n_valid - 1]
+
+    def bounds(self, low=None, high=None):
+        '''Positions [début, fin) de l'intervalle dans les valeurs triées.'''
+        valid = self.sorted_values[:self.n_valid]
+        start = 0 if low is None else int(np.searchsorted(valid, low, side='left'))
+        stop = self.n_valid if high is None else int(np.searchsorted(valid, high, side='right'))
+        return start, max(start, stop)
+
+    def covers(self, low=None, high=None):
+        '''Indique si l'intervalle contient toutes les valeurs connues (filtre à sa plage par défaut).'''
+        if self.n_valid == 0:
+            return True
+        return (low is None or low <= self.min) and (high is None or high >= self.max)
+
+    def count(self, low=None, high=None, keep_null=False):
+        '''Nombre exact de lignes dans l'intervalle, sans parcourir la colonne.'''
+        start, stop = self.bounds(low, high)
+        return stop - start + (self.n_rows - self.n_valid if keep_null else 0)
+
+    def rows(self, low=None, high=None, keep_null=False):
+        '''Positions des lignes dans l'intervalle (dans l'ordre des valeurs, pas des lignes).'''
+        start, stop = self.bounds(low, high)
+        rows = self.order[start:stop]
+        if keep_null:
+            rows = np.concatenate([rows, self.order[self.n_valid:]])
+        return rows
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+# Classements (top-K / bottom-K) d'un indicateur pour un sous-ensemble de lignes.
+# Pour chaque indicateur, l'ordre décroissant des lignes de chaque année est calculé une seule fois
+# (un lexsort par indicateur). Un classement sur une année se lit alors en parcourant cet ordre et en
+# gardant les lignes sélectionnées, sans trier ; un sous-ensemble sur plusieurs années passe par une
+# sélection partielle (argpartition) des K meilleures valeurs, seules triées ensuite.
+
+# Nombre de barres par défaut du classement
+DEFAULT_TOP_K = 15
+
+
+class RankingIndex:
+    """
+    Ordres par année de chaque indicateur : orders[colonne] = positions des lignes triées par
+    (année, valeur décroissante, position), valeurs manquantes en fin d'année.
+    """
+    def __init__(self, df, columns):
+        self.columns = [c for c in columns if c in df.columns]
+        self.year_codes, self.years = pd.factorize(df['Year'].astype(str), sort=True)
+        self.n_rows = len(df)
+        self.values = {}
+        self.orders = {}
+        positions = np.arange(self.n_rows)
+        for column in self.columns:
+            values = df[column].to_numpy(dtype=float, na_value=np.nan)
+            self.values[column] = values
+            # lexsort : dernière clé = clé principale ; -NaN reste NaN, trié en fin de chaque année
+            self.orders[column] = np.lexsort((positions, -values, self.year_codes))
+        # Début de chaque année dans les ordres (les années sont la clé principale de tous les ordres)
+        self.year_starts = np.concatenate([[0], np.bincount(self.year_codes, minlength=len(self.years)).cumsum()])
+
+    def year_order(self, column, year_code):
+        """Positions des lignes d'une année, de la plus grande à la plus petite valeur (NaN en fin)."""
+        return self.orders[column][self.year_starts[year_code]:self.year_starts[year_code + 1]]
+
+    def top_k(self, rows, column, k=DEFAULT_TOP_K, largest=True):
+        """
+        Les k premières (ou dernières) lignes de la sélection pour un indicateur : (positions, valeurs, rangs).
+        Positions et valeurs sont dans l'ordre du classement affiché (la meilleure d'abord, ou la pire
+        d'abord si largest=False) ; les rangs sont des rangs denses décroissants calculés dans la sélection
+        (1 = plus grande valeur de la sélection, ex aequo au même rang).
+
+        :param rows: Positions des lignes sélectionnées
+        :param k: Nombre de lignes du classement
+        :param largest: True pour les plus grandes valeurs, False pour les plus petites
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        values = self.values[column]
+        year_codes = self.year_codes[rows]
+        if len(rows) and (year_codes == year_codes[0]).all():
+            # Une seule année : l'ordre en cache, filtré par la sélection (aucun tri)
+            order = self.year_order(column, year_codes[0])
+            selected = np.zeros(self.n_rows, dtype=bool)
+            selected[rows] = True
+            ranked = order[selected[order]]
+            ranked = ranked[~np.isnan(values[ranked])]
+            ranked_values = values[ranked]
+            dense = np.concatenate([[1], 1 + np.cumsum(ranked_values[1:] != ranked_values[:-1])]) \
+                if len(ranked) else np.zeros(0, dtype=np.intp)
+            chosen = np.arange(min(k, len(ranked)))
+            if not largest:
+                chosen = len(ranked) - 1 - chosen
+            return ranked[chosen], ranked_values[chosen], dense[chosen].astype(np.intp)
+
+        # Sous-ensemble sur plusieurs années : sélection partielle des k valeurs extrêmes
+        rows = rows[~np.isnan(values[rows])]
+        subset = values[rows]
+        keys = -subset if largest else subset
+        if len(rows) > k:
+            part = np.argpartition(keys, k - 1)[:k]
+        else:
+            part = np.arange(len(rows))
+        part = part[np.lexsort((rows[part], keys[part]))]
+        distinct = np.unique(subset)
+        ranks = len(distinct) - np.searchsorted(distinct, subset[part], side='right') + 1
+        return rows[part], subset[part], ranks.astype(np.intp)
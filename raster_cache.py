@@ -0,0 +1,77 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+# Cache LRU borné des rendus déjà affichés : images des graphiques (QImage) et pages HTML de la carte.
+# La clé décrit la vue : type de graphique, signature des données affichées et taille du widget ;
+# revenir à une vue vue quelques secondes plus tôt ne relance ni le filtrage du graphique ni Matplotlib.
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def data_signature(*parts):
+    """
+    Empreinte compacte des données d'une vue : positions des lignes (tableaux NumPy),
+    paramètres (textes, nombres, listes...). Deux vues de même signature affichent la même chose.
+    """
+    sha = hashlib.sha1()
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            sha.update(str(part.dtype).encode())
+            sha.update(np.ascontiguousarray(part).tobytes())
+        else:
+            sha.update(repr(part).encode())
+        sha.update(b"\x00")
+    return sha.hexdigest()
+
+
+class RasterCache:
+    """Cache LRU borné en octets : les entrées les moins récemment affichées sont retirées en premier."""
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()  # clé -> (valeur, taille)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value, size):
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self.total_bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (value, size)
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes:
+            _, (_, old_size) = self._entries.popitem(last=False)
+            self.total_bytes -= old_size
+
+    def clear(self):
+        self._entries.clear()
+        self.total_bytes = 0
+
+
+_cache = None
+
+
+def get_raster_cache():
+    """Renvoie le cache partagé par tous les graphiques et la carte."""
+    global _cache
+    if _cache is None:
+        _cache = RasterCache()
+    return _cache
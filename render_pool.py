@@ -0,0 +1,139 @@
+import atexit
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Rendu des graphiques lourds dans des processus séparés (backend Agg, sans Qt).
+# Un graphique est décrit par une "spec" : un dictionnaire avec le type de graphique,
+# les tableaux de données et l'habillage. La même fonction draw_spec sert au rendu
+# dans un processus et au rendu interactif dans le canvas Qt.
+
+COLORS = ['b', 'g', 'r', 'c', 'm', 'y', 'k', 'orange', 'purple', 'brown']
+
+
+def draw_series(ax, x, y, imputed=None, **style):
+    """
+    Trace une courbe temporelle : un NaN coupe la ligne (année manquante, pas de trait droit par-dessus le trou).
+    Les valeurs estimées (masque imputed) sont reliées en pointillés avec des marqueurs creux.
+    """
+    y = np.asarray(y, dtype=float)
+    if imputed is None or not np.any(imputed):
+        return ax.plot(x, y, **style)
+    x, imputed = np.asarray(x), np.asarray(imputed, dtype=bool)
+    lines = ax.plot(x, np.where(imputed, np.nan, y), **style)
+    color = lines[0].get_color()
+    # Segments qui touchent une valeur estimée : pointillés (les segments observés restent pleins, dessinés par-dessus)
+    touching = imputed | np.r_[imputed[1:], False] | np.r_[False, imputed[:-1]]
+    ax.plot(x, np.where(touching, y, np.nan), linestyle='--', color=color, alpha=0.7, zorder=lines[0].get_zorder() - 1)
+    ax.plot(x[imputed], y[imputed], linestyle='none', marker=style.get('marker', 'o'),
+            markerfacecolor='none', color=color)
+    return lines
+
+
+def _draw_scatter(ax, spec):
+    # alpha=0.7 : Transparence (0 à 1) pour voir les points superposés
+    # edgecolors='k' : Contour noir autour des cercles pour la netteté
+    if spec.get("groups") is not None:
+        # Groupes de pays (k-means) : une couleur et une entrée de légende par groupe
+        groups = np.asarray(spec["groups"])
+        for g, color in enumerate(spec["group_colors"]):
+            shown = groups == g
+            if not shown.any():
+                continue
+            ax.scatter(spec["x"][shown], spec["y"][shown], alpha=0.7, c=color, edgecolors='k', label=f"Groupe {g + 1}")
+        ax.legend(fontsize=8)
+    else:
+        ax.scatter(spec["x"], spec["y"], alpha=0.7, c=spec.get("c", 'blue'), edgecolors='k')
+    ax.set_xlabel(spec["xlabel"])
+    ax.set_ylabel(spec["ylabel"])
+    ax.set_title(spec["title"])
+    # Grille en pointillés pour faciliter la lecture
+    ax.grid(True, linestyle='--', alpha=0.6)
+
+
+def _draw_multi_curves(ax, spec):
+    # Une courbe par série, sur le MEME graphique
+    for i, serie in enumerate(spec["series"]):
+        # i % len(COLORS) permet de boucler sur la palette si on a plus de séries que de couleurs
+        color = COLORS[i % len(COLORS)]
+        draw_series(ax, serie["x"], serie["y"], serie.get("imputed"), marker='o', label=serie["label"], color=color)
+    ax.set_xlabel(spec["xlabel"])
+    ax.set_ylabel(spec["ylabel"])
+    ax.set_title(spec["title"])
+    # Affiche la légende (boîte avec noms des séries)
+    ax.legend()
+    ax.grid(True)
+
+
+_DRAWERS = {"scatter": _draw_scatter, "multi_curves": _draw_multi_curves}
+
+
+def draw_spec(ax, spec):
+    """Dessine une spec de graphique sur un axe Matplotlib."""
+    if spec.get("empty"):
+        ax.text(0.5, 0.5, spec["empty"], ha='center')
+        return
+    _DRAWERS[spec["kind"]](ax, spec)
+
+
+def render_to_shared_memory(spec, width, height, dpi):
+    """
+    Exécuté dans un processus du pool : dessine la spec avec Agg et copie l'image RGBA dans
+    un segment de mémoire partagée. Renvoie (nom du segment, largeur, hauteur) ;
+    le processus principal lit puis libère le segment.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    figure = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+    canvas = FigureCanvasAgg(figure)
+    draw_spec(figure.add_subplot(111), spec)
+    figure.tight_layout()
+    canvas.draw()
+
+    buffer = np.asarray(canvas.buffer_rgba())
+    h, w = buffer.shape[:2]
+    shm = shared_memory.SharedMemory(create=True, size=buffer.nbytes)
+    np.ndarray(buffer.shape, dtype=np.uint8, buffer=shm.buf)[:] = buffer
+    shm.close()
+    return shm.name, w, h
+
+
+def release_shared_raster(name):
+    """Libère un segment de mémoire partagée sans le lire (image devenue inutile)."""
+    shm = shared_memory.SharedMemory(name=name)
+    shm.close()
+    shm.unlink()
+
+
+class RenderPool:
+    """Petit pool de processus de rendu, créé à la première utilisation."""
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self._executor = None
+
+    def submit(self, spec, width, height, dpi):
+        if self._executor is None:
+            # "spawn" : les processus de rendu ne doivent pas hériter de l'état Qt du processus principal
+            self._executor = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor.submit(render_to_shared_memory, spec, width, height, dpi)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_pool = None
+
+
+def get_render_pool():
+    """Renvoie le pool de rendu partagé par tous les graphiques."""
+    global _pool
+    if _pool is None:
+        _pool = RenderPool()
+        atexit.register(_pool.shutdown)
+    return _pool
@@ -0,0 +1,78 @@
+import bisect
+import re
+import unicodedata
+
+import numpy as np
+
+# Recherche incrémentale de pays insensible à la casse et aux accents ("cote" trouve "Côte d'Ivoire").
+# - moins de 3 caractères : début d'un mot du nom (liste triée des mots + recherche dichotomique),
+# - 3 caractères ou plus : n'importe où dans le nom (index de trigrammes, puis vérification).
+
+_WORD_SPLIT = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text):
+    """Texte sans accents et en minuscules (forme de comparaison de l'index)."""
+    decomposed = unicodedata.normalize("NFKD", str(text))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class CountrySearchIndex:
+    """
+    Index construit une fois sur une liste de noms. search() renvoie les positions des noms
+    correspondants (dans l'ordre de la liste) ; les widgets s'en servent pour masquer des lignes
+    sans reconstruire leurs éléments.
+    """
+    def __init__(self, names):
+        self.names = list(names)
+        self.normalized = [normalize(name) for name in self.names]
+
+        # Mots triés (mot, position du nom) pour la recherche par préfixe
+        words = sorted((word, i) for i, name in enumerate(self.normalized)
+                       for word in _WORD_SPLIT.split(name) if word)
+        self._words = [w for w, _ in words]
+        self._word_ids = np.array([i for _, i in words], dtype=np.intp)
+
+        # Trigramme -> positions (triées) des noms qui le contiennent
+        postings = {}
+        for i, name in enumerate(self.normalized):
+            for gram in _trigrams(name):
+                postings.setdefault(gram, []).append(i)
+        self._trigrams = {gram: np.array(ids, dtype=np.intp) for gram, ids in postings.items()}
+
+    def __len__(self):
+        return len(self.names)
+
+    def search(self, query):
+        """Positions (triées) des noms correspondant à la requête ; tous les noms si elle est vide."""
+        query = normalize(query).strip()
+        if not query:
+            return np.arange(len(self.names))
+
+        if len(query) < 3:
+            lo = bisect.bisect_left(self._words, query)
+            hi = bisect.bisect_left(self._words, query + "\uffff")
+            return np.unique(self._word_ids[lo:hi])
+
+        # Intersection des listes de trigrammes, de la plus courte à la plus longue
+        lists = [self._trigrams.get(gram) for gram in _trigrams(query)]
+        if any(ids is None for ids in lists):
+            return np.array([], dtype=np.intp)
+        lists.sort(key=len)
+        candidates = lists[0]
+        for ids in lists[1:]:
+            candidates = np.intersect1d(candidates, ids, assume_unique=True)
+            if not len(candidates):
+                break
+        # Les trigrammes peuvent être présents dans le désordre : vérification sur les candidats
+        return np.array([i for i in candidates if query in self.normalized[i]], dtype=np.intp)
+
+    def matches(self, query):
+        """Masque booléen (un élément par nom) des noms correspondant à la requête."""
+        mask = np.zeros(len(self.names), dtype=bool)
+        mask[self.search(query)] = True
+        return mask
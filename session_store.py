@@ -0,0 +1,136 @@
+import base64
+import hashlib
+import json
+import os
+import pickle
+
+from column_store import MANIFEST_NAME
+
+# Instantané de session : état des filtres de chaque onglet, index et agrégats calculés,
+# dernières images des graphiques. Il n'est relu que si le jeu de données n'a pas changé.
+# L'état des onglets et les images sont écrits en JSON ; seuls les caches des moteurs de calcul sont
+# picklés, dans un fichier à part relu par un Unpickler qui n'accepte que les classes listées ci-dessous
+# (un fichier de session modifié ne peut pas exécuter de code au démarrage).
+SESSION_VERSION = 3
+DEFAULT_SESSION_PATH = os.path.join(os.path.expanduser("~"), ".happiness_analyzer", "session.json")
+
+# Classes autorisées dans le fichier des caches : moteurs de calcul et types de données qu'ils contiennent
+ALLOWED_CACHE_CLASSES = {
+    "anomaly_engine": {"AnomalyReport"},
+    "bootstrap_engine": {"BootstrapIntervals"},
+    "cluster_engine": {"CountryClusters"},
+    "decomposition_engine": {"ScoreDecomposition"},
+    "histogram_engine": {"ScoreHistogram"},
+    "range_index": {"SortedColumnIndex"},
+    "ranking_engine": {"RankingIndex"},
+    "similarity_index": {"SimilarityIndex"},
+    "builtins": {"slice"},
+    "numpy": {"dtype", "ndarray"},
+    "numpy.core.multiarray": {"_reconstruct", "scalar"},
+    "numpy._core.multiarray": {"_reconstruct", "scalar"},
+    "numpy.core.numeric": {"_frombuffer"},
+    "numpy._core.numeric": {"_frombuffer"},
+    "pandas": {"DataFrame", "Series", "Index", "RangeIndex", "StringDtype"},
+    "pandas.arrays": {"ArrowStringArray"},
+    "pandas._libs.internals": {"_unpickle_block"},
+    "pandas.core.indexes.base": {"_new_Index"},
+    "pandas.core.internals.managers": {"BlockManager", "SingleBlockManager"},
+    "pyarrow.lib": {"_restore_array", "py_buffer", "type_for_alias"},
+    "scipy.spatial._ckdtree": {"cKDTree"},
+}
+
+# Taille des blocs lus au début et à la fin du fichier pour l'empreinte
+_FINGERPRINT_BLOCK = 64 * 1024
+
+
+def dataset_fingerprint(path):
+    """
+    Empreinte du jeu de données : taille, date de modification et hachage du début et de la fin du fichier.
+    Reste rapide même pour un très gros fichier. Pour un column store, on prend l'empreinte du manifeste.
+    """
+    if os.path.isdir(path):
+        path = os.path.join(path, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+
+    stat = os.stat(path)
+    sha = hashlib.sha1()
+    with open(path, "rb") as f:
+        sha.update(f.read(_FINGERPRINT_BLOCK))
+        if stat.st_size > _FINGERPRINT_BLOCK:
+            f.seek(max(_FINGERPRINT_BLOCK, stat.st_size - _FINGERPRINT_BLOCK))
+            sha.update(f.read())
+    return (stat.st_size, stat.st_mtime_ns, sha.hexdigest())
+
+
+class CacheUnpickler(pickle.Unpickler):
+    """Unpickler limité aux classes de ALLOWED_CACHE_CLASSES (toute autre référence est refusée)."""
+    def find_class(self, module, name):
+        if name in ALLOWED_CACHE_CLASSES.get(module, ()):
+            return super().find_class(module, name)
+        raise pickle.UnpicklingError(f"Classe non autorisée dans les caches : {module}.{name}")
+
+
+def caches_path(path):
+    """Fichier des caches picklés, à côté du fichier JSON de la session."""
+    return os.path.splitext(path)[0] + "_caches.pkl"
+
+
+def _encode(value):
+    # Images PNG (bytes) en base64 dans le JSON
+    if isinstance(value, (bytes, bytearray)):
+        return {"__bytes__": base64.b64encode(value).decode("ascii")}
+    raise TypeError(f"Valeur non enregistrable dans la session : {type(value).__name__}")
+
+
+def _decode(obj):
+    if set(obj) == {"__bytes__"}:
+        return base64.b64decode(obj["__bytes__"])
+    return obj
+
+
+def _replace(data, path):
+    # Écriture dans un fichier temporaire puis renommage
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def save_session(snapshot, path=DEFAULT_SESSION_PATH):
+    """Écrit l'instantané : état et images en JSON, caches des moteurs picklés à part."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    state = {key: value for key, value in snapshot.items() if key != "caches"}
+    _replace(pickle.dumps(snapshot.get("caches", {}), protocol=pickle.HIGHEST_PROTOCOL), caches_path(path))
+    _replace(json.dumps({"version": SESSION_VERSION, **state}, default=_encode).encode("utf-8"), path)
+
+
+def load_session(fingerprint, path=DEFAULT_SESSION_PATH):
+    """
+    Relit l'instantané. Renvoie None s'il est absent, illisible, d'une autre version
+    ou si l'empreinte ne correspond pas au jeu de données actuel.
+    Des caches illisibles ou contenant une classe non autorisée sont ignorés (recalculés à la demande).
+    """
+    if fingerprint is None or not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            snapshot = json.load(f, object_hook=_decode)
+    except Exception as e:
+        print(f"Instantané de session ignoré : {e}")
+        return None
+
+    if snapshot.get("version") != SESSION_VERSION or snapshot.get("fingerprint") != list(fingerprint):
+        return None
+
+    snapshot["caches"] = {}
+    try:
+        with open(caches_path(path), "rb") as f:
+            caches = CacheUnpickler(f).load()
+        if isinstance(caches, dict):
+            snapshot["caches"] = caches
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Caches de session ignorés : {e}")
+    return snapshot
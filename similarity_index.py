@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # scipy est optionnel : recherche exacte par distances vectorisées sinon
+    cKDTree = None
+
+# Les six indicateurs qui composent le score de bonheur
+SIMILARITY_FEATURES = [
+    "Economy (GDP per Capita)", "Family", "Health (Life Expectancy)",
+    "Freedom", "Trust (Government Corruption)", "Generosity",
+]
+
+
+class SimilarityIndex:
+    """
+    Index des k plus proches voisins pour une année : pays décrits par les indicateurs
+    standardisés (moyenne 0, écart-type 1), rangés dans un KD-tree (scipy) construit une seule fois.
+    Les pays avec un indicateur manquant sont exclus.
+    """
+    def __init__(self, df_year, features=SIMILARITY_FEATURES):
+        self.features = list(features)
+        data = df_year.dropna(subset=self.features)
+        self.countries = data['Country'].astype(str).to_numpy()
+
+        values = data[self.features].to_numpy(dtype=float)
+        self.mean = values.mean(axis=0) if len(values) else np.zeros(len(self.features))
+        std = values.std(axis=0) if len(values) else np.ones(len(self.features))
+        self.std = np.where(std > 0, std, 1.0)
+        self.points = (values - self.mean) / self.std
+
+        self.tree = cKDTree(self.points) if (cKDTree is not None and len(self.points)) else None
+        self._position = {c: i for i, c in enumerate(self.countries)}
+
+    def __contains__(self, country):
+        return country in self._position
+
+    def _knn(self, points, k):
+        '''Distances et positions des k plus proches voisins de chaque point (tableaux (n, k)).'''
+        k = min(k, len(self.points))
+        if self.tree is not None:
+            dist, idx = self.tree.query(points, k=k)
+            return dist.reshape(len(points), k), idx.reshape(len(points), k)
+
+        # Sans scipy : distances de tous les couples en une opération, puis sélection partielle
+        d2 = ((points[:, None, :] - self.points[None, :, :]) ** 2).sum(axis=2)
+        idx = np.argpartition(d2, k - 1, axis=1)[:, :k]
+        part = np.take_along_axis(d2, idx, axis=1)
+        order = np.argsort(part, axis=1)
+        idx = np.take_along_axis(idx, order, axis=1)
+        return np.sqrt(np.take_along_axis(d2, idx, axis=1)), idx
+
+    def query(self, country, k=5):
+        """
+        Renvoie les k pays les plus proches du pays donné (lui-même exclu),
+        sous forme de DataFrame (Country, Distance) trié par distance croissante.
+        """
+        if country not in self._position or len(self.points) < 2:
+            return pd.DataFrame(columns=['Country', 'Distance'])
+        dist, idx = self._knn(self.points[[self._position[country]]], k + 1)
+        keep = idx[0] != self._position[country]
+        return pd.DataFrame({'Country': self.countries[idx[0][keep]][:k], 'Distance': dist[0][keep][:k]})
+
+    def query_all(self, k=5):
+        """
+        Requête groupée pour tous les pays à la fois.
+        Renvoie un DataFrame (Country, Rank, Neighbor, Distance) avec k lignes par pays.
+        """
+        n = len(self.points)
+        if n < 2:
+            return pd.DataFrame(columns=['Country', 'Rank', 'Neighbor', 'Distance'])
+        k = min(k, n - 1)
+        dist, idx = self._knn(self.points, k + 1)
+
+        # On retire le pays lui-même de ses voisins (en cas d'égalité de distance il peut ne pas être en tête)
+        not_self = idx != np.arange(n)[:, None]
+        # Garde les k premiers voisins différents du pays de chaque ligne
+        keep = not_self & (np.cumsum(not_self, axis=1) <= k)
+        rows = np.repeat(np.arange(n), k)
+        return pd.DataFrame({
+            'Country': self.countries[rows],
+            'Rank': np.tile(np.arange(1, k + 1), n),
+            'Neighbor': self.countries[idx[keep]],
+            'Distance': dist[keep],
+        })
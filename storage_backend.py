@@ -0,0 +1,282 @@
+import re
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from filter_expr import And, Or, Not, Range, IsIn, IsNull, Derived, compile_filter
+
+# Stockage des données derrière une interface commune (StorageBackend) :
+# - PandasBackend : le DataFrame en mémoire (CSV ou column store), filtres évalués par filter_expr,
+# - SQLiteBackend : un fichier SQLite indexé ; les filtres et les agrégats sont traduits en SQL
+#   (clause WHERE paramétrée, GROUP BY) et les résultats reviennent par paquets (fetchmany) sous forme
+#   de tableaux NumPy. L'archive complète de toutes les éditions peut être interrogée sans la charger.
+
+SQLITE_EXTENSIONS = (".sqlite", ".sqlite3", ".db")
+DEFAULT_TABLE = "happiness"
+# Nombre de lignes lues à chaque appel fetchmany
+FETCH_SIZE = 10000
+# Colonnes texte indexées (en plus des colonnes numériques)
+KEY_COLUMNS = ("Year", "Region", "Country")
+
+# Agrégats proposés et fonction SQL correspondante
+AGGREGATES = {"mean": "AVG", "sum": "SUM", "min": "MIN", "max": "MAX", "count": "COUNT"}
+
+
+def is_sqlite_file(path):
+    """Indique si le chemin désigne une base SQLite (d'après l'extension)."""
+    return str(path).lower().endswith(SQLITE_EXTENSIONS)
+
+
+def _quote(name):
+    """Nom de table ou de colonne entre guillemets SQL (les noms contiennent des espaces et des parenthèses)"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+class StorageBackend:
+    """
+    Interface commune des stockages. Les résultats sont indexés par la position des lignes
+    dans le jeu de données (comme DataManager.filter).
+    """
+    def distinct(self, column, dropna=True):
+        """Valeurs distinctes triées d'une colonne"""
+        raise NotImplementedError
+
+    def iter_select(self, expr, columns=None, chunk_size=FETCH_SIZE):
+        """Lignes retenues par le filtre, par paquets : {colonne: tableau NumPy} (+ '_row' : positions)"""
+        raise NotImplementedError
+
+    def aggregate(self, expr, by, column, func="mean"):
+        """Agrégat d'une colonne par groupe sur les lignes retenues : DataFrame (groupes, valeur, nombre)"""
+        raise NotImplementedError
+
+    def rows(self, expr):
+        """Positions des lignes retenues par le filtre"""
+        chunks = [chunk['_row'] for chunk in self.iter_select(expr, columns=[])]
+        return np.concatenate(chunks) if chunks else np.array([], dtype=np.intp)
+
+    def mask(self, expr, rows=None):
+        """Masque booléen du filtre sur toutes les lignes, ou sur les positions rows seulement"""
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[self.rows(expr)] = True
+        return mask if rows is None else mask[rows]
+
+    def years(self):
+        # Les années sont manipulées en texte par les onglets (voir DataManager)
+        return [str(year) for year in self.distinct('Year')]
+
+    def regions(self):
+        return self.distinct('Region')
+
+    def countries(self):
+        return self.distinct('Country')
+
+    def select(self, expr, columns=None, chunk_size=FETCH_SIZE):
+        """Lignes retenues par le filtre, en DataFrame (paquets concaténés)"""
+        chunks = list(self.iter_select(expr, columns, chunk_size))
+        if not chunks:
+            return pd.DataFrame(columns=columns if columns is not None else self.columns)
+        data = {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+        index = pd.Index(data.pop('_row'))
+        return pd.DataFrame(data, index=index)
+
+
+class PandasBackend(StorageBackend):
+    """
+    Stockage en mémoire : le DataFrame chargé (CSV ou column store).
+
+    :param context: Fonction qui renvoie le FilterContext du DataFrame (tableaux en cache)
+    """
+    def __init__(self, df, context):
+        self.df = df
+        self.columns = list(df.columns)
+        self._context = context
+
+    def distinct(self, column, dropna=True):
+        if column not in self.df.columns:
+            return []
+        values = self.df[column].dropna() if dropna else self.df[column]
+        return sorted(values.unique())
+
+    def iter_select(self, expr, columns=None, chunk_size=FETCH_SIZE):
+        rows = self.rows(expr)
+        columns = self.columns if columns is None else list(columns)
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            data = {name: self.df[name].to_numpy()[chunk] for name in columns}
+            data['_row'] = chunk
+            yield data
+
+    def rows(self, expr):
+        return compile_filter(expr).rows(self._context())
+
+    def mask(self, expr, rows=None):
+        return compile_filter(expr).mask(self._context(), rows)
+
+    def select(self, expr, columns=None, chunk_size=FETCH_SIZE):
+        # En mémoire, une seule prise de lignes suffit (types des colonnes conservés)
+        rows = self.rows(expr)
+        return self.df.iloc[rows] if columns is None else self.df.iloc[rows][list(columns)]
+
+    def aggregate(self, expr, by, column, func="mean"):
+        by = [by] if isinstance(by, str) else list(by)
+        rows = self.rows(expr)
+        grouped = self.df.iloc[rows].groupby(by, observed=True, sort=True)[column]
+        result = grouped.agg([func, "count"]).reset_index()
+        return result.rename(columns={func: column, "count": "n"})
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    Stockage dans un fichier SQLite (une table, index sur Year / Region / Country et les indicateurs).
+    Une table créée par SQLiteBackend.create garde l'ordre des lignes : rowid - 1 = position de la ligne.
+    """
+    def __init__(self, path, table=DEFAULT_TABLE):
+        self.path = path
+        self.table = table
+        # Lecture seule depuis plusieurs threads de l'interface (export, rendu)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        info = self.connection.execute(f"PRAGMA table_info({_quote(table)})").fetchall()
+        if not info:
+            raise ValueError(f"Table introuvable dans {path} : {table}")
+        self.columns = [row[1] for row in info]
+        self.n_rows = self.connection.execute(f"SELECT COUNT(*) FROM {_quote(table)}").fetchone()[0]
+        self._numeric = {row[1] for row in info if row[2].upper() in ("REAL", "INTEGER", "FLOAT", "NUMERIC")}
+
+    @classmethod
+    def create(cls, path, df, table=DEFAULT_TABLE, index_columns=None):
+        """
+        Écrit le DataFrame dans une base SQLite (remplace la table) et crée les index.
+
+        :param index_columns: Colonnes à indexer (par défaut : Year, Region, Country et les colonnes numériques)
+        """
+        if index_columns is None:
+            index_columns = [c for c in KEY_COLUMNS if c in df.columns]
+            index_columns += [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c]) and c not in index_columns]
+        connection = sqlite3.connect(path)
+        try:
+            with connection:
+                df.to_sql(table, connection, if_exists='replace', index=False, chunksize=FETCH_SIZE)
+                for i, column in enumerate(index_columns):
+                    connection.execute(f"CREATE INDEX IF NOT EXISTS {_quote(f'idx_{table}_{i}')} "
+                                       f"ON {_quote(table)} ({_quote(column)})")
+            connection.execute("ANALYZE")
+        finally:
+            connection.close()
+        return cls(path, table)
+
+    def close(self):
+        self.connection.close()
+
+    def load(self):
+        """Table complète en DataFrame, dans l'ordre des lignes (pour les onglets qui travaillent en mémoire)"""
+        return pd.read_sql_query(f"SELECT * FROM {_quote(self.table)} ORDER BY rowid", self.connection)
+
+    def distinct(self, column, dropna=True):
+        if column not in self.columns:
+            return []
+        where = f" WHERE {_quote(column)} IS NOT NULL" if dropna else ""
+        # L'index de la colonne fournit directement les valeurs distinctes triées
+        cursor = self.connection.execute(
+            f"SELECT DISTINCT {_quote(column)} FROM {_quote(self.table)}{where} ORDER BY {_quote(column)}")
+        return [row[0] for row in cursor]
+
+    def iter_select(self, expr, columns=None, chunk_size=FETCH_SIZE):
+        columns = self.columns if columns is None else list(columns)
+        where, params = self.where(expr)
+        selected = ", ".join(["rowid - 1"] + [_quote(c) for c in columns])
+        cursor = self.connection.execute(
+            f"SELECT {selected} FROM {_quote(self.table)} WHERE {where} ORDER BY rowid", params)
+        while True:
+            batch = cursor.fetchmany(chunk_size)
+            if not batch:
+                break
+            values = list(zip(*batch))
+            data = {'_row': np.asarray(values[0], dtype=np.intp)}
+            for name, column_values in zip(columns, values[1:]):
+                if name in self._numeric:
+                    data[name] = np.array(column_values, dtype=float)  # None -> NaN
+                else:
+                    data[name] = np.array(column_values, dtype=object)
+            yield data
+
+    def aggregate(self, expr, by, column, func="mean"):
+        by = [by] if isinstance(by, str) else list(by)
+        where, params = self.where(expr)
+        groups = ", ".join(_quote(c) for c in by)
+        cursor = self.connection.execute(
+            f"SELECT {groups}, {AGGREGATES[func]}({_quote(column)}), COUNT({_quote(column)}) "
+            f"FROM {_quote(self.table)} WHERE {where} GROUP BY {groups} ORDER BY {groups}", params)
+        return pd.DataFrame(cursor.fetchall(), columns=by + [column, "n"])
+
+    # --- TRADUCTION DES EXPRESSIONS DE FILTRE EN SQL ---
+    def where(self, expr):
+        """Clause WHERE paramétrée équivalente à l'expression : (texte SQL, paramètres)"""
+        params = []
+        return self._to_sql(expr, params), params
+
+    def _to_sql(self, node, params):
+        if isinstance(node, And):
+            parts = [self._to_sql(child, params) for child in node.children]
+            return "(" + " AND ".join(parts) + ")" if parts else "1"
+        if isinstance(node, Or):
+            parts = [self._to_sql(child, params) for child in node.children]
+            return "(" + " OR ".join(parts) + ")" if parts else "0"
+        if isinstance(node, Not):
+            return f"(NOT {self._to_sql(node.child, params)})"
+
+        # Chaque feuille renvoie 0 ou 1, jamais NULL : Not() inverse alors exactement le masque de filter_expr
+        column = self._column_sql(node.column)
+        if isinstance(node, Range):
+            conditions = []
+            if node.low is not None:
+                conditions.append(f"{column} >= ?")
+                params.append(float(node.low))
+            if node.high is not None:
+                conditions.append(f"{column} <= ?")
+                params.append(float(node.high))
+            if not conditions:
+                return "1"
+            sql = f"COALESCE({' AND '.join(conditions)}, 0)"
+            return f"({sql} OR {column} IS NULL)" if node.keep_null else sql
+
+        if isinstance(node, IsNull):
+            return f"({column} IS {'NOT ' if node.negate else ''}NULL)"
+
+        if isinstance(node, IsIn):
+            wanted = [v for v in node.values if not pd.isna(v)]
+            if wanted:
+                params.extend(wanted)
+                sql = f"COALESCE({column} IN ({', '.join('?' * len(wanted))}), 0)"
+            else:
+                sql = "0"
+            # Une valeur manquante n'est "dans la liste" que si None y figure
+            if len(wanted) < len(node.values):
+                sql = f"({sql} OR {column} IS NULL)"
+            return f"(NOT {sql})" if node.negate else sql
+
+        raise TypeError(f"Expression de filtre inconnue : {node!r}")
+
+    # Éléments autorisés dans une colonne dérivée : `nom avec espaces`, nom, nombre, opérateurs arithmétiques
+    _DERIVED_TOKEN = re.compile(r"\s*(?:(`[^`]+`)|([A-Za-z_][A-Za-z0-9_]*)|(\d+(?:\.\d*)?|\.\d+)|([-+*/()]))")
+
+    def _column_sql(self, column):
+        if not isinstance(column, Derived):
+            return _quote(column)
+        # Colonne dérivée : expression arithmétique traduite en SQL (les noms deviennent des colonnes)
+        sql, position, text = [], 0, column.expression.strip()
+        while position < len(text):
+            match = self._DERIVED_TOKEN.match(text, position)
+            if match is None:
+                raise ValueError(f"Colonne dérivée non traduisible en SQL : {column.expression}")
+            quoted, name, number, operator = match.groups()
+            if quoted or name:
+                name = quoted[1:-1] if quoted else name
+                if name not in self.columns:
+                    raise KeyError(name)
+                sql.append(_quote(name))
+            else:
+                sql.append(number or operator)
+            position = match.end()
+        # Division en virgule flottante (SQLite divise les entiers en entiers)
+        return "(" + " ".join(sql).replace("/", "* 1.0 /") + ")"
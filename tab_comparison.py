@@ -1,8 +1,19 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                              QComboBox, QGroupBox, QFormLayout, QListWidget, 
-                             QAbstractItemView, QPushButton)
-from PyQt6.QtCore import Qt
+                             QAbstractItemView, QPushButton, QCheckBox, QSpinBox,
+                             QFileDialog, QMessageBox)
+from PyQt6.QtCore import Qt, QTimer
+import numpy as np
+import pandas as pd
 from graph_compare import CompareGraph
+from filter_expr import And, IsIn
+from country_search_box import CountrySearchBox
+from data_watcher import insert_sorted_items
+from raster_cache import data_signature
+from panel_engine import FILL_METHODS
+from facet_engine import FACETS, facet_codes, split_groups
+from ranking_engine import DEFAULT_TOP_K
+from cluster_engine import DEFAULT_CLUSTERS, MAX_CLUSTERS
 
 class ComparisonTab(QWidget):
     """
@@ -10,7 +21,7 @@ class ComparisonTab(QWidget):
     Il contient un panneau de contrôle à gauche (filtres) et le graphique à droite.
     Il fait le lien entre les choix de l'utilisateur et l'affichage graphique.
     """
-    def __init__(self, data_manager):
+    def __init__(self, data_manager, session=None):
         super().__init__()
         # On stocke le gestionnaire de données pour pouvoir accéder au DataFrame plus tard
         self.data_manager = data_manager
@@ -29,10 +40,20 @@ class ComparisonTab(QWidget):
         # Construction de l'interface
         self.setup_ui()
         
+        # Démarrage à chaud : on remet l'état de la session précédente avant le premier affichage
+        if session is not None:
+            self.set_state(session.get("state", {}))
+
         # Initialisation de l'état des widgets 
         self.update_inputs_visibility()
         # Premier affichage du graphique 
-        self.refresh()
+        if session is None:
+            self.refresh()
+        else:
+            # Image du dernier graphique tout de suite, vrai calcul juste après l'affichage de la fenêtre
+            if session.get("image"):
+                self.graph.show_snapshot(session["image"])
+            QTimer.singleShot(0, self.refresh)
 
     def setup_ui(self):
         """Construction de tous les éléments visuels de l'onglet"""
@@ -82,9 +103,88 @@ class ComparisonTab(QWidget):
         self.lbl_y = QLabel("Axe Y :") # On garde une référence pour pouvoir le cacher
         self.form_layout.addRow(self.lbl_y, self.combo_y)
 
+        # Classement (diagramme en barres) : nombre de pays et sens (plus élevés / plus bas)
+        self.spin_top_k = QSpinBox()
+        self.spin_top_k.setRange(1, 100)
+        self.spin_top_k.setValue(DEFAULT_TOP_K)
+        self.spin_top_k.valueChanged.connect(self.refresh)
+        self.combo_rank_order = QComboBox()
+        self.combo_rank_order.addItem("Les plus élevés", True)
+        self.combo_rank_order.addItem("Les plus bas", False)
+        self.combo_rank_order.currentIndexChanged.connect(self.refresh)
+        ranking_layout = QHBoxLayout()
+        ranking_layout.addWidget(self.spin_top_k)
+        ranking_layout.addWidget(self.combo_rank_order)
+        self.lbl_ranking = QLabel("Classement :")
+        self.form_layout.addRow(self.lbl_ranking, ranking_layout)
+
+        # Groupes de pays (k-means sur les indicateurs standardisés, une partition par année) : couleur des points
+        self.check_clusters = QCheckBox("Colorer")
+        self.check_clusters.toggled.connect(self.refresh)
+        self.spin_clusters = QSpinBox()
+        self.spin_clusters.setRange(2, MAX_CLUSTERS)
+        self.spin_clusters.setValue(DEFAULT_CLUSTERS)
+        self.spin_clusters.valueChanged.connect(self.refresh)
+        clusters_layout = QHBoxLayout()
+        clusters_layout.addWidget(self.check_clusters)
+        clusters_layout.addWidget(self.spin_clusters)
+        self.lbl_clusters = QLabel("Groupes (k-means) :")
+        self.form_layout.addRow(self.lbl_clusters, clusters_layout)
+
+        # Années manquantes des courbes d'évolution : trou, ou valeur estimée (voir panel_engine.py)
+        self.combo_gaps = QComboBox()
+        for method, label in FILL_METHODS.items():
+            self.combo_gaps.addItem(label, method)
+        self.combo_gaps.currentIndexChanged.connect(self.refresh)
+        self.form_layout.addRow("Années manquantes :", self.combo_gaps)
+
+        # Petits multiples : un panneau par région (nuage, courbes) ou par année (nuage, toutes les années)
+        self.combo_facets = QComboBox()
+        for facet, label in FACETS.items():
+            self.combo_facets.addItem(label, facet)
+        self.combo_facets.currentIndexChanged.connect(self.on_type_changed)
+        self.form_layout.addRow("Panneaux :", self.combo_facets)
+
         left_layout.addLayout(self.form_layout)
+
+        # Rendu des graphiques lourds (nuage de points, courbes) dans un pool de processus :
+        # l'interface reste réactive pendant le tracé. Décoché = canvas Matplotlib classique.
+        self.check_process_render = QCheckBox("Rendu en arrière-plan (processus)")
+        self.check_process_render.toggled.connect(self.on_render_mode_changed)
+        left_layout.addWidget(self.check_process_render)
         left_layout.addSpacing(10)
 
+        # --- PAYS SIMILAIRES (k plus proches voisins sur les indicateurs, pour l'année choisie) ---
+        group_similar = QGroupBox("Pays similaires")
+        similar_layout = QFormLayout(group_similar)
+        self.combo_similar = QComboBox()
+        self.combo_similar.addItems(self.data_manager.get_all_countries())
+        self.search_similar = CountrySearchBox(self.data_manager.get_country_search_index(), self.combo_similar)
+        similar_layout.addRow("Recherche :", self.search_similar)
+        similar_layout.addRow("Pays :", self.combo_similar)
+
+        self.spin_k = QSpinBox()
+        self.spin_k.setRange(1, 20)
+        self.spin_k.setValue(5)
+        similar_layout.addRow("Nombre de voisins :", self.spin_k)
+
+        similar_buttons = QHBoxLayout()
+        self.btn_similar = QPushButton("Sélectionner")
+        self.btn_similar.setToolTip("Sélectionne le pays et ses plus proches voisins dans la liste")
+        self.btn_similar.clicked.connect(self.select_similar_countries)
+        self.btn_similar_all = QPushButton("Exporter tous...")
+        self.btn_similar_all.setToolTip("Exporte les voisins de tous les pays de l'année (CSV)")
+        self.btn_similar_all.clicked.connect(self.export_similar_countries)
+        similar_buttons.addWidget(self.btn_similar)
+        similar_buttons.addWidget(self.btn_similar_all)
+        similar_layout.addRow(similar_buttons)
+
+        self.lbl_similar = QLabel("")
+        self.lbl_similar.setWordWrap(True)
+        similar_layout.addRow(self.lbl_similar)
+        left_layout.addWidget(group_similar)
+        left_layout.addSpacing(5)
+
         # --- BOUTONS DE SÉLECTION RAPIDE ---
         buttons_layout = QHBoxLayout()
         
@@ -120,6 +220,9 @@ class ComparisonTab(QWidget):
         
         # Quand on change les pays, on redessine le graphique
         self.list_countries.itemSelectionChanged.connect(self.refresh)
+        # Champ de recherche : masque les pays qui ne correspondent pas (la sélection est conservée)
+        self.search_country = CountrySearchBox(self.data_manager.get_country_search_index(), self.list_countries)
+        left_layout.addWidget(self.search_country)
         left_layout.addWidget(self.list_countries)
 
         # Ajout du panneau gauche au layout principal
@@ -128,8 +231,63 @@ class ComparisonTab(QWidget):
         # --- COLONNE DROITE : GRAPHIQUE ---
         # Instance de notre classe personnalisée (voir fichier graph_compare.py)
         self.graph = CompareGraph()
+        # Le canvas a changé de taille derrière une image du cache : on redessine la vue
+        self.graph.stale_view.connect(self.refresh)
         self.layout.addWidget(self.graph)
 
+    # --- INSTANTANÉ DE SESSION ---
+
+    def get_state(self):
+        """Renvoie le type de graphique, les axes et les sélections (pour l'instantané de session)"""
+        return {
+            "type": self.combo_type.currentIndex(),
+            "year": self.combo_year.currentText(),
+            "x": self.combo_x.currentText(),
+            "y": self.combo_y.currentText(),
+            "regions": [item.text() for item in self.list_regions.selectedItems()],
+            "countries": [item.text() for item in self.list_countries.selectedItems()],
+            "similar": self.combo_similar.currentText(),
+            "k": self.spin_k.value(),
+            "gaps": self.combo_gaps.currentData(),
+            "facets": self.combo_facets.currentData(),
+            "top_k": self.spin_top_k.value(),
+            "largest": self.combo_rank_order.currentData(),
+            "clusters": self.check_clusters.isChecked(),
+            "n_clusters": self.spin_clusters.value(),
+        }
+
+    def set_state(self, state):
+        """Remet l'onglet dans l'état donné, sans déclencher de rafraîchissement"""
+        widgets = [self.combo_type, self.combo_year, self.combo_x, self.combo_y, self.combo_gaps, self.combo_facets,
+                   self.spin_top_k, self.combo_rank_order, self.check_clusters, self.spin_clusters,
+                   self.list_regions, self.list_countries]
+        for w in widgets:
+            w.blockSignals(True)
+
+        self.combo_type.setCurrentIndex(state.get("type", self.combo_type.currentIndex()))
+        self.spin_k.setValue(state.get("k", self.spin_k.value()))
+        self.spin_top_k.setValue(state.get("top_k", self.spin_top_k.value()))
+        self.check_clusters.setChecked(state.get("clusters", False))
+        self.spin_clusters.setValue(state.get("n_clusters", self.spin_clusters.value()))
+        for combo, key in ((self.combo_gaps, "gaps"), (self.combo_facets, "facets"), (self.combo_rank_order, "largest")):
+            if combo.findData(state.get(key)) >= 0:
+                combo.setCurrentIndex(combo.findData(state.get(key)))
+        for combo, key in ((self.combo_year, "year"), (self.combo_x, "x"), (self.combo_y, "y"),
+                           (self.combo_similar, "similar")):
+            if key in state and combo.findText(state[key]) >= 0:
+                combo.setCurrentText(state[key])
+        for widget, key in ((self.list_regions, "regions"), (self.list_countries, "countries")):
+            selected = set(state.get(key, []))
+            for i in range(widget.count()):
+                widget.item(i).setSelected(widget.item(i).text() in selected)
+
+        for w in widgets:
+            w.blockSignals(False)
+        self.update_inputs_visibility()
+
+    def get_session(self):
+        return {"state": self.get_state(), "image": self.graph.render_png()}
+
     # --- LOGIQUE MÉTIER ---
 
     def select_all_global(self):
@@ -184,8 +342,8 @@ class ComparisonTab(QWidget):
             return
 
         # 3. Filtrage des données pour trouver quels pays correspondent à ces régions
-        # .isin() vérifie si la région de la ligne est dans notre liste
-        target_countries = df[df['Region'].isin(selected_region_names)]['Country'].unique()
+        # IsIn vérifie si la région de la ligne est dans notre liste
+        target_countries = self.data_manager.filter(IsIn('Region', selected_region_names))['Country'].unique()
 
         # 4. Mise à jour visuelle de la liste des pays
         self.list_countries.blockSignals(True) # On bloque pour éviter 100 refreshes
@@ -203,6 +361,67 @@ class ComparisonTab(QWidget):
         self.list_countries.blockSignals(False)
         self.refresh()
 
+    def select_similar_countries(self):
+        """
+        Sélectionne le pays choisi et ses k plus proches voisins (indicateurs standardisés de l'année),
+        puis redessine le graphique pour les comparer.
+        """
+        country = self.combo_similar.currentText()
+        year = self.combo_year.currentText()
+        neighbours = self.data_manager.similar_countries(country, year, self.spin_k.value())
+
+        if neighbours.empty:
+            self.lbl_similar.setText(f"Pas de données complètes pour {country} en {year}")
+            return
+        self.lbl_similar.setText(", ".join(f"{c} ({d:.2f})" for c, d in
+                                           zip(neighbours['Country'], neighbours['Distance'])))
+
+        # Même principe que select_all_global : un seul rafraîchissement à la fin
+        target = {country, *neighbours['Country']}
+        self.list_regions.blockSignals(True)
+        self.list_countries.blockSignals(True)
+        self.list_regions.clearSelection()
+        for i in range(self.list_countries.count()):
+            item = self.list_countries.item(i)
+            item.setSelected(item.text() in target)
+        self.list_regions.blockSignals(False)
+        self.list_countries.blockSignals(False)
+        self.refresh()
+
+    def export_similar_countries(self):
+        """Exporte en CSV les k voisins de tous les pays de l'année (une seule requête groupée)"""
+        year = self.combo_year.currentText()
+        path, _ = QFileDialog.getSaveFileName(self, "Exporter les pays similaires",
+                                              f"pays_similaires_{year}.csv", "CSV (*.csv)")
+        if not path:
+            return
+        try:
+            self.data_manager.similar_countries_all(year, self.spin_k.value()).to_csv(path, sep=';', index=False)
+        except OSError as e:
+            QMessageBox.warning(self, "Export", f"Échec de l'export : {e}")
+
+    def merge_appended_rows(self, appended):
+        """
+        Lignes ajoutées au fichier de données : nouvelles années, régions et pays insérés dans les listes
+        (sélections conservées) ; le graphique n'est redessiné que si un pays sélectionné a de nouvelles lignes.
+        """
+        insert_sorted_items(self.combo_year, appended.years)
+        insert_sorted_items(self.combo_similar, appended.countries)
+        insert_sorted_items(self.list_regions, appended.regions)
+        insert_sorted_items(self.list_countries, appended.countries)
+        if appended.countries:
+            index = self.data_manager.get_country_search_index()
+            self.search_similar.set_search_index(index)
+            self.search_country.set_search_index(index)
+        selected = [item.text() for item in self.list_countries.selectedItems()]
+        if self.data_manager.take_rows(appended.rows)['Country'].isin(selected).any():
+            self.refresh()
+
+    def on_render_mode_changed(self, checked):
+        """Bascule entre le rendu hors processus et le canvas interactif"""
+        self.graph.set_render_mode("process" if checked else "interactive")
+        self.refresh()
+
     def on_type_changed(self):
         """Gère le changement de type de graphique (Scatter vs Bar vs Curve)"""
         self.update_inputs_visibility() # Masque/Affiche les options inutiles
@@ -226,11 +445,36 @@ class ComparisonTab(QWidget):
             self.lbl_y.hide()
 
         # Mode 2 : Courbes d'évolution (Temporel)
-        if mode == 2: 
+        if mode == 2 or self.current_facet() == "Year":
             # On désactive le choix de l'année car on veut voir TOUTES les années
             self.combo_year.setDisabled(True)
         else:
             self.combo_year.setDisabled(False)
+        # Le traitement des années manquantes ne concerne que les courbes
+        self.combo_gaps.setEnabled(mode == 2)
+        # Nombre de pays et sens du classement : seulement pour le diagramme en barres
+        for widget in (self.lbl_ranking, self.spin_top_k, self.combo_rank_order):
+            widget.setVisible(mode == 1)
+        # Groupes k-means : couleur des points du nuage (graphique unique)
+        for widget in (self.lbl_clusters, self.check_clusters, self.spin_clusters):
+            widget.setVisible(mode == 0)
+        # Petits multiples : pas pour le classement en barres ; un panneau par année seulement pour le nuage
+        self.combo_facets.setEnabled(mode != 1)
+        self.combo_facets.model().item(self.combo_facets.findData("Year")).setEnabled(mode == 0)
+
+    def current_clusters(self):
+        """Nombre de groupes k-means du nuage de points (None = points sans groupes)"""
+        if self.combo_type.currentIndex() == 0 and self.current_facet() is None and self.check_clusters.isChecked():
+            return self.spin_clusters.value()
+        return None
+
+    def current_facet(self):
+        """Découpage en petits multiples du type de graphique actif (None = graphique unique)"""
+        mode = self.combo_type.currentIndex()
+        facet = self.combo_facets.currentData()
+        if mode == 0 or (mode == 2 and facet == "Region"):
+            return facet
+        return None
 
     def refresh(self):
         """
@@ -249,25 +493,65 @@ class ComparisonTab(QWidget):
         selected_items = self.list_countries.selectedItems()
         selected_countries = [item.text() for item in selected_items]
 
-        # 2. Filtrage des données
-        # On travaille sur une copie pour ne pas casser l'original
-        df = self.data_manager.df.copy()
+        # Vue déjà rendue (même type, mêmes axes, mêmes pays, même taille) : réaffichée depuis le cache d'images
+        facet = self.current_facet()
+        key = self.graph.view_key(mode, data_signature(col_x, col_y if mode == 0 else None,
+                                                       year if mode != 2 and facet != "Year" else None,
+                                                       selected_countries,
+                                                       self.combo_gaps.currentData() if mode == 2 else None, facet,
+                                                       self.spin_top_k.value() if mode == 1 else None,
+                                                       self.combo_rank_order.currentData() if mode == 1 else None,
+                                                       self.current_clusters()))
+        if self.graph.show_cached(key):
+            return
 
-        # Filtre Pays
-        if selected_countries:
-            df = df[df['Country'].isin(selected_countries)]
-        else:
-            # Si aucun pays n'est sélectionné, on vide le tableau pour afficher "Pas de données"
-            df = df.iloc[0:0] 
+        # 2. Filtrage des données
+        # Filtre Pays : si aucun pays n'est sélectionné, IsIn sur une liste vide ne garde aucune ligne
+        # (le graphique affiche alors "Pas de données")
+        predicates = [IsIn('Country', selected_countries)]
 
         # Filtre Année (Sauf pour le mode 2 "Courbes" qui a besoin de l'historique complet)
-        if mode != 2: 
-            df = df[df['Year'] == year]
+        # (ni pour le nuage en petits multiples par année, un panneau par année)
+        if mode != 2 and facet != "Year":
+            predicates.append(IsIn('Year', [year]))
+
+        rows = self.data_manager.filter_rows(And(*predicates))
+        if mode == 1:
+            # Classement : lu dans les ordres par année en cache, sans copier ni trier les lignes filtrées
+            largest = self.combo_rank_order.currentData()
+            self.graph.plot_bar(self.data_manager.top_k(rows, col_x, self.spin_top_k.value(), largest), col_x, largest)
+            self.graph.store_view(key)
+            return
+        df = self.data_manager.take_rows(rows)
 
         # 3. Appel de la bonne fonction de dessin dans CompareGraph
-        if mode == 0:
-            self.graph.plot_scatter(df, col_x, col_y)
-        elif mode == 1:
-            self.graph.plot_bar(df, col_x)
+        if facet is not None and not df.empty:
+            self.plot_facets(df, rows, facet, key)
+        elif mode == 0:
+            k = self.current_clusters()
+            # Groupe de chaque point : partition k-means de son année (en cache, voir cluster_engine.py)
+            groups = self.data_manager.cluster_labels(rows, k) if k is not None and not df.empty else None
+            self.graph.plot_scatter(df, col_x, col_y, key, groups, k)
         elif mode == 2:
-            self.graph.plot_multi_curves(df, col_x)
\ No newline at end of file
+            # Séries alignées sur toutes les années (tableau dense construit au chargement)
+            series = self.data_manager.time_series(rows, col_x, self.combo_gaps.currentData()) if not df.empty else None
+            self.graph.plot_multi_curves(df, col_x, key, series)
+
+    def plot_facets(self, df, rows, facet, key):
+        """
+        Petits multiples du type de graphique actif, un panneau par région (ou par année).
+        Les lignes de tous les panneaux sont réparties en un seul passage (voir facet_engine.py).
+        """
+        col_x, col_y = self.combo_x.currentText(), self.combo_y.currentText()
+        codes, labels = facet_codes(df, facet)
+        if self.combo_type.currentIndex() == 0:
+            x = df[col_x].to_numpy(dtype=float, na_value=np.nan)
+            y = df[col_y].to_numpy(dtype=float, na_value=np.nan)
+            points = [(x[positions], y[positions]) for positions in split_groups(codes, len(labels))]
+            self.graph.plot_scatter_grid(points, labels, col_x, col_y, key)
+        else:
+            series = self.data_manager.time_series(rows, col_x, self.combo_gaps.currentData())
+            # Panneau de chaque pays : région de sa première ligne sélectionnée
+            country_group = pd.Series(codes).groupby(df['Country'].astype(str).to_numpy(), sort=False).first()
+            panels = country_group.reindex(series.countries).to_numpy()
+            self.graph.plot_multi_curves_grid(series, panels, labels, col_x, key)
@@ -1,12 +1,28 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                              QComboBox, QGroupBox, QFormLayout, QDoubleSpinBox, 
-                             QTableWidget, QTableWidgetItem, QPushButton)
-from PyQt6.QtCore import Qt
+                             QTableWidget, QTableWidgetItem, QPushButton,
+                             QFileDialog, QProgressDialog, QMessageBox, QCheckBox)
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QColor
+import numpy as np
+import pandas as pd
 # On importe notre propre widget graphique (celui qui contient Matplotlib)
 from graph_country import CountryGraph
+from data_manager import build_selection_slots
+from filter_state import read_filter_widgets, write_filter_widgets
+from export_worker import ExportWorker
+from country_search_box import CountrySearchBox
+from data_watcher import insert_sorted_items
+from raster_cache import data_signature
+from panel_engine import FILL_METHODS
+from facet_engine import FACETS, facet_codes, grouped_mean, grouped_counts
+from histogram_engine import SCORE_BIN_EDGES, score_bin_codes
+
+# Fond des lignes signalées par le moteur d'anomalies
+ANOMALY_COLOR = QColor("#FFE0B2")
 
 class CountryTab(QWidget):
-    def __init__(self, data_manager):
+    def __init__(self, data_manager, session=None):
         # Initialisation de la classe parente (QWidget)
         super().__init__()
         
@@ -18,6 +34,16 @@ class CountryTab(QWidget):
         # actuellement affiché ('pie', 'line' ou 'hist'). Par défaut : pie.
         self.current_graph_mode = "pie"
 
+        # Cache des masques de filtre : quand un seul widget change, seul son filtre est recalculé
+        self.mask_cache = self.data_manager.create_mask_cache()
+        # Positions des lignes du dernier filtrage (utilisées par l'export)
+        self.current_rows = []
+        self.export_worker = None
+        # Filtres partagés avec les autres onglets (mode lié, branché par la fenêtre principale)
+        self.filter_state = None
+        # Filtres changés par un autre onglet pendant que celui-ci était masqué : recalcul à l'affichage
+        self.dirty = False
+
         # --- Mise en page principale ---
         # On utilise un layout Horizontal (QHBoxLayout).
         # Imagine l'écran divisé en deux colonnes : Gauche (Filtres) | Droite (Résultats)
@@ -29,7 +55,11 @@ class CountryTab(QWidget):
         
         # Une fois l'interface créée, on lance un premier rafraîchissement
         # pour afficher les données par défaut (sans filtres).
-        self.refresh()
+        # En démarrage à chaud (session), on remet d'abord les filtres et l'image de la session précédente.
+        if session is None:
+            self.refresh()
+        else:
+            self.restore_session(session)
 
     def setup_ui(self):
         # --- ZONE 1 : FILTRES (Colonne de Gauche) ---
@@ -60,6 +90,9 @@ class CountryTab(QWidget):
 
         # On ajoute ces menus au layout du formulaire
         filter_layout.addRow("Année :", self.combo_year)
+        # Recherche incrémentale dans la liste des pays (sans accents ni casse)
+        self.search_country = CountrySearchBox(self.data_manager.get_country_search_index(), self.combo_country)
+        filter_layout.addRow("Recherche :", self.search_country)
         filter_layout.addRow("Pays :", self.combo_country)
         filter_layout.addRow("Région :", self.combo_region)
 
@@ -75,6 +108,17 @@ class CountryTab(QWidget):
         self.spin_trust_min, self.spin_trust_max = self.add_range_filter(filter_layout, "Trust", 0, 1, 0, 1)
         self.spin_gen_min, self.spin_gen_max = self.add_range_filter(filter_layout, "Generosity", 0, 1, 0, 1)
 
+        # Association colonne du CSV -> (boîte Min, boîte Max), utilisée pour construire le filtre
+        self.range_spins = {
+            "Happiness Score": (self.spin_happ_min, self.spin_happ_max),
+            "Economy (GDP per Capita)": (self.spin_gdp_min, self.spin_gdp_max),
+            "Family": (self.spin_fam_min, self.spin_fam_max),
+            "Health (Life Expectancy)": (self.spin_health_min, self.spin_health_max),
+            "Freedom": (self.spin_free_min, self.spin_free_max),
+            "Trust (Government Corruption)": (self.spin_trust_min, self.spin_trust_max),
+            "Generosity": (self.spin_gen_min, self.spin_gen_max),
+        }
+
         # --- Connexion des signaux (L'interactivité) ---
         # C'est ICI que la magie opère. On dit au programme : 
         # "Si l'utilisateur touche à quoi que ce soit, lance la fonction self.refresh()"
@@ -103,7 +147,21 @@ class CountryTab(QWidget):
         # --- A. Le Tableau ---
         self.table_data = QTableWidget()
         # On ajoute un titre simple au-dessus du tableau
-        right_layout.addWidget(QLabel("<b>2. Tableau des données</b>"))
+        table_header = QHBoxLayout()
+        table_header.addWidget(QLabel("<b>2. Tableau des données</b>"))
+        table_header.addStretch(1)
+        # Lignes signalées par le moteur d'anomalies (voir anomaly_engine.py)
+        self.lbl_anomalies = QLabel("")
+        self.lbl_anomalies.setStyleSheet("color: #B45309;")
+        table_header.addWidget(self.lbl_anomalies)
+        self.check_anomalies = QCheckBox("Anomalies seulement")
+        self.check_anomalies.toggled.connect(self.refresh)
+        table_header.addWidget(self.check_anomalies)
+        # Bouton d'export du résultat filtré (CSV / Parquet / Excel)
+        self.btn_export = QPushButton("💾 Exporter...")
+        self.btn_export.clicked.connect(self.export_data)
+        table_header.addWidget(self.btn_export)
+        right_layout.addLayout(table_header)
         right_layout.addWidget(self.table_data)
 
         # --- B. Les Graphiques ---
@@ -114,6 +172,14 @@ class CountryTab(QWidget):
         self.btn_pie = QPushButton("🥧 Répartition Régionale")
         self.btn_line = QPushButton("📈 Évolution Moyenne")
         self.btn_hist = QPushButton("📊 Distribution")
+        self.btn_decomp = QPushButton("🧮 Décomposition")
+        self.btn_decomp.setToolTip("Contribution de chaque indicateur à l'évolution du score entre deux années")
+
+        # Année de départ de la décomposition (l'année d'arrivée est celle du filtre, ou la dernière)
+        self.combo_year_from = QComboBox()
+        self.combo_year_from.addItems(self.data_manager.get_all_years())
+        self.combo_year_from.setEnabled(False)
+        self.combo_year_from.currentTextChanged.connect(self.refresh)
 
         # --- Connexion des boutons ---
         # On utilise "lambda" (une fonction anonyme) pour passer un paramètre.
@@ -122,11 +188,28 @@ class CountryTab(QWidget):
         self.btn_pie.clicked.connect(lambda: self.switch_graph_mode("pie"))
         self.btn_line.clicked.connect(lambda: self.switch_graph_mode("line"))
         self.btn_hist.clicked.connect(lambda: self.switch_graph_mode("hist"))
+        self.btn_decomp.clicked.connect(lambda: self.switch_graph_mode("decomp"))
 
         # Ajout des boutons à leur layout
         buttons_layout.addWidget(self.btn_pie)
         buttons_layout.addWidget(self.btn_line)
         buttons_layout.addWidget(self.btn_hist)
+        buttons_layout.addWidget(self.btn_decomp)
+        buttons_layout.addWidget(QLabel("depuis :"))
+        buttons_layout.addWidget(self.combo_year_from)
+        # Années manquantes d'un pays dans la courbe : trou, ou valeur estimée (voir panel_engine.py)
+        self.combo_gaps = QComboBox()
+        for method, label in FILL_METHODS.items():
+            self.combo_gaps.addItem(label, method)
+        self.combo_gaps.setToolTip("Années absentes du rapport pour un pays (courbe d'évolution)")
+        self.combo_gaps.currentIndexChanged.connect(lambda: self.refresh_graph())
+        buttons_layout.addWidget(self.combo_gaps)
+        # Petits multiples : un panneau par région (évolution, distribution) ou par année (distribution)
+        self.combo_facets = QComboBox()
+        for facet, label in FACETS.items():
+            self.combo_facets.addItem(label, facet)
+        self.combo_facets.currentIndexChanged.connect(lambda: self.refresh_graph())
+        buttons_layout.addWidget(self.combo_facets)
         # Ajout de la ligne de boutons à la colonne de droite
         right_layout.addLayout(buttons_layout)
 
@@ -134,6 +217,8 @@ class CountryTab(QWidget):
         self.graph = CountryGraph()
         # IMPORTANT : On force une hauteur mini, sinon le tableau écrase le graphique
         self.graph.setMinimumHeight(450) 
+        # Le canvas a changé de taille derrière une image du cache : on redessine la vue
+        self.graph.stale_view.connect(self.refresh_graph)
         right_layout.addWidget(self.graph)
 
         # On ajoute toute la colonne de droite à la fenêtre principale
@@ -169,29 +254,265 @@ class CountryTab(QWidget):
         # On renvoie les deux boîtes pour pouvoir les connecter plus tard
         return spin_min, spin_max
 
+    # --- INSTANTANÉ DE SESSION ---
+    def get_state(self):
+        """Renvoie l'état des filtres et le mode du graphique (pour l'instantané de session)"""
+        return {
+            "year": self.combo_year.currentText(),
+            "region": self.combo_region.currentText(),
+            "country": self.combo_country.currentText(),
+            "bounds": {col: (spin_min.value(), spin_max.value()) for col, (spin_min, spin_max) in self.range_spins.items()},
+            "graph_mode": self.current_graph_mode,
+            "year_from": self.combo_year_from.currentText(),
+            "anomalies_only": self.check_anomalies.isChecked(),
+            "gaps": self.combo_gaps.currentData(),
+            "facets": self.combo_facets.currentData(),
+        }
+
+    def set_state(self, state):
+        """Remet les filtres dans l'état donné, sans déclencher de rafraîchissement"""
+        widgets = [self.combo_year, self.combo_region, self.combo_country, self.combo_year_from, self.check_anomalies,
+                   self.combo_gaps, self.combo_facets]
+        widgets += [spin for pair in self.range_spins.values() for spin in pair]
+        for w in widgets:
+            w.blockSignals(True)
+
+        for combo, key in ((self.combo_year, "year"), (self.combo_region, "region"), (self.combo_country, "country"),
+                           (self.combo_year_from, "year_from")):
+            if combo.findText(state.get(key, "Toutes")) >= 0:
+                combo.setCurrentText(state.get(key, "Toutes"))
+        for col, (low, high) in state.get("bounds", {}).items():
+            if col in self.range_spins:
+                self.range_spins[col][0].setValue(low)
+                self.range_spins[col][1].setValue(high)
+        self.current_graph_mode = state.get("graph_mode", self.current_graph_mode)
+        self.check_anomalies.setChecked(state.get("anomalies_only", False))
+        for combo, key in ((self.combo_gaps, "gaps"), (self.combo_facets, "facets")):
+            if combo.findData(state.get(key)) >= 0:
+                combo.setCurrentIndex(combo.findData(state.get(key)))
+
+        for w in widgets:
+            w.blockSignals(False)
+
+    def get_session(self):
+        return {"state": self.get_state(), "image": self.graph.render_png()}
+
+    def restore_session(self, session):
+        """
+        Démarrage à chaud : filtres et image du dernier graphique tout de suite,
+        puis vrai calcul dès que la boucle d'événements a la main (fenêtre déjà affichée).
+        """
+        self.set_state(session.get("state", {}))
+        if session.get("image"):
+            self.graph.show_snapshot(session["image"])
+        QTimer.singleShot(0, self.refresh)
+
+    def merge_appended_rows(self, appended):
+        """
+        Lignes ajoutées au fichier de données : les années, pays et régions inédits sont insérés dans les
+        menus (sélection conservée), puis l'onglet n'est rafraîchi que si sa sélection contient de nouvelles lignes.
+        """
+        insert_sorted_items(self.combo_year, appended.years, first=1)
+        insert_sorted_items(self.combo_year_from, appended.years)
+        insert_sorted_items(self.combo_country, appended.countries, first=1)
+        insert_sorted_items(self.combo_region, appended.regions, first=1)
+        if appended.countries:
+            self.search_country.set_search_index(self.data_manager.get_country_search_index())
+        # Le cache des masques n'évalue les filtres que sur les lignes ajoutées
+        if self.mask_cache.update(self.build_filter_slots())[appended.rows].any():
+            self.refresh()
+
+    # --- FILTRES LIÉS (voir filter_state.py) ---
+    def attach_filter_state(self, filter_state):
+        self.filter_state = filter_state
+        filter_state.changed.connect(self.on_linked_filters_changed)
+
+    def on_linked_filters_changed(self, source, filters):
+        """Un autre onglet lié a changé les filtres : mêmes valeurs ici, recalcul quand l'onglet est affiché"""
+        if source is self:
+            return
+        write_filter_widgets(self, filters)
+        if self.isVisible():
+            self.refresh()
+        else:
+            self.dirty = True
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.dirty:
+            self.dirty = False
+            self.refresh()
+
+    def selected_rows(self):
+        """Positions des lignes retenues par les filtres (en mode lié : sélection commune, évaluée une fois)"""
+        if self.filter_state is not None and self.filter_state.linked:
+            return self.filter_state.rows_for(self, read_filter_widgets(self))
+        return self.mask_cache.rows(self.build_filter_slots())
+
+    def build_filter_slots(self):
+        """Construit un prédicat par widget de filtre (voir build_selection_slots)"""
+        bounds = {col: (spin_min.value(), spin_max.value()) for col, (spin_min, spin_max) in self.range_spins.items()}
+        return build_selection_slots(self.combo_year.currentText(),
+                                     self.combo_region.currentText(),
+                                     self.combo_country.currentText(),
+                                     bounds)
+
+    def export_data(self):
+        """Exporte le résultat du filtre actuel dans un fichier, en arrière-plan"""
+        path, _ = QFileDialog.getSaveFileName(self, "Exporter les données filtrées", "export.csv",
+                                              "CSV (*.csv);;Parquet (*.parquet);;Excel (*.xlsx)")
+        if not path:
+            return
+
+        total = len(self.current_rows)
+        # Fenêtre de progression avec bouton "Annuler"
+        self.export_dialog = QProgressDialog("Export en cours...", "Annuler", 0, max(total, 1), self)
+        self.export_dialog.setWindowTitle("Export")
+        self.export_dialog.setMinimumDuration(500)
+
+        # Le worker écrit le fichier bloc par bloc dans un thread séparé
+        self.export_worker = ExportWorker(self.data_manager, self.current_rows, path)
+        # Connexion directe au slot de la fenêtre : exécuté dans le thread de l'interface (connexion en file)
+        self.export_worker.progress.connect(self.export_dialog.setValue)
+        self.export_worker.finished.connect(self.on_export_finished)
+        self.export_worker.failed.connect(self.on_export_failed)
+        self.export_dialog.canceled.connect(lambda: self.export_worker.cancel())
+        self.btn_export.setEnabled(False)
+        self.export_worker.start()
+
+    def on_export_finished(self, done, path, total):
+        self.btn_export.setEnabled(True)
+        self.export_dialog.reset()
+        if done:
+            QMessageBox.information(self, "Export", f"{total} lignes exportées dans :\n{path}")
+
+    def on_export_failed(self, message):
+        self.btn_export.setEnabled(True)
+        self.export_dialog.reset()
+        QMessageBox.critical(self, "Export", f"L'export a échoué : {message}")
+
+    def decomposition_years(self):
+        """Années de la décomposition : année de départ choisie, année du filtre (ou la dernière) à l'arrivée"""
+        years = self.data_manager.get_all_years()
+        year_to = self.combo_year.currentText()
+        if year_to == "Toutes":
+            year_to = years[-1] if years else ""
+        return self.combo_year_from.currentText(), year_to
+
+    def current_decomposition(self, df):
+        """
+        Mode "Décomposition" : contribution de chaque indicateur à l'évolution du score entre les deux années,
+        pour tous les pays filtrés à la fois.
+        """
+        year_from, year_to = self.decomposition_years()
+        decomposition = self.data_manager.decompose_score_change(year_from, year_to)
+        if df.empty or decomposition.empty:
+            return decomposition.iloc[0:0]
+        return decomposition[decomposition.index.isin(df['Country'].unique())]
+
+    def fill_decomposition_table(self, decomposition):
+        """Tableau triable de la décomposition : une ligne par pays, tri numérique sur chaque colonne"""
+        self.table_data.setSortingEnabled(False)
+        self.table_data.clear()
+        columns = ["Country"] + list(decomposition.columns)
+        self.table_data.setColumnCount(len(columns))
+        self.table_data.setHorizontalHeaderLabels(columns)
+        self.table_data.setRowCount(len(decomposition))
+        values = decomposition.to_numpy(dtype=float)
+        for i, country in enumerate(decomposition.index):
+            self.table_data.setItem(i, 0, QTableWidgetItem(country))
+            for j, value in enumerate(values[i], start=1):
+                item = QTableWidgetItem()
+                # Valeur numérique (et non texte) : le tri par colonne est numérique
+                if value == value:
+                    item.setData(Qt.ItemDataRole.DisplayRole, round(float(value), 3))
+                self.table_data.setItem(i, j, item)
+        self.table_data.setSortingEnabled(True)
+
+    def plot_decomposition(self, df):
+        """Graphique en cascade : pays choisi, ou moyenne des pays filtrés"""
+        decomposition = self.current_decomposition(df)
+        year_from, year_to = self.decomposition_years()
+        country = self.combo_country.currentText()
+        if decomposition.empty:
+            self.graph.plot_waterfall(None, np.nan, np.nan, "")
+            return
+        if country != "Toutes":
+            row = decomposition.iloc[0]
+            title = f"Évolution du score {year_from} → {year_to} — {country}"
+        else:
+            # Un indicateur manquant compte pour 0 (son écart est dans le résidu) : la moyenne se referme aussi
+            row = decomposition.fillna(0.0).mean()
+            title = f"Évolution du score moyen {year_from} → {year_to} ({len(decomposition)} pays)"
+        self.graph.plot_waterfall(row[decomposition.columns[3:]], row["Score départ"], row["Score arrivée"], title)
+
+    def current_facet(self):
+        """
+        Découpage en petits multiples du mode actif : par région pour l'évolution et la distribution,
+        par année pour la distribution seulement ; None = graphique unique.
+        """
+        facet = self.combo_facets.currentData()
+        if self.current_graph_mode == "hist" or (self.current_graph_mode == "line" and facet == "Region"):
+            return facet
+        return None
+
+    def update_facets_enabled(self):
+        """Active le choix des panneaux selon le mode (le découpage par année n'a pas de sens pour l'évolution)"""
+        mode = self.current_graph_mode
+        self.combo_facets.setEnabled(mode in ("line", "hist"))
+        self.combo_facets.model().item(self.combo_facets.findData("Year")).setEnabled(mode == "hist")
+
+    def plot_facets(self, df, facet):
+        """
+        Petits multiples du mode actif, un panneau par groupe.
+        Les données de tous les panneaux sont calculées en un seul passage groupé (voir facet_engine.py).
+        """
+        codes, labels = facet_codes(df, facet)
+        if self.current_graph_mode == "line":
+            # Séries alignées (tableau dense) puis moyenne par (région du pays, année)
+            series = self.data_manager.time_series(self.current_rows, "Happiness Score", self.combo_gaps.currentData())
+            country_group = pd.Series(codes).groupby(df['Country'].astype(str).to_numpy(), sort=False).first()
+            groups = np.repeat(country_group.reindex(series.countries).to_numpy(), len(series.years))
+            years = np.tile(np.arange(len(series.years)), len(series.countries))
+            means = grouped_mean(groups, len(labels), years, len(series.years), series.values.ravel())
+            imputed = grouped_mean(groups, len(labels), years, len(series.years), series.imputed.ravel()) > 0
+            self.graph.plot_line_grid(series.years, means, labels, imputed if imputed.any() else None)
+        else:
+            bins = score_bin_codes(df['Happiness Score'].to_numpy(dtype=float, na_value=np.nan))
+            self.graph.plot_hist_grid(grouped_counts(codes, len(labels), bins, len(SCORE_BIN_EDGES) - 1), labels)
+
     def switch_graph_mode(self, mode):
         """Fonction appelée quand on clique sur un bouton de graphique"""
+        previous = self.current_graph_mode
         self.current_graph_mode = mode # On mémorise le nouveau mode (ex: "hist")
-        self.refresh() # On redessine tout
+        self.combo_year_from.setEnabled(mode == "decomp")
+        self.update_facets_enabled()
+        if "decomp" in (previous, mode) and previous != mode:
+            # Le tableau change de contenu (lignes brutes <-> décomposition) : on rafraîchit tout
+            self.refresh()
+        else:
+            # Mêmes lignes filtrées : seul le graphique change (et vient souvent du cache d'images)
+            self.refresh_graph()
 
     def refresh(self):
         """Fonction centrale qui met à jour les données, le tableau et le graphique"""
         
         # --- ETAPE 1 : Récupérer les données filtrées ---
-        # On appelle la grosse fonction du DataManager en lui envoyant
-        # la valeur actuelle de CHAQUE filtre (texte et nombres).
-        df = self.data_manager.filter_data_advanced(
-            self.combo_year.currentText(),
-            self.combo_region.currentText(),
-            self.combo_country.currentText(),
-            self.spin_happ_min.value(), self.spin_happ_max.value(),
-            self.spin_gdp_min.value(), self.spin_gdp_max.value(),
-            self.spin_fam_min.value(), self.spin_fam_max.value(),
-            self.spin_health_min.value(), self.spin_health_max.value(),
-            self.spin_free_min.value(), self.spin_free_max.value(),
-            self.spin_trust_min.value(), self.spin_trust_max.value(),
-            self.spin_gen_min.value(), self.spin_gen_max.value()
-        )
+        # On construit un prédicat par filtre (texte et nombres) à partir de la valeur actuelle
+        # des widgets. Le cache ne recalcule que les prédicats qui ont changé.
+        self.current_rows = self.selected_rows()
+        if self.check_anomalies.isChecked():
+            # Revue d'une édition : seulement les lignes signalées par le moteur d'anomalies, les plus suspectes d'abord
+            self.current_rows = self.data_manager.get_anomalies().ranked(self.current_rows)
+        df = self.data_manager.take_rows(self.current_rows)
+
+        self.combo_year_from.setEnabled(self.current_graph_mode == "decomp")
+        self.update_facets_enabled()
+        if self.current_graph_mode == "decomp":
+            # Le tableau montre la décomposition au lieu des lignes brutes
+            self.fill_decomposition_table(self.current_decomposition(df))
+            self.refresh_graph(df)
+            return
 
         # --- ETAPE 2 : Remplir le Tableau ---
         self.table_data.setSortingEnabled(False) # On désactive le tri pendant qu'on remplit (plus rapide)
@@ -209,14 +530,63 @@ class CountryTab(QWidget):
                 # QTableWidgetItem transforme le texte en "case de tableau"
                 self.table_data.setItem(i, j, QTableWidgetItem(str(val)))
         
+        # Surlignage des lignes signalées par le moteur d'anomalies (raisons en info-bulle)
+        anomalies = self.data_manager.get_anomalies()
+        flagged = np.flatnonzero(anomalies.flagged[self.current_rows]) if len(df) else []
+        reasons = anomalies.reasons()
+        for i in flagged:
+            tooltip = reasons.get(int(self.current_rows[i]), "")
+            for j in range(len(columns)):
+                item = self.table_data.item(i, j)
+                item.setBackground(ANOMALY_COLOR)
+                item.setToolTip(tooltip)
+        self.lbl_anomalies.setText(f"⚠ {len(flagged)} ligne(s) suspecte(s)" if len(flagged) else "")
+
         self.table_data.setSortingEnabled(True) # On réactive le tri (click sur colonne)
 
         # --- ETAPE 3 : Dessiner le Graphique ---
+        self.refresh_graph(df)
+
+    def refresh_graph(self, df=None):
+        """
+        Dessine le graphique du mode actif pour les lignes filtrées actuelles.
+        Une vue déjà rendue (même mode, mêmes lignes, même taille) est réaffichée depuis le cache d'images.
+        """
+        mode = self.current_graph_mode
+        # Signature des données de la vue : lignes filtrées + paramètres propres au mode
+        facet = self.current_facet()
+        params = {"line": (self.combo_country.currentText() == "Toutes", self.combo_region.currentText(),
+                           self.combo_gaps.currentData(), facet),
+                  "hist": facet,
+                  "decomp": (self.decomposition_years(), self.combo_country.currentText())}.get(mode)
+        key = self.graph.view_key(mode, data_signature(np.asarray(self.current_rows), params))
+        if self.graph.show_cached(key):
+            return
+        if df is None:
+            df = self.data_manager.take_rows(self.current_rows)
+
         # On regarde quel est le mode actif et on appelle la fonction correspondante
         # dans notre widget graphique, en lui passant les données filtrées (df).
-        if self.current_graph_mode == "pie":
+        if facet is not None and not df.empty:
+            self.plot_facets(df, facet)
+        elif mode == "pie":
             self.graph.plot_pie(df)
-        elif self.current_graph_mode == "line":
-            self.graph.plot_line(df)
-        elif self.current_graph_mode == "hist":
-            self.graph.plot_hist(df)
\ No newline at end of file
+        elif mode == "line":
+            band = None
+            if not df.empty and self.combo_country.currentText() == "Toutes":
+                # Intervalle de confiance de la moyenne, si les lignes affichées sont des cellules Région × Année complètes
+                band = self.data_manager.get_bootstrap_intervals().band_for(df, self.combo_region.currentText())
+            # Scores alignés sur toutes les années (tableau dense construit au chargement)
+            series = self.data_manager.time_series(self.current_rows, "Happiness Score",
+                                                   self.combo_gaps.currentData()) if not df.empty else None
+            self.graph.plot_line(df, band, series)
+        elif mode == "hist":
+            counts = None
+            if not df.empty:
+                # Comptes issus du moteur d'histogramme (vecteurs en cache par Année/Région)
+                counts = self.data_manager.get_score_histogram().counts_for(
+                    df, self.combo_year.currentText(), self.combo_region.currentText())
+            self.graph.plot_hist(df, counts)
+        elif mode == "decomp":
+            self.plot_decomposition(df)
+        self.graph.store_view(key)
@@ -1,15 +1,51 @@
-from PyQt6.QtWidgets import QWidget, QHBoxLayout, QVBoxLayout, QGroupBox, QLabel, QComboBox, QDoubleSpinBox
-from PyQt6.QtCore import QUrl
+from PyQt6.QtWidgets import (QWidget, QHBoxLayout, QVBoxLayout, QGroupBox, QLabel, QComboBox, QDoubleSpinBox,
+                             QStackedWidget, QSpinBox)
+from PyQt6.QtCore import QUrl, QTimer
+import numpy as np
+import pandas as pd
 import plotly.express as px
+from matplotlib.colors import ListedColormap
 from country_iso_map import COUNTRY_TO_ISO3
-from PyQt6.QtWebEngineWidgets import QWebEngineView
+from data_manager import build_selection_slots, INDICATOR_BOUNDS
+from filter_state import read_filter_widgets, write_filter_widgets
+from country_search_box import CountrySearchBox
+from data_watcher import insert_sorted_items
+from raster_cache import get_raster_cache, data_signature
+from graph_map import MapGraph
+from cluster_engine import CLUSTER_COLORS, DEFAULT_CLUSTERS, MAX_CLUSTERS
+
+# Rendus de la carte : page Plotly dans un navigateur embarqué (QtWebEngine), ou carte native Matplotlib
+# (contours des pays en cache, voir map_geometry.py) : pas de navigateur à charger ni de script à télécharger
+RENDERERS = {"web": "Web (Plotly)", "native": "Native (Matplotlib)"}
+
+
+def load_web_view():
+    """Classe QWebEngineView, importée au premier rendu web seulement (None si QtWebEngine est absent)"""
+    try:
+        from PyQt6.QtWebEngineWidgets import QWebEngineView
+    except ImportError:
+        return None
+    return QWebEngineView
 
 
 class MapTabInteractive(QWidget):
-    def __init__(self, data_manager):
+    def __init__(self, data_manager, session=None):
         super().__init__()
         
         self.data_manager = data_manager
+        # Dernière page HTML affichée (gardée pour l'instantané de session)
+        self.last_html = ""
+        # Rendu actif et signature de la dernière carte native dessinée
+        self.renderer = "web"
+        self._native_key = None
+        # Cache des masques de filtre (un prédicat par widget)
+        self.mask_cache = self.data_manager.create_mask_cache()
+        # Filtres partagés avec les autres onglets (mode lié) et recalcul différé à l'affichage
+        self.filter_state = None
+        self.dirty = False
+        # Codes ISO3 alignés sur les pays du tableau dense Pays × Année (mode évolution)
+        self._iso3 = None
+        self._iso3_panel = None
 
         main = QHBoxLayout(self)
 
@@ -17,6 +53,42 @@ class MapTabInteractive(QWidget):
         filters_box = QGroupBox("Filtres")
         left = QVBoxLayout(filters_box)
 
+        left.addWidget(QLabel("Rendu :"))
+        self.combo_renderer = QComboBox()
+        for name, label in RENDERERS.items():
+            self.combo_renderer.addItem(label, name)
+        left.addWidget(self.combo_renderer)
+
+        # --- Mode d'affichage : score d'une année, ou évolution d'un indicateur entre deux années ---
+        left.addWidget(QLabel("Affichage :"))
+        self.combo_mode = QComboBox()
+        self.combo_mode.addItems(["Score de bonheur", "Évolution entre deux années", "Groupes de pays (k-means)"])
+        left.addWidget(self.combo_mode)
+        # Nombre de groupes du mode "Groupes de pays"
+        self.spin_clusters = QSpinBox()
+        self.spin_clusters.setRange(2, MAX_CLUSTERS)
+        self.spin_clusters.setValue(DEFAULT_CLUSTERS)
+        clusters_row = QHBoxLayout()
+        clusters_row.addWidget(QLabel("Nombre de groupes :"))
+        clusters_row.addWidget(self.spin_clusters)
+        left.addLayout(clusters_row)
+        self.combo_indicator = QComboBox()
+        self.combo_indicator.addItems(list(INDICATOR_BOUNDS))
+        left.addWidget(self.combo_indicator)
+        years = self.data_manager.get_all_years()
+        self.combo_year_from = QComboBox()
+        self.combo_year_from.addItems(years)
+        self.combo_year_to = QComboBox()
+        self.combo_year_to.addItems(years)
+        if years:
+            self.combo_year_to.setCurrentIndex(len(years) - 1)
+        change_years = QHBoxLayout()
+        change_years.addWidget(QLabel("De :"))
+        change_years.addWidget(self.combo_year_from)
+        change_years.addWidget(QLabel("à :"))
+        change_years.addWidget(self.combo_year_to)
+        left.addLayout(change_years)
+
         left.addWidget(QLabel("Année :"))
         self.combo_year = QComboBox()
         self.combo_year.addItems(["Toutes"] + self.data_manager.get_all_years())
@@ -25,6 +97,9 @@ class MapTabInteractive(QWidget):
         left.addWidget(QLabel("Pays :"))
         self.combo_country = QComboBox()
         self.combo_country.addItems(["Toutes"] + self.data_manager.get_all_countries())
+        # Recherche incrémentale dans la liste des pays (sans accents ni casse)
+        self.search_country = CountrySearchBox(self.data_manager.get_country_search_index(), self.combo_country)
+        left.addWidget(self.search_country)
         left.addWidget(self.combo_country)
 
         left.addWidget(QLabel("Région :"))
@@ -40,25 +115,49 @@ class MapTabInteractive(QWidget):
         self.trust_min, self.trust_max = self._add_minmax(left, "Trust", 0.0, 1.0, 0.0, 1.0)
         self.gen_min, self.gen_max = self._add_minmax(left, "Generosity", 0.0, 1.0, 0.0, 1.0)
 
-        left.addStretch(1)
+        # Association colonne du CSV -> (Min, Max), utilisée pour construire le filtre
+        self.range_spins = {
+            "Happiness Score": (self.happ_min, self.happ_max),
+            "Economy (GDP per Capita)": (self.gdp_min, self.gdp_max),
+            "Family": (self.fam_min, self.fam_max),
+            "Health (Life Expectancy)": (self.health_min, self.health_max),
+            "Freedom": (self.free_min, self.free_max),
+            "Trust (Government Corruption)": (self.trust_min, self.trust_max),
+            "Generosity": (self.gen_min, self.gen_max),
+        }
 
-        # --- Carte interactive (web) ---
+        left.addStretch(1)
 
-        
-        self.web = QWebEngineView()
+        # --- Carte : vues créées au premier affichage de leur rendu (voir current_view) ---
+        self.web = None
+        self.map_graph = None
+        self.view_stack = QStackedWidget()
 
         main.addWidget(filters_box, 1)
-        main.addWidget(self.web, 3)
+        main.addWidget(self.view_stack, 3)
 
         # Signals
-        for w in [self.combo_year, self.combo_country, self.combo_region]:
+        for w in [self.combo_year, self.combo_country, self.combo_region,
+                  self.combo_mode, self.combo_indicator, self.combo_year_from, self.combo_year_to]:
             w.currentTextChanged.connect(self.refresh)
+        self.combo_renderer.currentIndexChanged.connect(self.refresh)
+        self.spin_clusters.valueChanged.connect(self.refresh)
         for w in [self.happ_min, self.happ_max, self.gdp_min, self.gdp_max, self.fam_min, self.fam_max,
                   self.health_min, self.health_max, self.free_min, self.free_max, self.trust_min, self.trust_max,
                   self.gen_min, self.gen_max]:
             w.valueChanged.connect(self.refresh)
 
-        self.refresh()
+        if session is None:
+            self.refresh()
+        else:
+            # Démarrage à chaud : filtres et dernière carte tout de suite, recalcul juste après l'affichage
+            self.set_state(session.get("state", {}))
+            self.renderer = self.current_view()
+            if session.get("html"):
+                self.set_html(session["html"])
+            if session.get("image") and self.map_graph is not None:
+                self.map_graph.show_snapshot(session["image"])
+            QTimer.singleShot(0, self.refresh)
 
     def _add_minmax(self, layout, label, min_val, max_val, default_min, default_max):
         layout.addWidget(QLabel(f"{label} Min :"))
@@ -69,56 +168,361 @@ class MapTabInteractive(QWidget):
         layout.addWidget(sp_max)
         return sp_min, sp_max
 
+    def get_state(self):
+        return {
+            "year": self.combo_year.currentText(),
+            "region": self.combo_region.currentText(),
+            "country": self.combo_country.currentText(),
+            "bounds": {col: (sp_min.value(), sp_max.value()) for col, (sp_min, sp_max) in self.range_spins.items()},
+            "mode": self.combo_mode.currentIndex(),
+            "indicator": self.combo_indicator.currentText(),
+            "year_from": self.combo_year_from.currentText(),
+            "year_to": self.combo_year_to.currentText(),
+            "renderer": self.combo_renderer.currentData(),
+            "n_clusters": self.spin_clusters.value(),
+        }
+
+    def set_state(self, state):
+        widgets = [self.combo_year, self.combo_region, self.combo_country, self.combo_renderer, self.spin_clusters,
+                   self.combo_mode, self.combo_indicator, self.combo_year_from, self.combo_year_to]
+        widgets += [sp for pair in self.range_spins.values() for sp in pair]
+        for w in widgets:
+            w.blockSignals(True)
+        self.combo_mode.setCurrentIndex(state.get("mode", 0))
+        self.spin_clusters.setValue(state.get("n_clusters", self.spin_clusters.value()))
+        if self.combo_renderer.findData(state.get("renderer")) >= 0:
+            self.combo_renderer.setCurrentIndex(self.combo_renderer.findData(state.get("renderer")))
+        for combo, key in ((self.combo_year, "year"), (self.combo_region, "region"), (self.combo_country, "country"),
+                           (self.combo_indicator, "indicator"), (self.combo_year_from, "year_from"),
+                           (self.combo_year_to, "year_to")):
+            if combo.findText(state.get(key, "Toutes")) >= 0:
+                combo.setCurrentText(state.get(key, "Toutes"))
+        for col, (low, high) in state.get("bounds", {}).items():
+            if col in self.range_spins:
+                self.range_spins[col][0].setValue(low)
+                self.range_spins[col][1].setValue(high)
+        for w in widgets:
+            w.blockSignals(False)
+        self.update_mode_inputs()
+
+    def update_mode_inputs(self):
+        """Le mode évolution utilise l'indicateur et les deux années, pas le filtre d'année"""
+        change = self.combo_mode.currentIndex() == 1
+        for w in (self.combo_indicator, self.combo_year_from, self.combo_year_to):
+            w.setEnabled(change)
+        self.combo_year.setEnabled(not change)
+        self.spin_clusters.setEnabled(self.combo_mode.currentIndex() == 2)
+
+    def get_session(self):
+        if self.renderer == "native":
+            return {"state": self.get_state(), "image": self.map_graph.render_png()}
+        return {"state": self.get_state(), "html": self.last_html}
+
+    def current_view(self):
+        """
+        Affiche la vue du rendu choisi, créée à sa première utilisation, et renvoie le nom du rendu.
+        Sans QtWebEngine, le rendu web est retiré du choix et la carte native est utilisée.
+        """
+        renderer = self.combo_renderer.currentData()
+        if renderer == "web" and self.web is None:
+            view_class = load_web_view()
+            if view_class is None:
+                self.combo_renderer.blockSignals(True)
+                self.combo_renderer.removeItem(self.combo_renderer.findData("web"))
+                self.combo_renderer.blockSignals(False)
+                renderer = "native"
+            else:
+                self.web = view_class()
+                self.view_stack.addWidget(self.web)
+                if self.last_html:
+                    self.web.setHtml(self.last_html)
+        if renderer == "native" and self.map_graph is None:
+            self.map_graph = MapGraph()
+            self.view_stack.addWidget(self.map_graph)
+        self.view_stack.setCurrentWidget(self.web if renderer == "web" else self.map_graph)
+        return renderer
+
+    def set_html(self, html):
+        self.last_html = html
+        if self.web is not None:
+            self.web.setHtml(html)
+
+    def show_message(self, text):
+        self._native_key = None
+        if self.renderer == "native":
+            self.map_graph.show_message(text)
+        else:
+            self.set_html(f"<h3>{text}</h3>")
+
+    def show_cached(self, key):
+        """
+        Carte déjà produite pour cette clé : page HTML réaffichée depuis le cache sans refaire la figure Plotly,
+        ou carte native déjà à l'écran. Renvoie False s'il faut la dessiner.
+        """
+        if self.renderer == "native":
+            return key == self._native_key
+        html = get_raster_cache().get(key)
+        if html is None:
+            return False
+        if html != self.last_html:
+            self.set_html(html)
+        return True
+
+    def merge_appended_rows(self, appended):
+        """
+        Lignes ajoutées au fichier de données : nouvelles valeurs dans les menus (sélection conservée),
+        carte redessinée seulement si les filtres retiennent des lignes ajoutées.
+        """
+        for combo in (self.combo_year_from, self.combo_year_to):
+            insert_sorted_items(combo, appended.years)
+        insert_sorted_items(self.combo_year, appended.years, first=1)
+        insert_sorted_items(self.combo_country, appended.countries, first=1)
+        insert_sorted_items(self.combo_region, appended.regions, first=1)
+        if appended.countries:
+            self.search_country.set_search_index(self.data_manager.get_country_search_index())
+        if self.mask_cache.update(self.build_filter_slots())[appended.rows].any():
+            self.refresh()
+
+    # --- FILTRES LIÉS (voir filter_state.py) ---
+    def attach_filter_state(self, filter_state):
+        self.filter_state = filter_state
+        filter_state.changed.connect(self.on_linked_filters_changed)
+
+    def on_linked_filters_changed(self, source, filters):
+        """Un autre onglet lié a changé les filtres : mêmes valeurs ici, carte redessinée quand l'onglet est affiché"""
+        if source is self:
+            return
+        write_filter_widgets(self, filters)
+        if self.isVisible():
+            self.refresh()
+        else:
+            self.dirty = True
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.dirty:
+            self.dirty = False
+            self.refresh()
+
+    def selected_rows(self):
+        """Positions des lignes retenues par les filtres (en mode lié : sélection commune, évaluée une fois)"""
+        if self.filter_state is not None and self.filter_state.linked:
+            rows = self.filter_state.rows_for(self, read_filter_widgets(self))
+            if self.combo_mode.currentIndex() != 1:
+                return rows
+        # Mode évolution : la sélection commune filtre l'année, celle de la carte non (cache propre)
+        return self.mask_cache.rows(self.build_filter_slots())
+
+    def build_filter_slots(self):
+        bounds = {col: (sp_min.value(), sp_max.value()) for col, (sp_min, sp_max) in self.range_spins.items()}
+        # En mode évolution, les deux années sont choisies à part : pas de filtre d'année
+        year = "Toutes" if self.combo_mode.currentIndex() == 1 else self.combo_year.currentText()
+        return build_selection_slots(year, self.combo_region.currentText(),
+                                     self.combo_country.currentText(), bounds)
+
     def refresh(self):
+        self.renderer = self.current_view()
         if self.data_manager.df.empty:
-            self.web.setHtml("<h3>Pas de données</h3>")
+            self.show_message("Pas de données")
+            return
+        self.update_mode_inputs()
+        if self.combo_mode.currentIndex() == 1:
+            self.refresh_change()
+            return
+        if self.combo_mode.currentIndex() == 2:
+            self.refresh_clusters()
             return
 
         year = self.combo_year.currentText()
         region = self.combo_region.currentText()
         country = self.combo_country.currentText()
 
-        df = self.data_manager.filter_data_advanced(
-            year, region, country,
-            self.happ_min.value(), self.happ_max.value(),
-            self.gdp_min.value(), self.gdp_max.value(),
-            self.fam_min.value(), self.fam_max.value(),
-            self.health_min.value(), self.health_max.value(),
-            self.free_min.value(), self.free_max.value(),
-            self.trust_min.value(), self.trust_max.value(),
-            self.gen_min.value(), self.gen_max.value()
-        ).copy()
+        rows = self.selected_rows()
+        key = ("map", data_signature(rows, year))
+        if self.show_cached(key):
+            return
+
+        df = self.data_manager.take_rows(rows).copy()
+        # Lignes signalées par le moteur d'anomalies (contour rouge sur la carte)
+        df["Anomalies"] = self.data_manager.get_anomalies().flagged[rows].astype(int)
 
         # Convertir les pays en ISO3
         df["iso3"] = df["Country"].map(COUNTRY_TO_ISO3)
         df = df.dropna(subset=["iso3"])
 
         if df.empty:
-            self.web.setHtml("<h3>Aucun pays ISO valide</h3>")
+            self.show_message("Aucun pays ISO valide")
             return
 
         # Si année = Toutes → moyenne par pays
         if year == "Toutes":
             df_map = (
                 df.groupby(["iso3", "Country", "Region"], as_index=False)
-                ["Happiness Score"]
-                .mean()
+                .agg({"Happiness Score": "mean", "Anomalies": "sum"})
             )
         else:
             df_map = df
 
+        title = f"Carte interactive — pays filtrés: {df_map['Country'].nunique()}"
+        if self.renderer == "native":
+            self.map_graph.plot_choropleth(df_map, "Happiness Score", title, cmap="plasma",
+                                           hover_columns=["Region", "Happiness Score", "Anomalies"])
+            self._native_key = key
+            return
+
         # Création de la carte
         fig = px.choropleth(
             df_map,
             locations="iso3",
             color="Happiness Score",
             hover_name="Country",
-            hover_data=["Region"],
+            hover_data=["Region", "Anomalies"],
             projection="natural earth",
-            title=f"Carte interactive — pays filtrés: {df_map['Country'].nunique()}",
+            title=title,
             color_continuous_scale="Plasma"
         )
         fig.update_layout(margin=dict(l=0, r=0, t=50, b=0))
+        # Contour rouge épais des pays avec au moins une ligne suspecte
+        flagged = df_map["Anomalies"].to_numpy() > 0
+        fig.update_traces(marker_line_color=["red" if f else "white" for f in flagged],
+                          marker_line_width=[2.5 if f else 0.5 for f in flagged])
 
         # Afficher dans PyQt (HTML)
-        self.web.setHtml(fig.to_html(include_plotlyjs="cdn"))
+        html = fig.to_html(include_plotlyjs="cdn")
+        get_raster_cache().put(key, html, len(html))
+        self.set_html(html)
+
+    def refresh_clusters(self):
+        """
+        Carte des groupes de pays : partition k-means de chaque année sur les indicateurs standardisés
+        (en cache par année et k, voir cluster_engine.py). Les groupes ne dépendent pas des filtres, qui
+        choisissent seulement les pays affichés ; sur toutes les années, chaque pays prend le groupe
+        de sa dernière année sélectionnée.
+        """
+        k = self.spin_clusters.value()
+        rows = self.selected_rows()
+        key = ("map", data_signature("clusters", rows, k))
+        if self.show_cached(key):
+            return
+        if not len(rows):
+            self.show_message("Aucune ligne ne passe les filtres")
+            return
+
+        df = self.data_manager.take_rows(rows)
+        df_map = pd.DataFrame({
+            "iso3": df["Country"].map(COUNTRY_TO_ISO3).to_numpy(),
+            "Country": df["Country"].to_numpy(),
+            "Region": df["Region"].to_numpy(),
+            "Year": df["Year"].to_numpy(),
+            "Happiness Score": df["Happiness Score"].to_numpy(),
+            "Groupe": self.data_manager.cluster_labels(rows, k) + 1,
+            "Anomalies": self.data_manager.get_anomalies().flagged[rows].astype(int),
+        })
+        df_map = df_map.dropna(subset=["iso3"]).sort_values("Year", kind="stable").drop_duplicates("iso3", keep="last")
+        if df_map.empty:
+            self.show_message("Aucun pays ISO valide")
+            return
+
+        title = f"Groupes de pays (k-means, {k} groupes) — pays : {len(df_map)}"
+        if self.renderer == "native":
+            self.map_graph.plot_choropleth(df_map, "Groupe", title, cmap=ListedColormap(CLUSTER_COLORS[:k]),
+                                           limits=(0.5, k + 0.5),
+                                           hover_columns=["Region", "Year", "Groupe", "Happiness Score", "Anomalies"])
+            self._native_key = key
+            return
+
+        df_map["Groupe"] = df_map["Groupe"].astype(str)
+        groups = [str(g + 1) for g in range(k)]
+        fig = px.choropleth(
+            df_map,
+            locations="iso3",
+            color="Groupe",
+            hover_name="Country",
+            hover_data={"iso3": False, "Region": True, "Year": True, "Happiness Score": ":.3f", "Anomalies": True},
+            projection="natural earth",
+            title=title,
+            color_discrete_map=dict(zip(groups, CLUSTER_COLORS)),
+            category_orders={"Groupe": groups},
+        )
+        fig.update_layout(margin=dict(l=0, r=0, t=50, b=0))
+
+        html = fig.to_html(include_plotlyjs="cdn")
+        get_raster_cache().put(key, html, len(html))
+        self.set_html(html)
+
+    def panel_iso3(self, panel):
+        """Codes ISO3 alignés sur les pays du tableau dense (calculés une fois par tableau)"""
+        if self._iso3_panel is not panel:
+            self._iso3 = pd.Series(panel.countries).map(COUNTRY_TO_ISO3).to_numpy()
+            self._iso3_panel = panel
+        return self._iso3
+
+    def refresh_change(self):
+        """
+        Carte de l'évolution d'un indicateur entre deux années (échelle divergente centrée sur 0).
+        Les valeurs viennent du tableau dense Pays × Année (voir panel_engine.py) : changer d'année est
+        une soustraction de deux tranches alignées, sans refiltrer ni fusionner de DataFrames.
+        Un pays est affiché si ses lignes des deux années passent les filtres.
+        """
+        indicator = self.combo_indicator.currentText()
+        year_from, year_to = self.combo_year_from.currentText(), self.combo_year_to.currentText()
+        rows = self.selected_rows()
+        key = ("map", data_signature("change", rows, indicator, year_from, year_to))
+        if self.show_cached(key):
+            return
+
+        panel = self.data_manager.get_country_year_panel()
+        i, j = panel.year_position(year_from), panel.year_position(year_to)
+        if i is None or j is None:
+            self.show_message("Pas de données")
+            return
+        start, end, delta = panel.change(indicator, year_from, year_to)
+        selected = panel.selected_cells(rows)
+        iso3 = self.panel_iso3(panel)
+        shown = selected[:, i] & selected[:, j] & ~np.isnan(delta) & pd.notna(iso3)
+        if not shown.any():
+            self.show_message("Aucun pays présent (et filtré) les deux années")
+            return
+
+        col_from, col_to = f"{indicator} ({year_from})", f"{indicator} ({year_to})"
+        flagged = self.data_manager.get_anomalies().flagged
+        df_map = pd.DataFrame({
+            "iso3": iso3[shown],
+            "Country": panel.countries[shown],
+            "Region": self.data_manager.df['Region'].to_numpy()[panel.latest_row[shown]],
+            col_from: start[shown],
+            col_to: end[shown],
+            "Évolution": delta[shown],
+            # Lignes suspectes parmi les deux années comparées
+            "Anomalies": flagged[panel.row_of[shown, i]].astype(int) + flagged[panel.row_of[shown, j]].astype(int),
+        })
+
+        # Échelle symétrique : le blanc correspond à "pas de changement"
+        limit = float(np.abs(df_map["Évolution"]).max()) or 1.0
+        title = f"Évolution de {indicator} entre {year_from} et {year_to} — pays : {len(df_map)}"
+        if self.renderer == "native":
+            self.map_graph.plot_choropleth(df_map, "Évolution", title, cmap="RdBu", limits=(-limit, limit),
+                                           hover_columns=["Region", col_from, col_to, "Évolution", "Anomalies"])
+            self._native_key = key
+            return
+
+        fig = px.choropleth(
+            df_map,
+            locations="iso3",
+            color="Évolution",
+            hover_name="Country",
+            hover_data={"iso3": False, "Region": True, col_from: ":.3f", col_to: ":.3f",
+                        "Évolution": ":+.3f", "Anomalies": True},
+            projection="natural earth",
+            title=title,
+            color_continuous_scale="RdBu",
+            range_color=(-limit, limit),
+        )
+        fig.update_layout(margin=dict(l=0, r=0, t=50, b=0))
+        flagged_map = df_map["Anomalies"].to_numpy() > 0
+        fig.update_traces(marker_line_color=["red" if f else "white" for f in flagged_map],
+                          marker_line_width=[2.5 if f else 0.5 for f in flagged_map])
+
+        html = fig.to_html(include_plotlyjs="cdn")
+        get_raster_cache().put(key, html, len(html))
+        self.set_html(html)